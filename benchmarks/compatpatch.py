@@ -0,0 +1,152 @@
+"""
+Benchmark ClientCompatPatch on synthetic pages of media.
+
+Example command:
+    python benchmarks/compatpatch.py -n 1000 -r 10
+"""
+import argparse
+import copy
+import os.path
+import random
+import timeit
+try:
+    from instagram_private_api.compatpatch import ClientCompatPatch
+except ImportError:
+    import sys
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+    from instagram_private_api.compatpatch import ClientCompatPatch
+
+IMAGE_WIDTHS = (1080, 750, 640, 480, 320, 240, 150)
+VIDEO_WIDTHS = (720, 480, 640)
+
+
+def make_user(rnd):
+    pk = rnd.randrange(1, 1 << 40)
+    return {
+        'pk': pk, 'username': f'user{pk}', 'full_name': 'User', 'is_private': False,
+        'profile_pic_url': f'https://scontent.cdninstagram.com/v/t51.2885-19/{pk}_n.jpg',
+        'profile_pic_id': f'{pk}_{pk}', 'is_verified': False, 'has_anonymous_profile_picture': False,
+    }
+
+
+def make_comment(rnd):
+    created_at = rnd.randrange(1500000000, 1600000000)
+    return {
+        'pk': rnd.randrange(1 << 50, 1 << 54), 'user_id': 1, 'text': 'Nice!', 'type': 0,
+        'created_at': created_at, 'created_at_utc': created_at, 'content_type': 'comment',
+        'status': 'Active', 'bit_flags': 0, 'user': make_user(rnd),
+    }
+
+
+def make_versions(pk, widths, video=False):
+    ext = 'mp4' if video else 'jpg'
+    versions = []
+    for width in widths:
+        version = {'width': width, 'height': width, 'url': f'https://scontent.cdninstagram.com/{pk}_{width}.{ext}'}
+        if video:
+            version['type'] = 101
+        versions.append(version)
+    return versions
+
+
+def make_item(rnd, media_type):
+    pk = rnd.randrange(1 << 60, 1 << 62)
+    item = {
+        'pk': pk, 'id': f'{pk}_1', 'media_type': media_type, 'original_width': 1080, 'original_height': 1080,
+        'image_versions2': {'candidates': make_versions(pk, IMAGE_WIDTHS)},
+    }
+    if media_type == 2:
+        item['video_versions'] = make_versions(pk, VIDEO_WIDTHS, video=True)
+        item['video_duration'] = 10.0
+    return item
+
+
+def make_media(rnd):
+    """Make a media object similar to the ones in feed pages"""
+    media_type = rnd.choice((1, 1, 2, 8))
+    media = make_item(rnd, 1 if media_type == 8 else media_type)
+    media.update({
+        'code': 'B' + str(media['pk'])[:10], 'media_type': media_type,
+        'taken_at': rnd.randrange(1500000000, 1600000000), 'device_timestamp': 1500000000000,
+        'filter_type': 0, 'like_count': rnd.randrange(1000), 'has_liked': False, 'top_likers': [],
+        'comment_count': 3, 'comment_likes_enabled': True, 'has_more_comments': True,
+        'max_num_visible_preview_comments': 2, 'preview_comments': [make_comment(rnd) for _ in range(2)],
+        'caption': make_comment(rnd), 'caption_is_edited': False, 'user': make_user(rnd),
+        'can_viewer_save': True, 'organic_tracking_token': 'x' * 100, 'photo_of_you': False,
+        'usertags': {'in': [{'position': [0.5, 0.5], 'user': make_user(rnd)}]},
+        'location': {'pk': 1, 'lat': 1.0, 'lng': 2.0, 'name': 'Place', 'address': '', 'city': ''},
+    })
+    if media_type == 8:
+        media['carousel_media'] = [make_item(rnd, rnd.choice((1, 2))) for _ in range(3)]
+    return media
+
+
+def make_page(count, seed=42):
+    rnd = random.Random(seed)
+    return [make_media(rnd) for _ in range(count)]
+
+
+def legacy_closest_size(medias, width, height=0):
+    """The original ``ClientCompatPatch._get_closest_size``"""
+    current = None
+    for media in medias:
+        if not current:
+            current = media
+        if (abs(media['width'] - width) < abs(current['width'] - width) or
+                (media['width'] == current['width'] and not height and
+                 not media['height'] == current['width']) or
+                (media['width'] == current['width'] and height and
+                 abs(media['height'] - height) < abs(current['height'] - height))):
+            current = media
+    return current
+
+
+def legacy_images(media):
+    """Select the image variants with a scan per target, as before :meth:`ClientCompatPatch.closest_sizes`"""
+    candidates = media.get('image_versions2', {}).get('candidates', [])
+    return {
+        'low_resolution': legacy_closest_size(candidates, 320),
+        'thumbnail': legacy_closest_size(candidates, 150, 150),
+        'standard_resolution': legacy_closest_size(candidates, media.get('original_width', 1000)),
+    }
+
+
+def report(label, seconds, count):
+    print(f'{label:<32} {seconds * 1000:8.2f}ms  {count / seconds:10.0f}/s')
+
+
+def bench(label, stmt, count, repeat, setup='pass'):
+    times = timeit.repeat(stmt, setup=setup, number=1, repeat=repeat)
+    report(label, min(times), count)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='ClientCompatPatch benchmark')
+    parser.add_argument('-n', '--number', dest='number', type=int, default=1000, help='Media per page')
+    parser.add_argument('-r', '--repeat', dest='repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    page = make_page(args.number)
+    users = [make_user(random.Random(i)) for i in range(args.number)]
+    comments = [make_comment(random.Random(i)) for i in range(args.number)]
+    copies = []
+
+    def fresh(items):
+        def setup():
+            copies.append(copy.deepcopy(items))
+        return setup
+
+    bench('images (scan per target)', lambda: [legacy_images(m) for m in page], len(page), args.repeat)
+    bench('images (closest_sizes)', lambda: [ClientCompatPatch._images(m) for m in page], len(page), args.repeat)
+    for drop_incompat_keys in (False, True):
+        print(f'drop_incompat_keys={drop_incompat_keys}')
+        for label, items, patch, patch_items in (
+                ('media', page, ClientCompatPatch.media, ClientCompatPatch.patch_medias),
+                ('list_user', users, ClientCompatPatch.list_user, ClientCompatPatch.patch_users),
+                ('comment', comments, ClientCompatPatch.comment, ClientCompatPatch.patch_comments)):
+            bench(f'  {label} (per item)',
+                  lambda: [patch(i, drop_incompat_keys=drop_incompat_keys) for i in copies.pop()],
+                  len(items), args.repeat, setup=fresh(items))
+            bench(f'  {patch_items.__name__}',
+                  lambda: patch_items(copies.pop(), drop_incompat_keys=drop_incompat_keys),
+                  len(items), args.repeat, setup=fresh(items))
@@ -0,0 +1,74 @@
+"""
+Benchmark InstagramID shortcode conversion against the previous implementation.
+
+Example command:
+    python benchmarks/instagram_id.py -n 100000
+"""
+import argparse
+import os.path
+import random
+import timeit
+try:
+    from instagram_private_api.utils import InstagramID, np
+except ImportError:
+    import sys
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+    from instagram_private_api.utils import InstagramID, np
+
+
+def legacy_encode(num, alphabet=InstagramID.ENCODING_CHARS):
+    """The original :meth:`InstagramID._encode`"""
+    if num == 0:
+        return alphabet[0]
+    arr = []
+    base = len(alphabet)
+    while num:
+        rem = num % base
+        num //= base
+        arr.append(alphabet[rem])
+    arr.reverse()
+    return ''.join(arr)
+
+
+def legacy_decode(shortcode, alphabet=InstagramID.ENCODING_CHARS):
+    """The original :meth:`InstagramID._decode`"""
+    base = len(alphabet)
+    strlen = len(shortcode)
+    num = 0
+    idx = 0
+    for char in shortcode:
+        power = (strlen - (idx + 1))
+        num += alphabet.index(char) * (base ** power)
+        idx += 1
+    return num
+
+
+def report(label, seconds, count):
+    print(f'{label:<32} {seconds:8.3f}s  {count / seconds / 1e6:8.2f}M/s')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='InstagramID benchmark')
+    parser.add_argument('-n', '--number', dest='number', type=int, default=100000)
+    args = parser.parse_args()
+
+    rnd = random.Random(42)
+    ids = [rnd.randrange(1 << 60, 1 << 62) for _ in range(args.number)]
+    codes = [legacy_encode(i) for i in ids]
+
+    report('legacy encode', timeit.timeit(lambda: [legacy_encode(i) for i in ids], number=1), len(ids))
+    report('encode', timeit.timeit(lambda: [InstagramID.shorten_id(i) for i in ids], number=1), len(ids))
+    report('shorten_ids (list)', timeit.timeit(lambda: InstagramID.shorten_ids(ids), number=1), len(ids))
+    report('legacy decode', timeit.timeit(lambda: [legacy_decode(c) for c in codes], number=1), len(ids))
+    report('decode', timeit.timeit(lambda: [InstagramID.expand_code(c) for c in codes], number=1), len(ids))
+    report('expand_codes (list)', timeit.timeit(lambda: InstagramID.expand_codes(codes), number=1), len(ids))
+
+    if np is not None:
+        id_array = np.array(ids, dtype=np.int64)
+        code_array = np.array(codes)
+        report('shorten_ids (numpy int64)', timeit.timeit(
+            lambda: InstagramID.shorten_ids(id_array), number=1), len(ids))
+        report('expand_codes (numpy int64)', timeit.timeit(
+            lambda: InstagramID.expand_codes(code_array), number=1), len(ids))
+    else:
+        print('numpy is not installed, skipping array benchmarks')
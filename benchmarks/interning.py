@@ -0,0 +1,99 @@
+"""
+Measure the memory used by a follower dataset, with and without a StringPool.
+
+The dataset is made of follower list pages of users drawn from a smaller set of
+distinct users, as users follow many of the same accounts, and is decoded from json
+so that repeated strings are separate copies, as they are when fetched.
+
+Example command:
+    python benchmarks/interning.py -n 1000000 -d 200000
+"""
+import argparse
+import gc
+import json
+import os.path
+import random
+import time
+import tracemalloc
+try:
+    from instagram_private_api import StringPool, User
+    from instagram_private_api.compat import jloads
+except ImportError:
+    import sys
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+    from instagram_private_api import StringPool, User
+    from instagram_private_api.compat import jloads
+
+HOSTS = [f'scontent-{region}-1.cdninstagram.com' for region in ('lhr8', 'cdg2', 'fra3', 'iad3', 'sjc3', 'gru1')]
+
+
+def make_list_user(rnd, pk):
+    host = rnd.choice(HOSTS)
+    return {
+        'pk': pk, 'username': f'user.{pk}', 'full_name': rnd.choice(['', f'User {pk % 9973}', 'Full Name']),
+        'is_private': rnd.random() < 0.3, 'is_verified': rnd.random() < 0.01,
+        'profile_pic_url': (
+            f'https://{host}/v/t51.2885-19/s150x150/{pk}_{rnd.getrandbits(52)}_{rnd.getrandbits(60)}_n.jpg'
+            f'?_nc_ht={host}&_nc_ohc={rnd.getrandbits(64):x}'
+            f'&oh={rnd.getrandbits(128):032x}&oe={rnd.getrandbits(32):X}'),
+        'profile_pic_id': f'{rnd.getrandbits(60)}_{pk}', 'has_anonymous_profile_picture': False,
+        'latest_reel_media': 0,
+    }
+
+
+def make_pages(number, distinct, page_size=200, seed=42):
+    """Json follower pages of number users drawn from distinct users"""
+    rnd = random.Random(seed)
+    users = [json.dumps(make_list_user(rnd, pk)) for pk in range(1, distinct + 1)]
+    pages = []
+    for start in range(0, number, page_size):
+        page = ','.join(rnd.choice(users) for _ in range(min(page_size, number - start)))
+        pages.append(f'{{"users":[{page}],"big_list":true,"status":"ok"}}')
+    return pages
+
+
+def measure(build, pages):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build(pages)
+    elapsed = time.perf_counter() - start
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size, elapsed
+
+
+def dicts(pages):
+    return [u for page in pages for u in jloads(page)['users']]
+
+
+def interned_dicts(pages):
+    pool = StringPool()
+    return [u for page in pages for u in pool.intern_all(jloads(page)['users'])], pool
+
+
+def models(pages, pool=None):
+    return [User.from_dict(u, pool) for page in pages for u in jloads(page)['users']], pool
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='String interning benchmark')
+    parser.add_argument('-n', '--number', dest='number', type=int, default=1000000, help='Users in the dataset')
+    parser.add_argument('-d', '--distinct', dest='distinct', type=int, default=200000, help='Distinct users')
+    args = parser.parse_args()
+
+    pages = make_pages(args.number, args.distinct)
+    print(f'{args.number} users ({args.distinct} distinct), {sum(map(len, pages)) / 1e6:.0f}MB of json')
+
+    baseline = None
+    for label, build in (
+            ('dicts', dicts),
+            ('dicts, interned', interned_dicts),
+            ('models', models),
+            ('models, interned', lambda p: models(p, StringPool())),
+            ('models, interned, compact urls', lambda p: models(p, StringPool(compact_urls=True)))):
+        result, size, elapsed = measure(build, pages)
+        baseline = baseline or size
+        print(f'{label:<32} {size / 1e6:8.1f}MB  {size / args.number:6.0f} bytes per user  '
+              f'{size / baseline:6.1%}  {elapsed:5.1f}s')
+        del result
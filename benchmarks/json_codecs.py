@@ -0,0 +1,39 @@
+"""
+Compare the installed json codecs on synthetic feed, follower and comment pages.
+
+Example command:
+    python benchmarks/json_codecs.py -n 1000 -r 10
+"""
+import argparse
+import os.path
+import random
+import timeit
+try:
+    from instagram_private_api import json_codecs
+except ImportError:
+    import sys
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+    from instagram_private_api import json_codecs
+from compatpatch import make_comment, make_page, make_user
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Json codecs benchmark')
+    parser.add_argument('-n', '--number', dest='number', type=int, default=1000, help='Objects per page')
+    parser.add_argument('-r', '--repeat', dest='repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    pages = {
+        'feed': {'status': 'ok', 'items': make_page(args.number)},
+        'followers': {'status': 'ok', 'users': [make_user(random.Random(i)) for i in range(args.number)]},
+        'comments': {'status': 'ok', 'comments': [make_comment(random.Random(i)) for i in range(args.number)]},
+    }
+    for label, page in pages.items():
+        encoded = json_codecs.CODECS['json'].dumps(page)
+        print(f'{label} ({len(encoded) / 1024:.0f}KB)')
+        for codec in json_codecs.CODECS.values():
+            dumps = min(timeit.repeat(lambda: codec.dumps(page), number=1, repeat=args.repeat))
+            loads = min(timeit.repeat(lambda: codec.loads(encoded), number=1, repeat=args.repeat))
+            print(f'  {codec.name:<10} dumps {dumps * 1000:8.2f}ms  loads {loads * 1000:8.2f}ms')
+    print(f'auto: dumps {json_codecs.get_codec("auto", "dumps").name}, '
+          f'loads {json_codecs.get_codec("auto", "loads").name}')
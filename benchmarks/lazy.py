@@ -0,0 +1,78 @@
+"""
+Compare reading a few fields of a large reels tray response with json decoding and LazyDocument.
+
+Example command:
+    python benchmarks/lazy.py -n 200 -r 10
+"""
+import argparse
+import json
+import os.path
+import random
+import timeit
+import tracemalloc
+try:
+    from instagram_private_api.compat import jloads
+    from instagram_private_api.lazy import LazyDocument, msgspec
+except ImportError:
+    import sys
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+    from instagram_private_api.compat import jloads
+    from instagram_private_api.lazy import LazyDocument, msgspec
+from compatpatch import make_media, make_user
+
+
+def make_tray(count, seed=42):
+    rnd = random.Random(seed)
+    return {
+        'status': 'ok', 'broadcasts': [], 'story_ranking_token': 'x' * 36,
+        'tray': [
+            {
+                'id': i, 'latest_reel_media': 1500000000 + i, 'seen': 0, 'user': make_user(rnd),
+                'items': [make_media(rnd) for _ in range(rnd.randrange(1, 6))],
+            }
+            for i in range(count)
+        ],
+    }
+
+
+def read_json(content):
+    res = jloads(content)
+    return res['status'], len(res['tray']), res['tray'][0]['user']['username']
+
+
+def read_lazy(content):
+    res = LazyDocument(content)
+    return res['status'], len(res['tray']), res.at('/tray/0/user/username')
+
+
+def read_usernames_json(content):
+    return [r['user']['username'] for r in jloads(content)['tray']]
+
+
+def read_usernames_lazy(content):
+    return [r['user']['username'] for r in LazyDocument(content)['tray']]
+
+
+def peak_memory(read, content):
+    tracemalloc.start()
+    read(content)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='LazyDocument benchmark')
+    parser.add_argument('-n', '--number', dest='number', type=int, default=200, help='Reels in the tray')
+    parser.add_argument('-r', '--repeat', dest='repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    content = json.dumps(make_tray(args.number)).encode('utf8')
+    print(f'json decoder: {jloads.__module__}, msgspec: {msgspec is not None}, body: {len(content) / 1024:.0f}KB')
+    for label, read in (
+            ('3 fields (json)', read_json),
+            ('3 fields (lazy)', read_lazy),
+            ('all usernames (json)', read_usernames_json),
+            ('all usernames (lazy)', read_usernames_lazy)):
+        seconds = min(timeit.repeat(lambda: read(content), number=1, repeat=args.repeat))
+        print(f'{label:<24} {seconds * 1000:8.2f}ms  peak {peak_memory(read, content) / 1024:8.0f}KB')
@@ -0,0 +1,53 @@
+"""
+Compare the memory and build time of api objects and compact models.
+
+Example command:
+    python benchmarks/models.py -n 10000
+"""
+import argparse
+import copy
+import os.path
+import random
+import time
+import tracemalloc
+try:
+    from instagram_private_api.models import Media, User
+except ImportError:
+    import sys
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+    from instagram_private_api.models import Media, User
+from compatpatch import make_page, make_user
+
+
+def measure(build):
+    """Get the memory still allocated after ``build()`` returns, i.e. held by its result"""
+    tracemalloc.start()
+    result = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size
+
+
+def report(label, count, size, baseline=None):
+    ratio = f'  {baseline / size:5.1f}x smaller' if baseline else ''
+    print(f'{label:<16} {size / count:8.0f} bytes/record{ratio}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Models memory benchmark')
+    parser.add_argument('-n', '--number', dest='number', type=int, default=10000, help='Number of records')
+    args = parser.parse_args()
+
+    for label, make, model in (
+            ('media', lambda: make_page(args.number), Media),
+            ('user', lambda: [make_user(random.Random(i)) for i in range(args.number)], User)):
+        template = make()
+        # deepcopy so that the strings are not shared with the template
+        objs, dict_size = measure(lambda: copy.deepcopy(template))
+        report(f'{label} (dict)', args.number, dict_size)
+        # the models keep some of the values of the dicts, which are freed when the build returns
+        models, model_size = measure(lambda: [model.from_dict(o) for o in copy.deepcopy(template)])
+        report(f'{label} (model)', args.number, model_size, baseline=dict_size)
+        start = time.perf_counter()
+        models = [model.from_dict(o) for o in objs]
+        print(f'{label} from_dict: {(time.perf_counter() - start) * 1e6 / args.number:.2f}us/record')
@@ -0,0 +1,43 @@
+"""
+Count the calls planned for common jobs, against one call per entity and id.
+
+Example command:
+    python benchmarks/planner.py -u 500 -m 1000
+"""
+import argparse
+import os.path
+try:
+    from instagram_private_api.planner import FetchPlanner
+except ImportError:
+    import sys
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+    from instagram_private_api.planner import FetchPlanner
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Fetch planner benchmark')
+    parser.add_argument('-u', '--users', dest='users', type=int, default=500, help='Number of user ids')
+    parser.add_argument('-m', '--medias', dest='medias', type=int, default=1000, help='Number of media ids')
+    args = parser.parse_args()
+
+    user_ids = [str(i) for i in range(args.users)]
+    media_ids = [f'{i}_1' for i in range(args.medias)]
+    jobs = {
+        'profiles': {'profile': user_ids},
+        'profiles and first feed page': {'profile': user_ids, 'feed': user_ids},
+        'profiles and stories': {'profile': user_ids, 'story': user_ids},
+        'profile, feed and stories': {'profile': user_ids, 'feed': user_ids, 'story': user_ids},
+        'stories and broadcasts': {'story': user_ids, 'broadcast': user_ids},
+        'stories': {'story': user_ids},
+        'medias': {'media': media_ids},
+        'stories and medias': {'story': user_ids, 'media': media_ids},
+    }
+    for experimental in (True, False):
+        print(f'experimental endpoints: {experimental}')
+        planner = FetchPlanner(None, experimental=experimental)
+        for label, needs in jobs.items():
+            plan = planner.plan(needs)
+            endpoints = ', '.join(
+                f'{name} x{plan.count_calls(name)}' for name in sorted({c.endpoint.name for c in plan}))
+            print(f'  {label:<30} {len(plan):6d} calls vs {plan.naive_count:6d} '
+                  f'({len(plan) / plan.naive_count:6.1%})  {endpoints}')
@@ -0,0 +1,55 @@
+"""
+Measure the throughput of a CPU bound crawl-and-transform job, decoding and patching
+synthetic feed pages, with ShardedRuntime and an increasing number of processes.
+The job stands in for the network with pre-encoded responses, so it only scales with cores.
+
+Example command:
+    python benchmarks/runtime.py -n 200 -m 50 -p 1 2 4
+"""
+import argparse
+import json
+import os.path
+import pickle
+import random
+import time
+try:
+    from instagram_private_api import Client, ShardedRuntime
+    from instagram_private_api.compat import jloads
+    from instagram_private_api.compatpatch import ClientCompatPatch
+except ImportError:
+    import sys
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+    from instagram_private_api import Client, ShardedRuntime
+    from instagram_private_api.compat import jloads
+    from instagram_private_api.compatpatch import ClientCompatPatch
+from compatpatch import make_media
+
+
+def fetch_and_transform(client, user_id, count):
+    rnd = random.Random(user_id)
+    body = json.dumps({'items': [make_media(rnd) for _ in range(count)], 'status': 'ok'})
+    medias = ClientCompatPatch.patch_medias(jloads(body)['items'])
+    return user_id, sum(m['like_count'] for m in medias), len(body)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Sharded runtime benchmark')
+    parser.add_argument('-n', '--items', dest='items', type=int, default=200, help='Number of user ids')
+    parser.add_argument('-m', '--medias', dest='medias', type=int, default=50, help='Media per feed page')
+    parser.add_argument('-p', '--processes', dest='processes', type=int, nargs='+', default=[1, 2, 4],
+                        help='Numbers of processes to compare')
+    args = parser.parse_args()
+
+    settings = Client('', '', settings={'cookie': pickle.dumps({})}).settings
+    print(f'{os.cpu_count()} cpus, {args.items} feed pages of {args.medias} media')
+    baseline = None
+    for processes in args.processes:
+        with ShardedRuntime(fetch_and_transform, settings, processes=processes) as runtime:
+            # warm up the workers
+            list(runtime.map([(i, 1) for i in range(processes)]))
+            start = time.perf_counter()
+            total = sum(r[2] for r in runtime.map((i, args.medias) for i in range(args.items)))
+            elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(f'  {processes:3d} processes: {elapsed:7.2f}s  {args.items / elapsed:8.1f} pages/s  '
+              f'{total / elapsed / 1e6:7.1f} MB/s  speedup x{baseline / elapsed:.2f}')
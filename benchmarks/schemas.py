@@ -0,0 +1,51 @@
+"""
+Compare decoding responses into msgspec schemas with json decoding and ClientCompatPatch.
+
+Example command:
+    python benchmarks/schemas.py -n 1000 -r 10
+"""
+import argparse
+import json
+import os.path
+import random
+import timeit
+try:
+    from instagram_private_api import schemas
+    from instagram_private_api.compat import jloads
+    from instagram_private_api.compatpatch import ClientCompatPatch
+except ImportError:
+    import sys
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+    from instagram_private_api import schemas
+    from instagram_private_api.compat import jloads
+    from instagram_private_api.compatpatch import ClientCompatPatch
+from compatpatch import make_comment, make_page, make_user
+
+
+def report(label, seconds, count):
+    print(f'{label:<28} {seconds * 1000:8.2f}ms  {count / seconds:10.0f}/s')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Typed responses benchmark')
+    parser.add_argument('-n', '--number', dest='number', type=int, default=1000, help='Objects per response')
+    parser.add_argument('-r', '--repeat', dest='repeat', type=int, default=10)
+    args = parser.parse_args()
+    if schemas.msgspec is None:
+        parser.error('msgspec is not installed')
+
+    print(f'json decoder: {jloads.__module__}')
+    for label, key, body, schema, patch in (
+            ('feed', 'items', make_page(args.number), 'FeedResponse', ClientCompatPatch.patch_medias),
+            ('followers', 'users', [make_user(random.Random(i)) for i in range(args.number)],
+             'UsersResponse', ClientCompatPatch.patch_users),
+            ('comments', 'comments', [make_comment(random.Random(i)) for i in range(args.number)],
+             'CommentsResponse', ClientCompatPatch.patch_comments)):
+        content = json.dumps({'status': 'ok', key: body, 'next_max_id': 'x'}).encode('utf8')
+        print(f'{label} ({len(content) / 1024:.0f}KB)')
+        for stmt_label, stmt in (
+                ('  json', lambda: jloads(content)),
+                ('  json + ClientCompatPatch', lambda: patch(jloads(content)[key])),
+                (f'  schemas.{schema}', lambda: schemas.decode(content, schema))):
+            times = timeit.repeat(stmt, number=1, repeat=args.repeat)
+            report(stmt_label, min(times), args.number)
@@ -61,3 +61,12 @@ if __name__ == '__main__':
         has_more = results.get('has_more')
         rank_token = results.get('rank_token')
     print(json.dumps([t['name'] for t in tag_results], indent=2))
+
+    # ---------- Pagination with a bounded exclusion list ----------
+    # Caps the exclude_list sent so that deep searches don't make ever larger requests
+    tag_results = []
+    for tag in api.tag_search_iter('cats', max_exclude=100):
+        tag_results.append(tag)
+        if len(tag_results) >= 60:
+            break
+    print(json.dumps([t['name'] for t in tag_results], indent=2))
@@ -1,7 +1,7 @@
 # flake8: noqa
 
 from .client import Client
-from .compatpatch import ClientCompatPatch
+from .compatpatch import ClientCompatPatch, CompatPatchView
 from .errors import (
     ClientError, ClientLoginError, ClientLoginRequiredError,
     ClientCookieExpiredError, ClientThrottledError, ClientConnectionError,
@@ -10,6 +10,19 @@ from .errors import (
 )
 from .endpoints.upload import MediaRatios
 from .endpoints.common import MediaTypes
+from .pagination import SectionPaginator, SearchPaginator
+from .models import Model, Media, User, Comment, Reel, Broadcast
+from .projection import Projection
+from .lazy import LazyDocument
+from .interning import StringPool, CompactUrl
+from .loaders import MediaInfoLoader
+from .stories import StoryFetcher
+from .reporters import SeenReporter
+from .planner import FetchPlanner
+from .registry import ResponseCache, AsyncClient
+from .runtime import ShardedRuntime
+from .workqueue import SQLiteQueue, RedisQueue, RespClient
+from .clientpool import ClientPool, RateBudget
 
 
 __version__ = '1.6.0'
@@ -0,0 +1,199 @@
+"""
+Helpers to run an endpoint over a large list of ids in chunks, concurrently.
+"""
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import time
+
+
+def chunked(items, max_size):
+    """
+    Split items into the fewest chunks of at most max_size items, of near equal sizes so that
+    chunks run concurrently take about as long, e.g. 250 items in chunks of 100 are split
+    into chunks of 84, 83 and 83 items rather than 100, 100 and 50.
+
+    :param items: list
+    :param max_size: maximum chunk size
+    :return: list of lists
+    """
+    items = list(items)
+    if not items:
+        return []
+    count = -(-len(items) // max_size)
+    size, extra = divmod(len(items), count)
+    chunks = []
+    start = 0
+    for i in range(count):
+        end = start + size + (i < extra)
+        chunks.append(items[start:end])
+        start = end
+    return chunks
+
+
+class ChunkResult:
+    """The outcome of one chunk, ``error`` is set instead of ``result`` if the chunk failed"""
+    __slots__ = ('index', 'items', 'result', 'error', 'elapsed')
+
+    def __init__(self, index, items, result=None, error=None, elapsed=0.0):
+        """
+
+        :param index: position of the chunk
+        :param items: the items of the chunk, e.g. to retry a failed chunk
+        :param result: return value of the chunk function
+        :param error: exception raised by the chunk function
+        :param elapsed: seconds taken by the chunk function
+        """
+        self.index = index
+        self.items = items
+        self.result = result
+        self.error = error
+        self.elapsed = elapsed
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    def __repr__(self):
+        outcome = 'ok' if self.ok else repr(self.error)
+        return f'ChunkResult(index={self.index}, items={len(self.items)}, {outcome})'
+
+
+class BulkStats:
+    """Throughput of a :func:`map_chunks` run, updated as chunks complete"""
+
+    def __init__(self):
+        self.chunks = 0
+        self.failed_chunks = 0
+        self.items = 0
+        self.failed_items = 0
+        #: wall time since the run started
+        self.elapsed = 0.0
+        #: total time spent in the chunk function, over all workers
+        self.busy = 0.0
+        self._start = time.perf_counter()
+
+    def add(self, chunk):
+        """
+        Count a completed chunk
+
+        :param chunk: :class:`ChunkResult`
+        """
+        self.chunks += 1
+        self.items += len(chunk.items)
+        if not chunk.ok:
+            self.failed_chunks += 1
+            self.failed_items += len(chunk.items)
+        self.busy += chunk.elapsed
+        self.elapsed = time.perf_counter() - self._start
+
+    @property
+    def items_per_second(self):
+        """Items of successful chunks per second of wall time"""
+        return (self.items - self.failed_items) / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def chunks_per_second(self):
+        return self.chunks / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def concurrency(self):
+        """Average number of chunks in flight"""
+        return self.busy / self.elapsed if self.elapsed else 0.0
+
+    def to_dict(self):
+        return {
+            'chunks': self.chunks, 'failed_chunks': self.failed_chunks,
+            'items': self.items, 'failed_items': self.failed_items,
+            'elapsed': self.elapsed, 'items_per_second': self.items_per_second,
+            'chunks_per_second': self.chunks_per_second, 'concurrency': self.concurrency,
+        }
+
+    def __repr__(self):
+        return (f'BulkStats(chunks={self.chunks}, failed_chunks={self.failed_chunks}, items={self.items}, '
+                f'elapsed={self.elapsed:.3f}, items_per_second={self.items_per_second:.1f})')
+
+
+def _run_chunk(func, index, items):
+    start = time.perf_counter()
+    try:
+        result = func(items)
+    except Exception as e:  # noqa
+        return ChunkResult(index, items, error=e, elapsed=time.perf_counter() - start)
+    return ChunkResult(index, items, result=result, elapsed=time.perf_counter() - start)
+
+
+def map_chunks(func, items, chunk_size, max_workers=4, stats=None):
+    """
+    Run func over chunks of items with at most max_workers chunks in flight, yielding each
+    :class:`ChunkResult` as it completes. A failed chunk is yielded with its error and
+    does not stop the other chunks. Chunks not yet started when the generator is closed
+    are not run.
+
+    :param func: callable taking a list of items
+    :param items: list of items
+    :param chunk_size: maximum number of items per chunk, see :func:`chunked`
+    :param max_workers: maximum number of concurrent chunks
+    :param stats: :class:`BulkStats` to update as chunks complete
+    :return: generator of ChunkResult, in completion order
+    """
+    chunks = iter(enumerate(chunked(items, chunk_size)))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        in_flight = set()
+        for index, chunk in chunks:
+            in_flight.add(executor.submit(_run_chunk, func, index, chunk))
+            if len(in_flight) < max_workers:
+                continue
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                if stats is not None:
+                    stats.add(future.result())
+                yield future.result()
+        while in_flight:
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                if stats is not None:
+                    stats.add(future.result())
+                yield future.result()
+
+
+def _run_call(func, index, item):
+    try:
+        return index, func(item), None
+    except Exception as e:  # noqa
+        return index, None, e
+
+
+def map_calls(func, items, max_workers=4, ordered=True):
+    """
+    Run func for each item with at most max_workers calls in flight, consuming items lazily
+    so that any number of items can be mapped in bounded memory.
+
+    :param func: callable taking an item
+    :param items: iterable of items
+    :param max_workers: maximum number of concurrent calls
+    :param ordered: yield in the order of items, otherwise as the calls complete
+    :return: generator of (index, result, error) tuples, error is the exception raised by the call or None
+    """
+    items = iter(enumerate(items))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        if ordered:
+            in_flight = deque()
+            for index, item in items:
+                in_flight.append(executor.submit(_run_call, func, index, item))
+                if len(in_flight) >= max_workers:
+                    yield in_flight.popleft().result()
+            while in_flight:
+                yield in_flight.popleft().result()
+            return
+        in_flight = set()
+        for index, item in items:
+            in_flight.add(executor.submit(_run_call, func, index, item))
+            if len(in_flight) < max_workers:
+                continue
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+        while in_flight:
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
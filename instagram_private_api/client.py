@@ -21,15 +21,24 @@ from ssl import SSLError
 from .compat import (
     compat_urllib_parse, compat_urllib_error,
     compat_urllib_request, compat_urllib_parse_urlparse,
-    compat_http_client, jdumps, jloads)
+    compat_http_client)
 from .errors import (
     ErrorHandler, ClientError,
     ClientLoginRequiredError, ClientCookieExpiredError,
     ClientConnectionError
 )
 
+from .compatpatch import ClientCompatPatch
+from .models import Media, Comment, User, Reel, Broadcast
+from .projection import Projection
+from . import schemas
+from .lazy import LazyDocument
+from .json_codecs import get_codec
+from .interning import StringPool
+from . import registry
 from .constants import Constants
-from .http import ClientCookieJar
+from .http import ClientCookieJar, PooledHTTPHandler
+from .bulk import map_calls
 from .endpoints import (
     AccountsEndpointsMixin, DiscoverEndpointsMixin, FeedEndpointsMixin,
     FriendshipsEndpointsMixin, LiveEndpointsMixin, MediaEndpointsMixin,
@@ -74,6 +83,42 @@ class Client(AccountsEndpointsMixin, DiscoverEndpointsMixin, FeedEndpointsMixin,
         :Keyword Arguments:
             - **auto_patch**: Patch the api objects to match the public API. Default: False
             - **drop_incompat_key**: Remove api object keys that is not in the public API. Default: False
+            - **lazy_patch**: With auto_patch, return lazily patched views that only compute the
+              public API fields when they are read, see :meth:`ClientCompatPatch.media_view`. Default: False
+            - **as_models**: Return compact :mod:`models` such as :class:`Media` and :class:`User`
+              instead of api objects, where the endpoint supports it. Implies auto_patch
+              and takes precedence over lazy_patch. Default: False
+            - **projections**: Dict of ``'media'``, ``'comment'`` or ``'user'`` to a :class:`Projection` spec.
+              The fields of those objects not in the projection are dropped as soon as the response
+              is parsed. Projected objects are not patched, but are converted if as_models is set.
+              Implies auto_patch. Default: None
+            - **typed_responses**: Decode the responses of the endpoints that declare a schema, such as
+              :meth:`user_feed`, :meth:`user_followers` and :meth:`media_comments`, into msgspec Structs
+              from :mod:`instagram_private_api.schemas`. These responses are not patched. Responses that
+              do not match their schema are logged and returned as dicts. Requires msgspec. Default: False
+            - **lazy_responses**: Return the responses of :meth:`reels_tray`, :meth:`feed_timeline` and
+              :meth:`explore` as a :class:`LazyDocument` that only parses the fields that are read.
+              These responses are not patched. Default: False
+            - **json_codec**: Name of the json library used to sign requests and parse responses, one of
+              ``'orjson'``, ``'msgspec'``, ``'ujson'``, ``'json'`` or ``'auto'`` for the fastest installed
+              for each direction, see :func:`json_codecs.get_codec`. Default: orjson if installed, otherwise json
+            - **request_json_codec**: Override json_codec for request signing
+            - **response_json_codec**: Override json_codec for response parsing
+            - **intern_strings**: With auto_patch, dedupe the strings of the media, comment and user objects,
+              and models, returned by all calls, so that repeated usernames and urls are kept once.
+              True for a new :class:`StringPool`, or a StringPool to share, e.g. one with
+              ``compact_urls=True`` to also store model urls as :class:`CompactUrl`. Default: False
+            - **response_cache**: A :class:`registry.ResponseCache` to cache the responses of the endpoints
+              with a ttl in :data:`registry.ENDPOINTS`, such as :meth:`user_info`. True for a new
+              ResponseCache. Default: None
+            - **retries**: Number of times an idempotent endpoint is retried on a connection error,
+              throttling or server error. Default: 0
+            - **retry_backoff**: Seconds before the first retry, doubled for each retry. Default: 1
+            - **on_call**: Callback with the metrics labels of the endpoint, the elapsed seconds and the
+              exception or None, after each endpoint call. Default: None
+            - **pool_connections**: Keep up to this many idle connections alive and reuse them for later calls,
+              which saves the connection and TLS handshake of each call, see :meth:`map`. Default: 0,
+              a new connection per call
             - **timeout**: Timeout interval in seconds. Default: 15
             - **api_url**: Override the default api url base
             - **cookie**: Saved cookie string from a previous session
@@ -85,10 +130,28 @@ class Client(AccountsEndpointsMixin, DiscoverEndpointsMixin, FeedEndpointsMixin,
         """
         self.username = username
         self.password = password
-        self.auto_patch = kwargs.pop('auto_patch', False)
+        self.as_models = kwargs.pop('as_models', False)
+        self.projections = {
+            kind: Projection(spec) for kind, spec in (kwargs.pop('projections', None) or {}).items()}
+        self.auto_patch = kwargs.pop('auto_patch', False) or self.as_models or bool(self.projections)
+        self.typed_responses = kwargs.pop('typed_responses', False)
+        self.lazy_responses = kwargs.pop('lazy_responses', False)
+        json_codec = kwargs.pop('json_codec', None)
+        self.request_json_codec = get_codec(kwargs.pop('request_json_codec', None) or json_codec, 'dumps')
+        self.response_json_codec = get_codec(kwargs.pop('response_json_codec', None) or json_codec, 'loads')
+        string_pool = kwargs.pop('intern_strings', None)
+        self.string_pool = StringPool() if string_pool is True else (string_pool or None)
+        if self.typed_responses and schemas.msgspec is None:
+            raise ValueError('typed_responses requires msgspec')
         self.drop_incompat_keys = kwargs.pop('drop_incompat_keys', False)
+        self.lazy_patch = kwargs.pop('lazy_patch', False)
         self.api_url = kwargs.pop('api_url', None) or self.API_URL
         self.timeout = kwargs.pop('timeout', 15)
+        response_cache = kwargs.pop('response_cache', None)
+        self.response_cache = registry.ResponseCache() if response_cache is True else (response_cache or None)
+        self.retries = kwargs.pop('retries', 0)
+        self.retry_backoff = kwargs.pop('retry_backoff', 1)
+        self.on_call = kwargs.pop('on_call', None)
         self.on_login = kwargs.pop('on_login', None)
         self.logger = logger
 
@@ -175,11 +238,15 @@ class Client(AccountsEndpointsMixin, DiscoverEndpointsMixin, FeedEndpointsMixin,
 
         # Allow user to override custom ssl context where possible
         custom_ssl_context = kwargs.pop('custom_ssl_context', None)
-        try:
-            https_handler = compat_urllib_request.HTTPSHandler(context=custom_ssl_context)
-        except TypeError:
-            # py version < 2.7.9
-            https_handler = compat_urllib_request.HTTPSHandler()
+        self.pool_connections = kwargs.pop('pool_connections', 0)
+        if self.pool_connections:
+            https_handler = PooledHTTPHandler(max_idle=self.pool_connections, context=custom_ssl_context)
+        else:
+            try:
+                https_handler = compat_urllib_request.HTTPSHandler(context=custom_ssl_context)
+            except TypeError:
+                # py version < 2.7.9
+                https_handler = compat_urllib_request.HTTPSHandler()
 
         handlers.extend([
             compat_urllib_request.HTTPHandler(),
@@ -383,7 +450,7 @@ class Client(AccountsEndpointsMixin, DiscoverEndpointsMixin, FeedEndpointsMixin,
     def default_headers(self):
         return {
             'User-Agent': self.user_agent,
-            'Connection': 'close',
+            'Connection': 'keep-alive' if self.pool_connections else 'close',
             'Accept': '*/*',
             'Accept-Language': 'en-US',
             'Accept-Encoding': 'gzip, deflate',
@@ -458,21 +525,23 @@ class Client(AccountsEndpointsMixin, DiscoverEndpointsMixin, FeedEndpointsMixin,
         return self.generate_uuid(False, modified_seed)
 
     @staticmethod
-    def _read_response(response):
+    def _read_response(response, decode=True):
         """
         Extract the response body from a http response.
 
         :param response:
+        :param decode: decode the body to str
         :return:
         """
         if response.info().get('Content-Encoding') == 'gzip':
             buf = BytesIO(response.read())
-            res = gzip.GzipFile(fileobj=buf).read().decode('utf8')
+            res = gzip.GzipFile(fileobj=buf).read()
         else:
-            res = response.read().decode('utf8')
-        return res
+            res = response.read()
+        return res.decode('utf8') if decode else res
 
-    def _call_api(self, endpoint, params=None, query=None, return_response=False, unsigned=False, version='v1'):
+    def _call_api(self, endpoint, params=None, query=None, return_response=False, unsigned=False, version='v1',
+                  schema=None, lazy=False):
         """
         Calls the private api.
 
@@ -482,6 +551,8 @@ class Client(AccountsEndpointsMixin, DiscoverEndpointsMixin, FeedEndpointsMixin,
         :param return_response: return the response instead of the parsed json object
         :param unsigned: use post params as-is without signing
         :param version: for the versioned api base url. Default 'v1'.
+        :param schema: name of the :mod:`schemas` struct to decode the response into if typed_responses is set
+        :param lazy: return a :class:`LazyDocument` if lazy_responses is set
         :return:
         """
         url = self.api_url.format(version=version) + endpoint
@@ -496,7 +567,7 @@ class Client(AccountsEndpointsMixin, DiscoverEndpointsMixin, FeedEndpointsMixin,
                 data = b''
             else:
                 if not unsigned:
-                    json_params = jdumps(params)
+                    json_params = self.request_json_codec.dumps(params)
                     hash_sig = self._generate_signature(json_params)
                     post_params = {
                         'ig_sig_key_version': self.key_version,
@@ -526,19 +597,237 @@ class Client(AccountsEndpointsMixin, DiscoverEndpointsMixin, FeedEndpointsMixin,
         if return_response:
             return response
 
-        response_content = self._read_response(response)
+        lazy = lazy and self.lazy_responses
+        response_content = self._read_response(response, decode=not lazy)
         self.logger.debug(f'RESPONSE: {response.code} {response_content}')
-        json_response = jloads(response_content)
+        if lazy:
+            document = LazyDocument(response_content)
+            if document.get('status') == 'ok':
+                return document
+            response_content = response_content.decode('utf8')
+        schema_error = None
+        if schema and self.typed_responses:
+            try:
+                typed_response = schemas.decode(response_content, schema)
+                if typed_response.status == 'ok':
+                    return typed_response
+            except schemas.msgspec.ValidationError as e:
+                schema_error = e
+        # error responses are reported from the generic json
+        json_response = self.response_json_codec.loads(response_content)
 
         if json_response.get('message', '') == 'login_required':
             raise ClientLoginRequiredError(
                 json_response.get('message'), code=response.code,
-                error_response=jdumps(json_response))
+                error_response=self.response_json_codec.dumps(json_response))
 
         # not from oembed or an ok response
         if not json_response.get('provider_url') and json_response.get('status', '') != 'ok':
             raise ClientError(
                 json_response.get('message', 'Unknown error'), code=response.code,
-                error_response=jdumps(json_response))
+                error_response=self.response_json_codec.dumps(json_response))
+
+        if schema_error:
+            # a changed api field should not break the endpoint, the response is returned untyped
+            self.logger.warning(f'Response does not match {schema}, returned as a dict: {schema_error}')
 
         return json_response
+
+    def paginate(self, name, *args, **kwargs):
+        """
+        Page through a paginated endpoint, following the cursor declared in :data:`registry.ENDPOINTS`
+
+        Example:
+            .. code-block:: python
+
+                for page in api.paginate('user_followers', user_id, rank_token):
+                    ...
+
+        :param name: endpoint method name, e.g. ``'user_feed'``
+        :param args: endpoint method args
+        :param kwargs: endpoint method kwargs, including a starting cursor
+        :return: generator of responses
+        """
+        return registry.paginate(self, name, *args, **kwargs)
+
+    def map(self, method, args, concurrency=8, ordered=True, return_exceptions=False):
+        """
+        Call an endpoint for each item of args concurrently, from a pool of threads sharing this client.
+        Only the cookie jar, which every response updates, is guarded by a lock for concurrent calls:
+        do not log in, change the client options or read :attr:`settings` while calls are running.
+        With pool_connections the threads reuse the kept alive connections. Items are consumed as calls
+        complete, so args can be a large iterable.
+
+        Example:
+            .. code-block:: python
+
+                for res in api.map('user_info', user_ids, concurrency=10):
+                    ...
+                for i, res in api.map(api.media_comments, media_ids, ordered=False, return_exceptions=True):
+                    ...
+
+        :param method: endpoint method name, or a callable
+        :param args: iterable of the arguments of each call: a tuple of positional arguments,
+            a dict of keyword arguments, or a single argument
+        :param concurrency: Maximum number of concurrent calls
+        :param ordered: yield results in the order of args, otherwise (index, result) tuples as calls complete
+        :param return_exceptions: yield the exception of a failed call instead of raising it
+        :return: generator
+        """
+        func = getattr(self, method) if isinstance(method, str) else method
+
+        def call(arg):
+            if isinstance(arg, tuple):
+                return func(*arg)
+            if isinstance(arg, dict):
+                return func(**arg)
+            return func(arg)
+
+        for index, result, error in map_calls(call, args, max_workers=concurrency, ordered=ordered):
+            if error is not None:
+                if not return_exceptions:
+                    raise error
+                result = error
+            yield result if ordered else (index, result)
+
+    def gather(self, calls, concurrency=8, return_exceptions=False):
+        """
+        Make different calls concurrently, see :meth:`map`
+
+        Example:
+            .. code-block:: python
+
+                user, feed, stories = api.gather([
+                    ('user_info', (user_id, )),
+                    ('user_feed', (user_id, ), {'max_id': max_id}),
+                    lambda: api.user_story_feed(user_id),
+                ])
+
+        :param calls: list of callables without arguments, or (method, args) or (method, args, kwargs)
+            tuples where method is an endpoint method name or a callable
+        :param concurrency: Maximum number of concurrent calls
+        :param return_exceptions: return the exception of a failed call instead of raising it
+        :return: list of the results, in the order of calls
+        """
+        def call(spec):
+            if callable(spec):
+                return spec()
+            method, args, kwargs = (tuple(spec) + ({}, ))[:3]
+            func = getattr(self, method) if isinstance(method, str) else method
+            return func(*args, **kwargs)
+
+        return list(self.map(
+            call, ((spec, ) for spec in calls), concurrency=concurrency, return_exceptions=return_exceptions))
+
+    def _patch_items(self, items, patch, view, model, kind):
+        """
+        Patch a list of api objects in place, replacing them with projections, models if as_models is set
+        or lazy views if lazy_patch is set. Strings are interned if intern_strings is set.
+
+        :param items: list of api objects
+        :param patch: :class:`ClientCompatPatch` method to patch a list of objects
+        :param view: :class:`ClientCompatPatch` method to get a lazy view of an object
+        :param model: :class:`Model` class
+        :param kind: key in projections
+        :return: items
+        """
+        projection = self.projections.get(kind)
+        if projection:
+            # projected objects are only converted to models, they lack the fields needed to patch them
+            items[:] = [projection(i) for i in items]
+        pool = self.string_pool
+        if self.as_models:
+            from_dict = model.from_dict
+            items[:] = [from_dict(i, pool) for i in items]
+            return items
+        if pool is not None:
+            pool.intern_all(items)
+        if projection:
+            return items
+        elif self.lazy_patch:
+            items[:] = [view(i, drop_incompat_keys=self.drop_incompat_keys) for i in items]
+        else:
+            patch(items, drop_incompat_keys=self.drop_incompat_keys)
+        return items
+
+    def _patch_item(self, item, patch, view, model, kind):
+        """
+        Patch an api object
+
+        :return: the patched object, or its projection, model or lazy view
+        """
+        projection = self.projections.get(kind)
+        if projection:
+            item = projection(item)
+        pool = self.string_pool
+        if self.as_models:
+            return model.from_dict(item, pool)
+        if pool is not None:
+            pool.intern_all(item)
+        if projection:
+            return item
+        if self.lazy_patch:
+            return view(item, drop_incompat_keys=self.drop_incompat_keys)
+        return patch(item, drop_incompat_keys=self.drop_incompat_keys)
+
+    def _patch_medias(self, medias):
+        """Patch a list of media objects in place"""
+        return self._patch_items(medias, ClientCompatPatch.patch_medias, ClientCompatPatch.media_view, Media, 'media')
+
+    def _patch_nested_medias(self, containers, key='media'):
+        """
+        Patch the media objects nested in a list of containers together, e.g. the ``media``
+        of each saved feed item
+
+        :param containers: list of dicts, containers without a media are skipped
+        :param key: key of the media object in each container
+        """
+        containers = [c for c in containers if c.get(key)]
+        medias = self._patch_medias([c[key] for c in containers])
+        for container, media in zip(containers, medias):
+            container[key] = media
+
+    def _patch_media(self, media):
+        """Patch a media object, the patched object should replace the original"""
+        return self._patch_item(media, ClientCompatPatch.media, ClientCompatPatch.media_view, Media, 'media')
+
+    def _patch_comments(self, comments):
+        """Patch a list of comment objects in place"""
+        return self._patch_items(
+            comments, ClientCompatPatch.patch_comments, ClientCompatPatch.comment_view, Comment, 'comment')
+
+    def _patch_comment(self, comment):
+        """Patch a comment object, the patched object should replace the original"""
+        return self._patch_item(comment, ClientCompatPatch.comment, ClientCompatPatch.comment_view, Comment, 'comment')
+
+    def _patch_user(self, user):
+        """Patch a user object, the patched object should replace the original"""
+        return self._patch_item(user, ClientCompatPatch.user, ClientCompatPatch.user_view, User, 'user')
+
+    def _patch_list_users(self, users):
+        """Patch a list of list user objects in place"""
+        return self._patch_items(
+            users, ClientCompatPatch.patch_users, ClientCompatPatch.list_user_view, User, 'user')
+
+    def _patch_list_user(self, user):
+        """Patch a list user object, the patched object should replace the original"""
+        return self._patch_item(user, ClientCompatPatch.list_user, ClientCompatPatch.list_user_view, User, 'user')
+
+    def _patch_reel(self, reel):
+        """Patch the items of a reel object, the patched object should replace the original"""
+        if self.as_models:
+            return Reel.from_dict(reel, self.string_pool)
+        if reel.get('items'):
+            self._patch_medias(reel['items'])
+        return reel
+
+    def _patch_broadcast(self, broadcast):
+        """Convert a broadcast object to a model if as_models is set, there is nothing to patch otherwise"""
+        if self.as_models:
+            return Broadcast.from_dict(broadcast, self.string_pool)
+        if self.string_pool is not None:
+            self.string_pool.intern_all(broadcast)
+        return broadcast
+
+
+registry.install(Client)
@@ -0,0 +1,190 @@
+"""
+Run the jobs of a :mod:`workqueue` with the clients of several accounts, within the rate
+budget of each account.
+"""
+import itertools
+import logging
+import threading
+import time
+
+from .bulk import map_calls
+from .errors import ClientThrottledError
+from .registry import retryable
+
+logger = logging.getLogger(__name__)
+
+
+class RateBudget:
+    """
+    Token buckets of calls per rate limit family, see :data:`registry.ENDPOINTS`, of one account.
+    Each family has a capacity of calls, refilled evenly over a period.
+    """
+
+    def __init__(self, limits=None, default=(200, 3600)):
+        """
+
+        :param limits: dict of family to a (calls, seconds) tuple
+        :param default: (calls, seconds) of the families not in limits
+        """
+        self.limits = dict(limits or {})
+        self.default = default
+        self._buckets = {}
+        self._paused = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, family, now):
+        calls, seconds = self.limits.get(family, self.default)
+        tokens, updated = self._buckets.get(family, (calls, now))
+        tokens = min(calls, tokens + (now - updated) * calls / seconds)
+        self._buckets[family] = (tokens, now)
+        return tokens
+
+    def remaining(self, family, now=None):
+        """Number of calls of a family that can be made now"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if self._paused.get(family, 0) > now:
+                return 0
+            return int(self._bucket(family, now))
+
+    def acquire(self, family, now=None):
+        """
+        Take a call of a family from the budget
+
+        :return: False if there is no call left
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if self._paused.get(family, 0) > now:
+                return False
+            tokens = self._bucket(family, now)
+            if tokens < 1:
+                return False
+            self._buckets[family] = (tokens - 1, now)
+            return True
+
+    def pause(self, family, seconds, now=None):
+        """Leave a family out of the budget for a while, e.g. after the account was throttled"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._paused[family] = now + seconds
+            self._buckets[family] = (0, now + seconds)
+
+
+class ClientPool:
+    """
+    Runs the jobs of a :class:`workqueue.WorkQueue` with the clients of several accounts. Each run
+    leases only as many jobs of each rate limit family as the accounts have budget left for, so
+    that crawlers on many machines sharing a queue each take the jobs they can run now.
+
+    A throttled account pauses the family for throttle_pause seconds and its job is returned to
+    the queue. Other errors are retried by the queue if :func:`registry.retryable`, e.g.
+    connection errors and server errors, and failed otherwise.
+
+    Example:
+        .. code-block:: python
+
+            queue = RedisQueue(RespClient('queue.local'))
+            queue.put('user_info', '25025320')
+            pool = ClientPool([api1, api2], queue, limits={'friendships': (60, 3600)})
+            pool.run()
+    """
+
+    def __init__(self, clients, queue, limits=None, default_limit=(200, 3600), max_workers=4,
+                 throttle_pause=600, keep_results=False):
+        """
+
+        :param clients: list of :class:`Client`, one per account
+        :param queue: :class:`workqueue.WorkQueue`
+        :param limits: dict of rate limit family to a (calls, seconds) budget per account
+        :param default_limit: (calls, seconds) budget per account of the families not in limits
+        :param max_workers: Maximum number of concurrent calls
+        :param throttle_pause: Seconds a family is paused for an account after it is throttled
+        :param keep_results: Keep the responses in the queue, see :meth:`workqueue.WorkQueue.result`
+        """
+        self.clients = list(clients)
+        self.queue = queue
+        self.budgets = [RateBudget(limits, default_limit) for _ in self.clients]
+        self.max_workers = max_workers
+        self.throttle_pause = throttle_pause
+        self.keep_results = keep_results
+        self._next = itertools.cycle(range(len(self.clients)))
+        self._next_lock = threading.Lock()
+
+    def remaining(self, family):
+        """Number of calls of a family the accounts can make now"""
+        return sum(budget.remaining(family) for budget in self.budgets)
+
+    def _acquire(self, family):
+        """Index of a client with budget left for a family, taken in turn, or None"""
+        with self._next_lock:
+            start = next(self._next)
+        for i in range(len(self.clients)):
+            index = (start + i) % len(self.clients)
+            if self.budgets[index].acquire(family):
+                return index
+        return None
+
+    def _run_job(self, job):
+        index = self._acquire(job.family)
+        if index is None:
+            self.queue.release(job)
+            return 'released'
+        try:
+            result = getattr(self.clients[index], job.endpoint)(*job.args, **job.kwargs)
+        except ClientThrottledError as e:
+            logger.warning(f'{job.family} throttled for client {index}, paused for {self.throttle_pause}s: {e}')
+            self.budgets[index].pause(job.family, self.throttle_pause)
+            self.queue.release(job)
+            return 'released'
+        except Exception as e:  # noqa
+            return 'retried' if self.queue.fail(job, e, retry=retryable(e)) else 'failed'
+        self.queue.complete(job, result if self.keep_results else None)
+        return 'done'
+
+    def run_once(self):
+        """
+        Lease and run the jobs that the accounts have budget for
+
+        :return: dict of the number of jobs ``'done'``, ``'retried'``, ``'failed'`` and ``'released'``
+        """
+        self.queue.requeue_expired()
+        jobs = []
+        for family in self.queue.families():
+            remaining = self.remaining(family)
+            if remaining:
+                jobs.extend(self.queue.lease(remaining, [family]))
+        stats = dict.fromkeys(('done', 'retried', 'failed', 'released'), 0)
+        for _, outcome, error in map_calls(self._run_job, jobs, max_workers=self.max_workers):
+            if error is not None:
+                # queue errors, the jobs are leased again once their lease expires
+                logger.error(f'Work queue error: {error!r}')
+                continue
+            stats[outcome] += 1
+        return stats
+
+    def run(self, until_empty=True, poll_interval=5, stop=None):
+        """
+        Run jobs until the queue is empty, or stop is set
+
+        :param until_empty: return when no job is queued or leased, otherwise wait for new jobs
+        :param poll_interval: Seconds to wait when there is no job to run
+        :param stop: :class:`threading.Event` to stop the run
+        :return: dict of the total number of jobs, see :meth:`run_once`
+        """
+        totals = dict.fromkeys(('done', 'retried', 'failed', 'released'), 0)
+        while not (stop is not None and stop.is_set()):
+            stats = self.run_once()
+            for outcome, count in stats.items():
+                totals[outcome] += count
+            if stats['done'] or stats['retried'] or stats['failed']:
+                continue
+            if until_empty:
+                counts = self.queue.counts()
+                if not counts['queued'] and not counts['leased']:
+                    break
+            if stop is not None:
+                stop.wait(poll_interval)
+            else:
+                time.sleep(poll_interval)
+        return totals
@@ -9,25 +9,25 @@ import urllib.error as compat_urllib_error
 import urllib.parse as compat_urllib_parse
 from urllib.parse import urlparse as compat_urllib_parse_urlparse
 import urllib.request as compat_urllib_request
+import json as _json
 
-try:
-    from orjson import dumps as _jdumps, loads as jloads
+from .json_codecs import default_codec
 
-    def jdumps(obj):
-        """orjdumps converted to str"""
-        return _jdumps(obj).decode()
+# orjson if installed, otherwise the standard library json, with the same output either way
+# (except jdump, which keeps the readable formatting of the standard library json)
+jdumps = default_codec().dumps
+jloads = default_codec().loads
 
-    def jdump(obj, fp):
-        """helper to write to file since orjson lacks that functionality"""
-        fp.write(jdumps(obj))
 
-    def jload(fp):
-        """helper to read from file since orjson lacks that functionality"""
-        return jloads(fp.read())
-except ImportError:
-    # fallback to (slower) standard library json if orjson is not found
-    from functools import partial
-    from json import dump as _jdump, dumps as _jdumps, load as jload, loads as jloads
+def jdump(obj, fp):
+    """Write an object as json to a text file, indented and sorted by the standard library json"""
+    codec = default_codec()
+    if codec.name == 'json':
+        _json.dump(obj, fp, indent=4, sort_keys=True, ensure_ascii=False)
+    else:
+        fp.write(codec.dumps(obj))
 
-    jdump = partial(_jdump, indent=4, sort_keys=True, ensure_ascii=False)
-    jdumps = partial(_jdumps, separators=(',', ':'))  # compact encoding
+
+def jload(fp):
+    """Read json from a text or binary file"""
+    return jloads(fp.read())
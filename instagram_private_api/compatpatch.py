@@ -55,8 +55,192 @@ class ClientCompatPatch:
         643: 'SubtleColor',
     }
 
+    #: media_type -> public API ``type``
+    TYPE_NAMES = {
+        MediaTypes.PHOTO: 'image',
+        MediaTypes.VIDEO: 'video',
+        MediaTypes.CAROUSEL: 'carousel',
+    }
+
+    # Precomputed sets of the keys dropped with drop_incompat_keys
+    COMMENT_INCOMPAT_KEYS = frozenset((
+        'bit_flags',
+        'content_type',
+        'created_at',
+        'created_at_utc',
+        'media_id',
+        'pk',
+        'status',
+        'type',
+        'user',
+        'user_id',
+    ))
+    CAPTION_INCOMPAT_KEYS = frozenset((
+        'bit_flags',
+        'content_type',
+        'created_at',
+        'created_at_utc',
+        'has_translation',
+        'media_id',
+        'pk',
+        'status',
+        'type',
+        'user',
+    ))
+    MEDIA_INCOMPAT_KEYS = frozenset((
+        'can_viewer_save',
+        'caption_is_edited',
+        'client_cache_key',
+        'code',
+        'comment_count',
+        'comments_disabled',
+        'comment_likes_enabled',
+        'device_timestamp',
+        'filter_type',
+        'has_audio',
+        'has_liked',
+        'has_more_comments',
+        'image_versions2',
+        'is_reel_media',
+        'lat',
+        'like_count',
+        'lng',
+        'max_num_visible_preview_comments',
+        'media_type',
+        'next_max_id',
+        'organic_tracking_token',
+        'original_height',
+        'original_width',
+        'photo_of_you',
+        'pk',
+        'preview_comments',
+        'reel_mentions',
+        'saved_collection_ids',
+        'taken_at',
+        'top_likers',
+        'video_duration',
+        'video_versions',
+        'view_count',
+        'visibility',
+    ))
+    LOCATION_INCOMPAT_KEYS = frozenset((
+        'address',
+        'city',
+        'external_id',
+        'external_source',
+        'facebook_places_id',
+        'foursquare_v2_id',
+        'lat',
+        'lng',
+        'pk',
+        'state',
+    ))
+    USERTAG_USER_INCOMPAT_KEYS = frozenset(('profile_pic_url', 'pk', 'is_private'))
+    REEL_MENTION_USER_INCOMPAT_KEYS = frozenset(('profile_pic_id', 'profile_pic_url', 'pk', 'is_private'))
+    VIDEO_INCOMPAT_KEYS = frozenset(('type', ))
+    USER_INCOMPAT_KEYS = frozenset((
+        'auto_expand_chaining',
+        'biography',
+        'external_lynx_url',
+        'external_url',
+        'follower_count',
+        'following_count',
+        'geo_media_count',
+        'has_anonymous_profile_picture',
+        'has_chaining',
+        'hd_profile_pic_url_info',
+        'hd_profile_pic_versions',
+        'include_direct_blacklist_status',
+        'is_business',
+        'is_favorite',
+        'is_private',
+        'is_unpublished',
+        'is_verified',
+        'media_count',
+        'pk',
+        'profile_context',
+        'profile_pic_id',
+        'profile_pic_url',
+        'usertags_count',
+    ))
+    LIST_USER_INCOMPAT_KEYS = frozenset((
+        'byline',
+        'follower_count',
+        'friendship_status',
+        'has_anonymous_profile_picture',
+        'has_chaining',
+        'is_favorite',
+        'is_private',
+        'is_unpublished',
+        'is_verified',
+        'mutual_followers_count',
+        'pk',
+        'profile_pic_url',
+        'social_context',
+        'unseen_count',
+    ))
+
+    #: Maximum number of cached selections for :meth:`closest_sizes`
+    CLOSEST_SIZES_CACHE_SIZE = 1024
+    _closest_sizes_cache = {}
+
     @staticmethod
-    def _get_closest_size(medias, width, height=0):
+    def _closest_indices(dimensions, sizes):
+        """
+        Select the closest image/video for each target size in a single pass
+
+        :param dimensions: list of (width, height) of the images/videos
+        :param sizes: list of target widths or (width, height) tuples
+        :return: list of the selected index for each target, None if there are no images/videos
+        """
+        closest = [None] * len(sizes)
+        for i, (media_width, media_height) in enumerate(dimensions):
+            for j, size in enumerate(sizes):
+                width, height = size if isinstance(size, tuple) else (size, 0)
+                current = closest[j]
+                if current is None:
+                    closest[j] = i
+                    continue
+                current_width, current_height = dimensions[current]
+                if (abs(media_width - width) < abs(current_width - width) or
+                        (media_width == current_width and not height and
+                         not media_height == current_width) or
+                        (media_width == current_width and height and
+                         abs(media_height - height) < abs(current_height - height))):
+                    closest[j] = i
+        return closest
+
+    @classmethod
+    def closest_sizes(cls, medias, targets):
+        """
+        Pick the image/video that most matches each target resolution, with the same rules used
+        for the ``images`` and ``videos`` of a patched media.
+
+        ``medias`` is only read once to get the dimensions, and since most media in a page share
+        the same set of dimensions, the selection for each set is cached.
+
+        Example:
+            .. code-block:: python
+
+                sizes = ClientCompatPatch.closest_sizes(
+                    media['image_versions2']['candidates'], {'thumbnail': (150, 150), 'large': 1080})
+                print(sizes['large']['url'])
+
+        :param medias: list of images/videos, e.g. ``image_versions2['candidates']``
+        :param targets: dict of name to the desired width, or a (width, height) tuple
+        :return: dict of name to the closest image/video, or None if ``medias`` is empty
+        """
+        key = (tuple([(m['width'], m['height']) for m in medias]), tuple(targets.values()))
+        indices = cls._closest_sizes_cache.get(key)
+        if indices is None:
+            indices = cls._closest_indices(*key)
+            if len(cls._closest_sizes_cache) >= cls.CLOSEST_SIZES_CACHE_SIZE:
+                cls._closest_sizes_cache.clear()
+            cls._closest_sizes_cache[key] = indices
+        return {name: None if i is None else medias[i] for name, i in zip(targets, indices)}
+
+    @classmethod
+    def _get_closest_size(cls, medias, width, height=0):
         """
         Try to extract a image/video object that will most match the resolution returned by the public API
 
@@ -65,18 +249,7 @@ class ClientCompatPatch:
         :param height: desired height
         :return:
         """
-        current = None
-        for media in medias:
-            if not current:
-                current = media
-            if (abs(media['width'] - width) < abs(current['width'] - width) or
-                    (media['width'] == current['width'] and not height and
-                     not media['height'] == current['width']) or
-                    (media['width'] == current['width'] and height and
-                     abs(media['height'] - height) < abs(current['height'] - height))):
-                current = media
-
-        return current
+        return cls.closest_sizes(medias, {'closest': (width, height)})['closest']
 
     @staticmethod
     def _drop_keys(obj, keys):
@@ -90,127 +263,223 @@ class ClientCompatPatch:
         for k in keys:
             obj.pop(k, None)
 
+    @staticmethod
+    def _from_user(user):
+        """Build the ``from`` object of a comment or caption"""
+        return {
+            'username': user['username'],
+            'profile_picture': user['profile_pic_url'],
+            'id': str(user['pk']),
+            'full_name': user['full_name'],
+        }
+
+    @classmethod
+    def _images(cls, media):
+        """Build the ``images`` object of a media or carousel media"""
+        return cls.closest_sizes(media.get('image_versions2', {}).get('candidates', []), {
+            'low_resolution': 320,
+            'thumbnail': (150, 150),
+            'standard_resolution': media.get('original_width', 1000),
+        })
+
+    @classmethod
+    def _videos(cls, media, drop_incompat_keys=False, copy=False):
+        """
+        Build the ``videos`` object of a media or carousel media
+
+        :param copy: Copy the video versions instead of dropping keys from them in place
+        """
+        videos = cls.closest_sizes(media.get('video_versions', []), {
+            'low_bandwidth': 480,
+            'standard_resolution': media.get('original_width', 640),
+            'low_resolution': 640,
+        })
+        if drop_incompat_keys:
+            if copy:
+                videos = {
+                    k: {vk: vv for vk, vv in v.items() if vk not in cls.VIDEO_INCOMPAT_KEYS} if v else v
+                    for k, v in videos.items()
+                }
+            else:
+                [cls._drop_keys(v, cls.VIDEO_INCOMPAT_KEYS) for v in list(videos.values()) if v]
+        return videos
+
+    @classmethod
+    def _users_in_photo(cls, media, drop_incompat_keys=False, copy=False, reel_mentions=True):
+        """
+        Build the ``users_in_photo`` list from the user tags, or the reel mentions of a story
+
+        :param copy: Copy the tagged users instead of patching them in place
+        :param reel_mentions: Fall back to the reel mentions
+        :return: list, or None if there are no tags
+        """
+        if (media.get('usertags') or {}).get('in'):
+            tags = [
+                ({'y': ut['position'][1], 'x': ut['position'][0]}, ut['user'])
+                for ut in media['usertags']['in']
+            ]
+            incompat_keys = cls.USERTAG_USER_INCOMPAT_KEYS
+        elif reel_mentions and media.get('reel_mentions'):
+            tags = [({'y': rm['y'], 'x': rm['x']}, rm['user']) for rm in media['reel_mentions']]
+            incompat_keys = cls.REEL_MENTION_USER_INCOMPAT_KEYS
+        else:
+            return None
+
+        user_tags = []
+        for pos, user in tags:
+            if copy:
+                user = dict(user)
+            user['id'] = str(user['pk'])
+            user['profile_picture'] = user['profile_pic_url']
+            if drop_incompat_keys:
+                cls._drop_keys(user, incompat_keys)
+            user_tags.append({
+                'position': pos,
+                'user': user,
+            })
+        return user_tags
+
+    @classmethod
+    def _carousel_location(cls, carousel_media, copy=False):
+        """Build the ``location`` of a carousel media"""
+        location = carousel_media.get('location')
+        if not location or not location.get('lat'):
+            return None
+        if copy:
+            location = dict(location)
+        location['latitude'] = location['lat']
+        location['longitude'] = location['lng']
+        location['id'] = location['pk']
+        return location
+
+    @classmethod
+    def _media_location(cls, media, drop_incompat_keys=False, copy=False):
+        """
+        Build the ``location`` of a media, falling back to the story location
+
+        :param copy: Copy the location instead of patching it in place
+        """
+        location = media.get('location') or None
+        if location and copy:
+            location = dict(location)
+        # Try to preserve location even if there's no lat/lng/pk
+        if location and location.get('lat') and location.get('lng') and location.get('pk'):
+            location['latitude'] = location['lat']
+            location['longitude'] = location['lng']
+            location['id'] = location['pk']
+        # For stories
+        if (not location
+                and media.get('story_locations')
+                and media.get('story_locations', [{}])[0].get('location')):
+            story_location = media['story_locations'][0]['location']
+            if (story_location.get('lat')
+                    and story_location.get('lng')
+                    and story_location.get('pk')):
+                location = dict(story_location) if copy else story_location
+        if drop_incompat_keys and location:
+            cls._drop_keys(location, cls.LOCATION_INCOMPAT_KEYS)
+        return location
+
     @classmethod
     def comment(cls, comment, drop_incompat_keys=False):
         """Patch a comment object"""
-        comment['created_time'] = str(int(comment.get('created_at')))
-        from_user = {
-            'username': comment['user']['username'],
-            'profile_picture': comment['user']['profile_pic_url'],
-            'id': str(comment['user']['pk']),
-            'full_name': comment['user']['full_name'],
-        }
-        comment['from'] = from_user
-        comment['id'] = str(comment['pk'])
-        if drop_incompat_keys:
-            cls._drop_keys(
-                comment,
-                [
-                    'bit_flags',
-                    'content_type',
-                    'created_at',
-                    'created_at_utc',
-                    'media_id',
-                    'pk',
-                    'status',
-                    'type',
-                    'user',
-                    'user_id',
-                ]
-            )
-        return comment
+        return cls.patch_comments([comment], drop_incompat_keys=drop_incompat_keys)[0]
+
+    @classmethod
+    def patch_comments(cls, comments, drop_incompat_keys=False):
+        """
+        Patch a list of comment objects in place, see :meth:`comment`
+
+        :param comments: list of comment objects
+        :param drop_incompat_keys:
+        :return: comments
+        """
+        incompat_keys = cls.COMMENT_INCOMPAT_KEYS if drop_incompat_keys else ()
+        from_user = cls._from_user
+        for comment in comments:
+            comment['created_time'] = str(int(comment.get('created_at')))
+            comment['from'] = from_user(comment['user'])
+            comment['id'] = str(comment['pk'])
+            for k in incompat_keys:
+                comment.pop(k, None)
+        return comments
+
+    @classmethod
+    def _patch_captions(cls, captions, drop_incompat_keys=False):
+        """Patch a list of media caption objects in place"""
+        incompat_keys = cls.CAPTION_INCOMPAT_KEYS if drop_incompat_keys else ()
+        from_user = cls._from_user
+        for caption in captions:
+            caption['id'] = str(caption['pk'])
+            caption['created_time'] = str(int(caption['created_at']))
+            caption['from'] = from_user(caption['user'])
+            for k in incompat_keys:
+                caption.pop(k, None)
+        return captions
+
+    @classmethod
+    def _carousel_media(cls, carousel_media, drop_incompat_keys=False):
+        """Patch a carousel media object"""
+        if carousel_media['media_type'] in (MediaTypes.PHOTO, MediaTypes.VIDEO):
+            carousel_media['type'] = cls.TYPE_NAMES[carousel_media['media_type']]
+        carousel_media['images'] = cls._images(carousel_media)
+        if carousel_media['media_type'] == MediaTypes.VIDEO:
+            carousel_media['videos'] = cls._videos(carousel_media, drop_incompat_keys=drop_incompat_keys)
+
+        # patch user tags
+        user_tags = cls._users_in_photo(
+            carousel_media, drop_incompat_keys=drop_incompat_keys, reel_mentions=False)
+        if user_tags is not None:
+            carousel_media['users_in_photo'] = user_tags
+        # patch location
+        carousel_media['location'] = cls._carousel_location(carousel_media)
+        return carousel_media
 
     @classmethod
     def media(cls, media, drop_incompat_keys=False):
         """Patch a media object"""
+        return cls.patch_medias([media], drop_incompat_keys=drop_incompat_keys)[0]
+
+    @classmethod
+    def patch_medias(cls, medias, drop_incompat_keys=False):
+        """
+        Patch a list of media objects in place, see :meth:`media`.
+        The users, captions and comments of all the media are collected and patched together.
+
+        :param medias: list of media objects
+        :param drop_incompat_keys:
+        :return: medias
+        """
+        users = []
+        captions = []
+        comments = []
+        for media in medias:
+            if media['caption']:
+                captions.append(media['caption'])
+            users.append(media['user'])
+            comments.extend(media.get('comments', []))
+            if media.get('preview_comments'):
+                comments.extend(media['preview_comments'])
+            cls._patch_media_fields(media, drop_incompat_keys=drop_incompat_keys)
+        cls._patch_captions(captions, drop_incompat_keys=drop_incompat_keys)
+        cls.patch_users(users, drop_incompat_keys=drop_incompat_keys)
+        cls.patch_comments(comments, drop_incompat_keys=drop_incompat_keys)
+        return medias
+
+    @classmethod
+    def _patch_media_fields(cls, media, drop_incompat_keys=False):
+        """Patch a media object, except for its caption, user and comments"""
         media['link'] = f"https://www.instagram.com/p/{media['code']}/"
         media['created_time'] = str(int(media.get('taken_at') or media.get('device_timestamp')))
 
-        if media['media_type'] == MediaTypes.PHOTO:
-            media['type'] = 'image'
-        elif media['media_type'] == MediaTypes.VIDEO:
-            media['type'] = 'video'
-        elif media['media_type'] == MediaTypes.CAROUSEL:
-            media['type'] = 'carousel'  # will be patched over below
-
-        if media['caption']:
-            media['caption']['id'] = str(media['caption']['pk'])
-            media['caption']['created_time'] = str(int(media['caption']['created_at']))
-            caption_from = {
-                'username': media['caption']['user']['username'],
-                'profile_picture': media['caption']['user']['profile_pic_url'],
-                'id': str(media['caption']['user']['pk']),
-                'full_name': media['caption']['user']['full_name'],
-            }
-            media['caption']['from'] = caption_from
-            if drop_incompat_keys:
-                cls._drop_keys(
-                    media['caption'],
-                    [
-                        'bit_flags',
-                        'content_type',
-                        'created_at',
-                        'created_at_utc',
-                        'has_translation',
-                        'media_id',
-                        'pk',
-                        'status',
-                        'type',
-                        'user',
-                    ]
-                )
-        media['user'] = cls.list_user(media['user'], drop_incompat_keys=drop_incompat_keys)
-        if media['media_type'] == MediaTypes.CAROUSEL and media.get('carousel_media', []):
+        media_type = media['media_type']
+        if media_type in cls.TYPE_NAMES:
+            media['type'] = cls.TYPE_NAMES[media_type]  # carousel will be patched over below
+
+        if media_type == MediaTypes.CAROUSEL and media.get('carousel_media', []):
             # patch carousel media
             for carousel_media in media.get('carousel_media', []):
-                if carousel_media['media_type'] == MediaTypes.PHOTO:
-                    carousel_media['type'] = 'image'
-                elif carousel_media['media_type'] == MediaTypes.VIDEO:
-                    carousel_media['type'] = 'video'
-                image_versions2 = carousel_media.get('image_versions2', {}).get('candidates', [])
-                images = {
-                    'low_resolution': cls._get_closest_size(image_versions2, 320),
-                    'thumbnail': cls._get_closest_size(image_versions2, 150, 150),
-                    'standard_resolution': cls._get_closest_size(
-                        image_versions2, carousel_media.get('original_width', 1000)),
-                }
-                carousel_media['images'] = images
-                if carousel_media['media_type'] == MediaTypes.VIDEO:
-                    video_versions = carousel_media.get('video_versions', [])
-                    videos = {
-                        'low_bandwidth': cls._get_closest_size(video_versions, 480),
-                        'standard_resolution': cls._get_closest_size(
-                            video_versions, carousel_media.get('original_width', 640)),
-                        'low_resolution': cls._get_closest_size(video_versions, 640),
-                    }
-                    if drop_incompat_keys:
-                        [cls._drop_keys(i, ['type']) for i in list(videos.values())]
-                    carousel_media['videos'] = videos
-
-                # patch user tags
-                if carousel_media.get('usertags', {}).get('in', []):
-                    usertags = carousel_media['usertags']['in']
-                    user_tags = []
-                    for ut in usertags:
-                        pos = {'y': ut['position'][1], 'x': ut['position'][0]}
-                        user = ut['user']
-                        user['id'] = str(ut['user']['pk'])
-                        user['profile_picture'] = ut['user']['profile_pic_url']
-                        if drop_incompat_keys:
-                            cls._drop_keys(user, ['profile_pic_url', 'pk', 'is_private'])
-
-                        user_tags.append({
-                            'position': pos,
-                            'user': user,
-                        })
-                    carousel_media['users_in_photo'] = user_tags
-                # patch location
-                if 'location' not in carousel_media or not carousel_media['location'].get('lat'):
-                    carousel_media['location'] = None
-                else:
-                    carousel_media['location']['latitude'] = carousel_media['location']['lat']
-                    carousel_media['location']['longitude'] = carousel_media['location']['lng']
-                    carousel_media['location']['id'] = carousel_media['location']['pk']
+                cls._carousel_media(carousel_media, drop_incompat_keys=drop_incompat_keys)
 
             first_carousel_media = media['carousel_media'][0]
             media['images'] = first_carousel_media['images']
@@ -218,162 +487,30 @@ class ClientCompatPatch:
             if first_carousel_media['media_type'] == MediaTypes.VIDEO:
                 media['videos'] = first_carousel_media['videos']
         else:
-            image_versions2 = media.get('image_versions2', {}).get('candidates', [])
-            images = {
-                'low_resolution': cls._get_closest_size(image_versions2, 320),
-                'thumbnail': cls._get_closest_size(image_versions2, 150, 150),
-                'standard_resolution': cls._get_closest_size(image_versions2, media.get('original_width', 1000)),
-            }
-            media['images'] = images
-
-        if media['media_type'] == MediaTypes.VIDEO:
-            video_versions = media.get('video_versions', [])
-            videos = {
-                'low_bandwidth': cls._get_closest_size(video_versions, 480),
-                'standard_resolution': cls._get_closest_size(video_versions, media.get('original_width', 640)),
-                'low_resolution': cls._get_closest_size(video_versions, 640),
-            }
-            if drop_incompat_keys:
-                [cls._drop_keys(i, ['type']) for i in list(videos.values())]
-            media['videos'] = videos
+            media['images'] = cls._images(media)
+
+        if media_type == MediaTypes.VIDEO:
+            media['videos'] = cls._videos(media, drop_incompat_keys=drop_incompat_keys)
 
-        likes = {
+        media['likes'] = {
             'count': media.get('like_count', 0),
             'data': []
         }
-        media['likes'] = likes
-        comments = {
+        media['comments'] = {
             'count': media.get('comment_count', 0),
-            # Patch comment too
-            'data': [
-                cls.comment(c, drop_incompat_keys=drop_incompat_keys)
-                for c in media.get('comments', [])
-            ]
+            'data': list(media.get('comments', [])),
         }
-        media['comments'] = comments
-        if media.get('preview_comments'):
-            [
-                cls.comment(c, drop_incompat_keys=drop_incompat_keys)
-                for c in media.get('preview_comments', [])
-            ]
 
         media['attribution'] = None
-        if media.get('filter_type') is not None and media.get('filter_type') in cls.FILTERS:
-            media['filter'] = cls.FILTERS[media.get('filter_type')]
-        else:
-            media['filter'] = ''
+        media['filter'] = cls.FILTERS.get(media.get('filter_type'), '')
         media['user_has_liked'] = media.get('has_liked', False)
-
-        # Try to preserve location even if there's no lat/lng/pk
-        if 'location' not in media or not media['location']:
-            media['location'] = None
-        elif (media.get('location', {}).get('lat')
-              and media.get('location', {}).get('lng')
-              and media.get('location', {}).get('pk')):
-            media['location']['latitude'] = media['location']['lat']
-            media['location']['longitude'] = media['location']['lng']
-            media['location']['id'] = media['location']['pk']
-        # For stories
-        if (not media.get('location')
-                and media.get('story_locations')
-                and media.get('story_locations', [{}])[0].get('location')):
-            story_location = media['story_locations'][0]['location']
-            if (story_location.get('lat')
-                    and story_location.get('lng')
-                    and story_location.get('pk')):
-                media['location'] = story_location
-
+        media['location'] = cls._media_location(media, drop_incompat_keys=drop_incompat_keys)
         media['tags'] = []
-        if media.get('usertags', {}).get('in', []):
-            usertags = media['usertags']['in']
-            user_tags = []
-            for ut in usertags:
-                pos = {'y': ut['position'][1], 'x': ut['position'][0]}
-                user = ut['user']
-                user['id'] = str(ut['user']['pk'])
-                user['profile_picture'] = ut['user']['profile_pic_url']
-                if drop_incompat_keys:
-                    cls._drop_keys(user, ['profile_pic_url', 'pk', 'is_private'])
-
-                user_tags.append({
-                    'position': pos,
-                    'user': user,
-                })
-            media['users_in_photo'] = user_tags
-        elif media.get('reel_mentions'):
-            reel_mentions = media['reel_mentions']
-            user_tags = []
-            for rm in reel_mentions:
-                pos = {'y': rm['y'], 'x': rm['x']}
-                user = rm['user']
-                user['id'] = str(rm['user']['pk'])
-                user['profile_picture'] = rm['user']['profile_pic_url']
-                if drop_incompat_keys:
-                    cls._drop_keys(user, ['profile_pic_id', 'profile_pic_url', 'pk', 'is_private'])
-                user_tags.append({
-                    'position': pos,
-                    'user': user,
-                })
-            media['users_in_photo'] = user_tags
-        else:
-            media['users_in_photo'] = []
+        media['users_in_photo'] = cls._users_in_photo(media, drop_incompat_keys=drop_incompat_keys) or []
 
         if drop_incompat_keys:
-            cls._drop_keys(
-                media,
-                [
-                    'can_viewer_save',
-                    'caption_is_edited',
-                    'client_cache_key',
-                    'code',
-                    'comment_count',
-                    'comments_disabled',
-                    'comment_likes_enabled',
-                    'device_timestamp',
-                    'filter_type',
-                    'has_audio',
-                    'has_liked',
-                    'has_more_comments',
-                    'image_versions2',
-                    'is_reel_media',
-                    'lat',
-                    'like_count',
-                    'lng',
-                    'max_num_visible_preview_comments',
-                    'media_type',
-                    'next_max_id',
-                    'organic_tracking_token',
-                    'original_height',
-                    'original_width',
-                    'photo_of_you',
-                    'pk',
-                    'preview_comments',
-                    'reel_mentions',
-                    'saved_collection_ids',
-                    'taken_at',
-                    'top_likers',
-                    'video_duration',
-                    'video_versions',
-                    'view_count',
-                    'visibility',
-                ]
-            )
-            if media['location']:
-                cls._drop_keys(
-                    media['location'],
-                    [
-                        'address',
-                        'city',
-                        'external_id',
-                        'external_source',
-                        'facebook_places_id',
-                        'foursquare_v2_id',
-                        'lat',
-                        'lng',
-                        'pk',
-                        'state',
-                    ]
-                )
+            for k in cls.MEDIA_INCOMPAT_KEYS:
+                media.pop(k, None)
         return media
 
     @classmethod
@@ -391,34 +528,7 @@ class ClientCompatPatch:
             }
             user['counts'] = counts
         if drop_incompat_keys:
-            cls._drop_keys(
-                user,
-                [
-                    'auto_expand_chaining',
-                    'biography',
-                    'external_lynx_url',
-                    'external_url',
-                    'follower_count',
-                    'following_count',
-                    'geo_media_count',
-                    'has_anonymous_profile_picture',
-                    'has_chaining',
-                    'hd_profile_pic_url_info',
-                    'hd_profile_pic_versions',
-                    'include_direct_blacklist_status',
-                    'is_business',
-                    'is_favorite',
-                    'is_private',
-                    'is_unpublished',
-                    'is_verified',
-                    'media_count',
-                    'pk',
-                    'profile_context',
-                    'profile_pic_id',
-                    'profile_pic_url',
-                    'usertags_count',
-                ]
-            )
+            cls._drop_keys(user, cls.USER_INCOMPAT_KEYS)
         return user
 
     @classmethod
@@ -427,26 +537,349 @@ class ClientCompatPatch:
         Patch a list user object, example in
         :meth:`Client.user_following`, :meth:`Client.user_followers`, :meth:`Client.search_users`
         """
-        user['id'] = str(user['pk'])
-        user['profile_picture'] = user['profile_pic_url']
+        return cls.patch_users([user], drop_incompat_keys=drop_incompat_keys)[0]
+
+    @classmethod
+    def patch_users(cls, users, drop_incompat_keys=False):
+        """
+        Patch a list of list user objects in place, see :meth:`list_user`
+
+        :param users: list of list user objects
+        :param drop_incompat_keys:
+        :return: users
+        """
+        incompat_keys = cls.LIST_USER_INCOMPAT_KEYS if drop_incompat_keys else ()
+        for user in users:
+            user['id'] = str(user['pk'])
+            user['profile_picture'] = user['profile_pic_url']
+            for k in incompat_keys:
+                user.pop(k, None)
+        return users
+
+    @classmethod
+    def media_view(cls, media, drop_incompat_keys=False):
+        """
+        Get a lazily patched view of a media object.
+        The fields added by :meth:`media` are only computed when first read and ``media`` is not modified.
+
+        :param media: media object
+        :param drop_incompat_keys: Hide the keys that :meth:`media` drops
+        :return: :class:`MediaView`
+        """
+        return MediaView(media, drop_incompat_keys=drop_incompat_keys)
+
+    @classmethod
+    def comment_view(cls, comment, drop_incompat_keys=False):
+        """Get a lazily patched view of a comment object, see :meth:`media_view`"""
+        return CommentView(comment, drop_incompat_keys=drop_incompat_keys)
+
+    @classmethod
+    def user_view(cls, user, drop_incompat_keys=False):
+        """Get a lazily patched view of a user object, see :meth:`media_view`"""
+        return UserView(user, drop_incompat_keys=drop_incompat_keys)
+
+    @classmethod
+    def list_user_view(cls, user, drop_incompat_keys=False):
+        """Get a lazily patched view of a list user object, see :meth:`media_view`"""
+        return ListUserView(user, drop_incompat_keys=drop_incompat_keys)
+
+
+def _materialize(value):
+    """Materialize the views nested in value"""
+    if isinstance(value, CompatPatchView):
+        value.materialize()
+    elif isinstance(value, dict):
+        for v in value.values():
+            _materialize(v)
+    elif isinstance(value, list):
+        for v in value:
+            _materialize(v)
+
+
+class CompatPatchView(dict):
+    """
+    Base class of the lazily patched views returned by :meth:`ClientCompatPatch.media_view` etc.
+
+    A view is a dict that starts out as a shallow copy of the raw object. The fields added by
+    :class:`ClientCompatPatch` are computed following the same rules the first time they are read,
+    with ``view[key]``, ``view.get(key)`` or ``key in view``, and cached in the view.
+    The raw object is never modified and is available as :attr:`raw`.
+
+    Fields that have not been read yet are not listed when iterating over or serializing the view,
+    call :meth:`materialize` first to compute all of them.
+    """
+
+    #: field -> function computing it from the view, raises KeyError if the field does not apply
+    _fields = {}
+    #: raw keys hidden when drop_incompat_keys is set
+    _incompat_keys = ()
+
+    def __init__(self, raw, drop_incompat_keys=False):
+        super().__init__(raw)
+        self.raw = raw
+        self.drop_incompat_keys = drop_incompat_keys
+        # raw values replaced by their patched version
+        for key in self._fields:
+            dict.pop(self, key, None)
         if drop_incompat_keys:
-            cls._drop_keys(
-                user,
-                [
-                    'byline',
-                    'follower_count',
-                    'friendship_status',
-                    'has_anonymous_profile_picture',
-                    'has_chaining',
-                    'is_favorite',
-                    'is_private',
-                    'is_unpublished',
-                    'is_verified',
-                    'mutual_followers_count',
-                    'pk',
-                    'profile_pic_url',
-                    'social_context',
-                    'unseen_count',
-                ]
-            )
-        return user
+            for key in self._incompat_keys:
+                dict.pop(self, key, None)
+
+    def __missing__(self, key):
+        field = self._fields.get(key)
+        if field is None or (self.drop_incompat_keys and key in self._incompat_keys):
+            raise KeyError(key)
+        value = field(self)
+        self[key] = value
+        return value
+
+    def __contains__(self, key):
+        if dict.__contains__(self, key):
+            return True
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def materialize(self):
+        """
+        Compute all the fields of the view and of the views nested in it
+
+        :return: the view
+        """
+        for key in self._fields:
+            _materialize(self.get(key))
+        return self
+
+
+class CommentView(CompatPatchView):
+    """Lazily patched comment, see :meth:`ClientCompatPatch.comment`"""
+
+    _incompat_keys = ClientCompatPatch.COMMENT_INCOMPAT_KEYS
+
+    def _created_time(self):
+        return str(int(self.raw['created_at']))
+
+    def _from(self):
+        return ClientCompatPatch._from_user(self.raw['user'])
+
+    def _id(self):
+        return str(self.raw['pk'])
+
+    _fields = {
+        'created_time': _created_time,
+        'from': _from,
+        'id': _id,
+    }
+
+
+class CaptionView(CommentView):
+    """Lazily patched media caption"""
+
+    _incompat_keys = ClientCompatPatch.CAPTION_INCOMPAT_KEYS
+
+
+class UserView(CompatPatchView):
+    """Lazily patched user, see :meth:`ClientCompatPatch.user`"""
+
+    _incompat_keys = ClientCompatPatch.USER_INCOMPAT_KEYS
+
+    def _id(self):
+        return str(self.raw['pk'])
+
+    def _bio(self):
+        return self.raw.get('biography', '')
+
+    def _profile_picture(self):
+        return self.raw['profile_pic_url']
+
+    def _website(self):
+        return self.raw.get('external_url', '')
+
+    def _counts(self):
+        return {
+            'media': self.raw['media_count'],
+            'followed_by': self.raw['follower_count'],
+            'follows': self.raw['following_count'],
+        }
+
+    _fields = {
+        'id': _id,
+        'bio': _bio,
+        'profile_picture': _profile_picture,
+        'website': _website,
+        'counts': _counts,
+    }
+
+
+class ListUserView(CompatPatchView):
+    """Lazily patched list user, see :meth:`ClientCompatPatch.list_user`"""
+
+    _incompat_keys = ClientCompatPatch.LIST_USER_INCOMPAT_KEYS
+
+    def _id(self):
+        return str(self.raw['pk'])
+
+    def _profile_picture(self):
+        return self.raw['profile_pic_url']
+
+    _fields = {
+        'id': _id,
+        'profile_picture': _profile_picture,
+    }
+
+
+class CarouselMediaView(CompatPatchView):
+    """Lazily patched carousel media"""
+
+    def _type(self):
+        return ClientCompatPatch.TYPE_NAMES[self.raw['media_type']]
+
+    def _images(self):
+        return ClientCompatPatch._images(self.raw)
+
+    def _videos(self):
+        if self.raw['media_type'] != MediaTypes.VIDEO:
+            raise KeyError('videos')
+        return ClientCompatPatch._videos(self.raw, drop_incompat_keys=self.drop_incompat_keys, copy=True)
+
+    def _users_in_photo(self):
+        user_tags = ClientCompatPatch._users_in_photo(
+            self.raw, drop_incompat_keys=self.drop_incompat_keys, copy=True, reel_mentions=False)
+        if user_tags is None:
+            raise KeyError('users_in_photo')
+        return user_tags
+
+    def _location(self):
+        return ClientCompatPatch._carousel_location(self.raw, copy=True)
+
+    _fields = {
+        'type': _type,
+        'images': _images,
+        'videos': _videos,
+        'users_in_photo': _users_in_photo,
+        'location': _location,
+    }
+
+
+class MediaView(CompatPatchView):
+    """Lazily patched media, see :meth:`ClientCompatPatch.media`"""
+
+    _incompat_keys = ClientCompatPatch.MEDIA_INCOMPAT_KEYS
+
+    def _first_carousel_media(self):
+        """The first patched carousel media, or None if the media is not a carousel"""
+        if self.raw['media_type'] == MediaTypes.CAROUSEL and self.raw.get('carousel_media'):
+            return self['carousel_media'][0]
+        return None
+
+    def _link(self):
+        return f"https://www.instagram.com/p/{self.raw['code']}/"
+
+    def _created_time(self):
+        return str(int(self.raw.get('taken_at') or self.raw.get('device_timestamp')))
+
+    def _type(self):
+        first_carousel_media = self._first_carousel_media()
+        if first_carousel_media is not None:
+            return first_carousel_media['type']
+        return ClientCompatPatch.TYPE_NAMES[self.raw['media_type']]
+
+    def _caption(self):
+        caption = self.raw['caption']
+        if not caption:
+            return caption
+        return CaptionView(caption, drop_incompat_keys=self.drop_incompat_keys)
+
+    def _user(self):
+        return ListUserView(self.raw['user'], drop_incompat_keys=self.drop_incompat_keys)
+
+    def _carousel_media(self):
+        if self.raw['media_type'] == MediaTypes.CAROUSEL and self.raw.get('carousel_media'):
+            return [
+                CarouselMediaView(c, drop_incompat_keys=self.drop_incompat_keys)
+                for c in self.raw['carousel_media']
+            ]
+        return self.raw['carousel_media']
+
+    def _images(self):
+        first_carousel_media = self._first_carousel_media()
+        if first_carousel_media is not None:
+            return first_carousel_media['images']
+        return ClientCompatPatch._images(self.raw)
+
+    def _videos(self):
+        first_carousel_media = self._first_carousel_media()
+        if first_carousel_media is not None:
+            return first_carousel_media['videos']
+        if self.raw['media_type'] != MediaTypes.VIDEO:
+            raise KeyError('videos')
+        return ClientCompatPatch._videos(self.raw, drop_incompat_keys=self.drop_incompat_keys, copy=True)
+
+    def _likes(self):
+        return {
+            'count': self.raw.get('like_count', 0),
+            'data': []
+        }
+
+    def _comments(self):
+        return {
+            'count': self.raw.get('comment_count', 0),
+            'data': [
+                CommentView(c, drop_incompat_keys=self.drop_incompat_keys)
+                for c in self.raw.get('comments', [])
+            ]
+        }
+
+    def _preview_comments(self):
+        preview_comments = self.raw['preview_comments']
+        if not preview_comments:
+            return preview_comments
+        return [CommentView(c, drop_incompat_keys=self.drop_incompat_keys) for c in preview_comments]
+
+    def _attribution(self):
+        return None
+
+    def _filter(self):
+        return ClientCompatPatch.FILTERS.get(self.raw.get('filter_type'), '')
+
+    def _user_has_liked(self):
+        return self.raw.get('has_liked', False)
+
+    def _location(self):
+        return ClientCompatPatch._media_location(
+            self.raw, drop_incompat_keys=self.drop_incompat_keys, copy=True)
+
+    def _tags(self):
+        return []
+
+    def _users_in_photo(self):
+        return ClientCompatPatch._users_in_photo(
+            self.raw, drop_incompat_keys=self.drop_incompat_keys, copy=True) or []
+
+    _fields = {
+        'link': _link,
+        'created_time': _created_time,
+        'type': _type,
+        'caption': _caption,
+        'user': _user,
+        'carousel_media': _carousel_media,
+        'images': _images,
+        'videos': _videos,
+        'likes': _likes,
+        'comments': _comments,
+        'preview_comments': _preview_comments,
+        'attribution': _attribution,
+        'filter': _filter,
+        'user_has_liked': _user_has_liked,
+        'location': _location,
+        'tags': _tags,
+        'users_in_photo': _users_in_photo,
+    }
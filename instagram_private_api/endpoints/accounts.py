@@ -1,6 +1,4 @@
-from ..compat import jloads
 from ..errors import ClientError, ClientLoginError
-from ..compatpatch import ClientCompatPatch
 
 
 class AccountsEndpointsMixin:
@@ -39,7 +37,7 @@ class AccountsEndpointsMixin:
                 'Unable to get csrf from login.',
                 error_response=self._read_response(login_response))
 
-        login_json = jloads(self._read_response(login_response))
+        login_json = self.response_json_codec.loads(self._read_response(login_response))
 
         if not login_json.get('logged_in_user', {}).get('pk'):
             raise ClientLoginError('Unable to login.')
@@ -63,7 +61,7 @@ class AccountsEndpointsMixin:
         params = self.authenticated_params
         res = self._call_api('accounts/current_user/', params=params, query={'edit': 'true'})
         if self.auto_patch:
-            ClientCompatPatch.user(res['user'], drop_incompat_keys=self.drop_incompat_keys)
+            res['user'] = self._patch_user(res['user'])
         return res
 
     def edit_profile(self, first_name, biography, external_url, email, phone_number, gender):
@@ -95,7 +93,7 @@ class AccountsEndpointsMixin:
         params.update(self.authenticated_params)
         res = self._call_api('accounts/edit_profile/', params=params)
         if self.auto_patch:
-            ClientCompatPatch.user(res.get('user'))
+            res['user'] = self._patch_user(res['user'])
         return res
 
     def remove_profile_picture(self):
@@ -103,7 +101,7 @@ class AccountsEndpointsMixin:
         res = self._call_api(
             'accounts/remove_profile_picture/', params=self.authenticated_params)
         if self.auto_patch:
-            ClientCompatPatch.user(res['user'], drop_incompat_keys=self.drop_incompat_keys)
+            res['user'] = self._patch_user(res['user'])
         return res
 
     def change_profile_picture(self, photo_data):
@@ -119,14 +117,14 @@ class AccountsEndpointsMixin:
         """Make account private"""
         res = self._call_api('accounts/set_private/', params=self.authenticated_params)
         if self.auto_patch:
-            ClientCompatPatch.list_user(res['user'], drop_incompat_keys=self.drop_incompat_keys)
+            res['user'] = self._patch_list_user(res['user'])
         return res
 
     def set_account_public(self):
         """Make account public"""""
         res = self._call_api('accounts/set_public/', params=self.authenticated_params)
         if self.auto_patch:
-            ClientCompatPatch.list_user(res['user'], drop_incompat_keys=self.drop_incompat_keys)
+            res['user'] = self._patch_list_user(res['user'])
         return res
 
     def logout(self):
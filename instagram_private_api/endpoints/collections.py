@@ -1,5 +1,4 @@
 from ..compat import jdumps
-from ..compatpatch import ClientCompatPatch
 
 
 class CollectionsEndpointsMixin:
@@ -18,8 +17,7 @@ class CollectionsEndpointsMixin:
         endpoint = f'feed/collection/{collection_id}/'
         res = self._call_api(endpoint, query=kwargs)
         if self.auto_patch and res.get('items'):
-            [ClientCompatPatch.media(m['media'], drop_incompat_keys=self.drop_incompat_keys)
-             for m in res.get('items', []) if m.get('media')]
+            self._patch_nested_medias(res.get('items', []))
         return res
 
     def create_collection(self, name, added_media_ids=None):
@@ -1,7 +1,6 @@
 import warnings
 
 from .common import ClientDeprecationWarning
-from ..compatpatch import ClientCompatPatch
 
 
 class DiscoverEndpointsMixin:
@@ -17,10 +16,9 @@ class DiscoverEndpointsMixin:
         """
         query = {'is_prefetch': 'false', 'is_from_promote': 'false'}
         query.update(kwargs)
-        res = self._call_api('discover/explore/', query=query)
-        if self.auto_patch:
-            [ClientCompatPatch.media(item['media'], drop_incompat_keys=self.drop_incompat_keys)
-             if item.get('media') else item for item in res['items']]
+        res = self._call_api('discover/explore/', query=query, lazy=True)
+        if self.auto_patch and not self.lazy_responses:
+            self._patch_nested_medias(res['items'])
         return res
 
     def discover_channels_home(self):       # pragma: no cover
@@ -31,10 +29,8 @@ class DiscoverEndpointsMixin:
 
         res = self._call_api('discover/channels_home/')
         if self.auto_patch:
-            for item in res.get('items', []):
-                for row_item in item.get('row_items', []):
-                    if row_item.get('media'):
-                        ClientCompatPatch.media(row_item['media'])
+            self._patch_nested_medias(
+                [row_item for item in res.get('items', []) for row_item in item.get('row_items', [])])
         return res
 
     def discover_chaining(self, user_id):
@@ -46,7 +42,7 @@ class DiscoverEndpointsMixin:
         """
         res = self._call_api('discover/chaining/', query={'target_id': user_id})
         if self.auto_patch:
-            [ClientCompatPatch.list_user(user) for user in res.get('users', [])]
+            self._patch_list_users(res.get('users', []))
         return res
 
     def discover_top_live(self, **kwargs):
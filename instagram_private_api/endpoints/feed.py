@@ -1,7 +1,7 @@
 import warnings
 
 from .common import ClientDeprecationWarning
-from ..compatpatch import ClientCompatPatch
+from ..stories import StoryFetcher
 from ..utils import raise_if_invalid_rank_token
 
 
@@ -19,8 +19,7 @@ class FeedEndpointsMixin:
         """
         res = self._call_api('feed/liked/', query=kwargs)
         if self.auto_patch and res.get('items'):
-            [ClientCompatPatch.media(m, drop_incompat_keys=self.drop_incompat_keys)
-             for m in res.get('items', [])]
+            self._patch_medias(res.get('items', []))
         return res
 
     def feed_timeline(self, **kwargs):
@@ -41,11 +40,9 @@ class FeedEndpointsMixin:
             'timezone_offset': self.timezone_offset,
         }
         params.update(kwargs)
-        res = self._call_api('feed/timeline/', params=params, unsigned=True)
-        if self.auto_patch:
-            [ClientCompatPatch.media(m['media_or_ad'], drop_incompat_keys=self.drop_incompat_keys)
-             if m.get('media_or_ad') else m
-             for m in res.get('feed_items', [])]
+        res = self._call_api('feed/timeline/', params=params, unsigned=True, lazy=True)
+        if self.auto_patch and not self.lazy_responses:
+            self._patch_nested_medias(res.get('feed_items', []), key='media_or_ad')
         return res
 
     def feed_popular(self, **kwargs):   # pragma: no cover
@@ -62,8 +59,7 @@ class FeedEndpointsMixin:
         query.update(kwargs)
         res = self._call_api('feed/popular/', query=query)
         if self.auto_patch:
-            [ClientCompatPatch.media(m, drop_incompat_keys=self.drop_incompat_keys)
-             for m in res.get('items', [])]
+            self._patch_medias(res.get('items', []))
         return res
 
     def user_feed(self, user_id, **kwargs):
@@ -77,11 +73,10 @@ class FeedEndpointsMixin:
         :return:
         """
         endpoint = f'feed/user/{user_id}/'
-        res = self._call_api(endpoint, query=kwargs)
+        res = self._call_api(endpoint, query=kwargs, schema='FeedResponse')
 
-        if self.auto_patch:
-            [ClientCompatPatch.media(m, drop_incompat_keys=self.drop_incompat_keys)
-             for m in res.get('items', [])]
+        if self.auto_patch and not self.typed_responses:
+            self._patch_medias(res.get('items', []))
         return res
 
     def self_feed(self, **kwargs):
@@ -99,21 +94,18 @@ class FeedEndpointsMixin:
         :return:
         """
         endpoint = f'feed/user/{user_name}/username/'
-        res = self._call_api(endpoint, query=kwargs)
-        if self.auto_patch:
-            [ClientCompatPatch.media(m, drop_incompat_keys=self.drop_incompat_keys)
-             for m in res.get('items', [])]
+        res = self._call_api(endpoint, query=kwargs, schema='FeedResponse')
+        if self.auto_patch and not self.typed_responses:
+            self._patch_medias(res.get('items', []))
         return res
 
     def reels_tray(self, **kwargs):
         """Get story reels tray"""
-        res = self._call_api('feed/reels_tray/', query=kwargs)
-        if self.auto_patch:
-            for u in res.get('tray', []):
-                if not u.get('items'):
-                    continue
-                [ClientCompatPatch.media(m, drop_incompat_keys=self.drop_incompat_keys)
-                 for m in u.get('items', [])]
+        res = self._call_api('feed/reels_tray/', query=kwargs, lazy=True)
+        if self.auto_patch and not self.lazy_responses:
+            res['tray'] = [self._patch_reel(r) for r in res.get('tray', [])]
+            if res.get('broadcasts'):
+                res['broadcasts'] = [self._patch_broadcast(b) for b in res['broadcasts']]
         return res
 
     def user_reel_media(self, user_id, **kwargs):
@@ -127,8 +119,7 @@ class FeedEndpointsMixin:
         endpoint = f'feed/user/{user_id}/reel_media/'
         res = self._call_api(endpoint, query=kwargs)
         if self.auto_patch:
-            [ClientCompatPatch.media(m, drop_incompat_keys=self.drop_incompat_keys)
-             for m in res.get('items', [])]
+            self._patch_medias(res.get('items', []))
         return res
 
     def reels_media(self, user_ids, **kwargs):
@@ -145,14 +136,23 @@ class FeedEndpointsMixin:
 
         res = self._call_api('feed/reels_media/', params=params)
         if self.auto_patch:
-            for reel_media in res.get('reels_media', []):
-                [ClientCompatPatch.media(m, drop_incompat_keys=self.drop_incompat_keys)
-                 for m in reel_media.get('items', [])]
-            for _, reel in list(res.get('reels', {}).items()):
-                [ClientCompatPatch.media(m, drop_incompat_keys=self.drop_incompat_keys)
-                 for m in reel.get('items', [])]
+            res['reels_media'] = [self._patch_reel(r) for r in res.get('reels_media', [])]
+            if res.get('reels'):
+                res['reels'] = {k: self._patch_reel(r) for k, r in res['reels'].items()}
         return res
 
+    def story_fetcher(self, batch_size=20, max_workers=4, fetch_untracked=True):
+        """
+        Get a :class:`StoryFetcher` to keep the stories of many users up to date,
+        refetching only the reels that changed according to :meth:`reels_tray`
+
+        :param batch_size: Maximum number of users per :meth:`reels_media` call
+        :param max_workers: Maximum number of concurrent calls
+        :param fetch_untracked: Also fetch the users that are not in the reels tray
+        :return: StoryFetcher
+        """
+        return StoryFetcher(self, batch_size=batch_size, max_workers=max_workers, fetch_untracked=fetch_untracked)
+
     def feed_tag(self, tag, rank_token, **kwargs):
         """
         Get tag feed
@@ -174,14 +174,11 @@ class FeedEndpointsMixin:
         res = self._call_api(endpoint, query=query_params)
         if self.auto_patch:
             if res.get('items'):
-                [ClientCompatPatch.media(m, drop_incompat_keys=self.drop_incompat_keys)
-                 for m in res.get('items', [])]
+                self._patch_medias(res.get('items', []))
             if res.get('ranked_items'):
-                [ClientCompatPatch.media(m, drop_incompat_keys=self.drop_incompat_keys)
-                 for m in res.get('ranked_items', [])]
+                self._patch_medias(res.get('ranked_items', []))
             if res.get('story', {}).get('items'):
-                [ClientCompatPatch.media(m, drop_incompat_keys=self.drop_incompat_keys)
-                 for m in res.get('story', {}).get('items', [])]
+                self._patch_medias(res['story']['items'])
         return res
 
     def user_story_feed(self, user_id):
@@ -193,9 +190,11 @@ class FeedEndpointsMixin:
         """
         endpoint = f'feed/user/{user_id}/story/'
         res = self._call_api(endpoint)
-        if self.auto_patch and res.get('reel'):
-            [ClientCompatPatch.media(m, drop_incompat_keys=self.drop_incompat_keys)
-             for m in res.get('reel', {}).get('items', [])]
+        if self.auto_patch:
+            if res.get('reel'):
+                res['reel'] = self._patch_reel(res['reel'])
+            if res.get('broadcast'):
+                res['broadcast'] = self._patch_broadcast(res['broadcast'])
         return res
 
     def feed_location(self, location_id, rank_token, **kwargs):
@@ -223,14 +222,11 @@ class FeedEndpointsMixin:
         res = self._call_api(endpoint, query=query_params)
         if self.auto_patch:
             if res.get('items'):
-                [ClientCompatPatch.media(m, drop_incompat_keys=self.drop_incompat_keys)
-                 for m in res.get('items', [])]
+                self._patch_medias(res.get('items', []))
             if res.get('ranked_items'):
-                [ClientCompatPatch.media(m, drop_incompat_keys=self.drop_incompat_keys)
-                 for m in res.get('ranked_items', [])]
+                self._patch_medias(res.get('ranked_items', []))
             if res.get('story', {}).get('items'):
-                [ClientCompatPatch.media(m, drop_incompat_keys=self.drop_incompat_keys)
-                 for m in res.get('story', {}).get('items', [])]
+                self._patch_medias(res['story']['items'])
         return res
 
     def saved_feed(self, **kwargs):
@@ -243,8 +239,7 @@ class FeedEndpointsMixin:
         """
         res = self._call_api('feed/saved/', query=kwargs)
         if self.auto_patch:
-            [ClientCompatPatch.media(m['media'], drop_incompat_keys=self.drop_incompat_keys)
-             for m in res.get('items', []) if m.get('media')]
+            self._patch_nested_medias(res.get('items', []))
         return res
 
     def feed_only_me(self, **kwargs):
@@ -255,6 +250,5 @@ class FeedEndpointsMixin:
         """
         res = self._call_api('feed/only_me_feed/', query=kwargs)
         if self.auto_patch:
-            [ClientCompatPatch.media(m, drop_incompat_keys=self.drop_incompat_keys)
-             for m in res.get('items', [])]
+            self._patch_medias(res.get('items', []))
         return res
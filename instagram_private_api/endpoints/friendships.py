@@ -1,7 +1,7 @@
 import warnings
 
 from .common import ClientExperimentalWarning
-from ..compatpatch import ClientCompatPatch
+from ..bulk import BulkStats, map_chunks
 from ..utils import raise_if_invalid_rank_token
 
 
@@ -14,8 +14,7 @@ class FriendshipsEndpointsMixin:
             'friendships/autocomplete_user_list/',
             query={'followinfo': 'True', 'version': '2'})
         if self.auto_patch:
-            [ClientCompatPatch.list_user(user, drop_incompat_keys=self.drop_incompat_keys)
-             for user in res['users']]
+            self._patch_list_users(res['users'])
         return res
 
     def user_following(self, user_id, rank_token, **kwargs):
@@ -37,10 +36,9 @@ class FriendshipsEndpointsMixin:
             'rank_token': rank_token,
         }
         query_params.update(kwargs)
-        res = self._call_api(endpoint, query=query_params)
-        if self.auto_patch:
-            [ClientCompatPatch.list_user(u, drop_incompat_keys=self.drop_incompat_keys)
-             for u in res.get('users', [])]
+        res = self._call_api(endpoint, query=query_params, schema='UsersResponse')
+        if self.auto_patch and not self.typed_responses:
+            self._patch_list_users(res.get('users', []))
         return res
 
     def user_followers(self, user_id, rank_token, **kwargs):
@@ -62,18 +60,16 @@ class FriendshipsEndpointsMixin:
             'rank_token': rank_token,
         }
         query_params.update(kwargs)
-        res = self._call_api(endpoint, query=query_params)
-        if self.auto_patch:
-            [ClientCompatPatch.list_user(u, drop_incompat_keys=self.drop_incompat_keys)
-             for u in res.get('users', [])]
+        res = self._call_api(endpoint, query=query_params, schema='UsersResponse')
+        if self.auto_patch and not self.typed_responses:
+            self._patch_list_users(res.get('users', []))
         return res
 
     def friendships_pending(self):
         """Get pending follow requests"""
         res = self._call_api('friendships/pending/')
         if self.auto_patch and res.get('users'):
-            [ClientCompatPatch.list_user(u, drop_incompat_keys=self.drop_incompat_keys)
-             for u in res.get('users', [])]
+            self._patch_list_users(res.get('users', []))
         return res
 
     def friendships_show(self, user_id):
@@ -120,17 +116,73 @@ class FriendshipsEndpointsMixin:
                     }
                 }
         """
-        if isinstance(user_ids, str):
+        if isinstance(user_ids, (str, int)):
             user_ids = [user_ids]
 
         params = {
             '_uuid': self.uuid,
             '_csrftoken': self.csrftoken,
-            'user_ids': ','.join(user_ids)
+            'user_ids': ','.join(str(user_id) for user_id in user_ids)
         }
         res = self._call_api('friendships/show_many/', params=params, unsigned=True)
         return res
 
+    def friendships_show_many_iter(self, user_ids, chunk_size=100, max_workers=4):
+        """
+        Get the friendship status with a large number of user ids. The ids are split into
+        chunks of at most chunk_size ids, fetched with at most max_workers
+        :meth:`friendships_show_many` calls in flight. Each chunk is yielded as it completes,
+        so a failed chunk, e.g. from throttling, can be retried without losing the others.
+
+        .. code-block:: python
+
+            failed = []
+            for chunk in api.friendships_show_many_iter(user_ids):
+                if chunk.ok:
+                    statuses.update(chunk.result)
+                else:
+                    failed.extend(chunk.items)
+
+        :param user_ids: list of user ids
+        :param chunk_size: Maximum number of user ids per call
+        :param max_workers: Maximum number of concurrent calls
+        :return: generator of :class:`bulk.ChunkResult`, with the ``friendship_statuses``
+            dict of the chunk as result
+        """
+        return map_chunks(self._friendship_statuses, user_ids, chunk_size, max_workers=max_workers)
+
+    def _friendship_statuses(self, user_ids):
+        return self.friendships_show_many(user_ids).get('friendship_statuses', {})
+
+    def friendships_show_many_bulk(self, user_ids, chunk_size=100, max_workers=4):
+        """
+        Get the friendship status with a large number of user ids, see :meth:`friendships_show_many_iter`
+
+        :param user_ids: list of user ids
+        :param chunk_size: Maximum number of user ids per call
+        :param max_workers: Maximum number of concurrent calls
+        :return:
+            .. code-block:: javascript
+
+                {
+                    "friendship_statuses": {
+                        "123456789": {"following": false, ...}
+                    },
+                    "failed_user_ids": ["987654321"],
+                    "errors": [ClientThrottledError(...)],
+                    "stats": BulkStats(...)
+                }
+        """
+        stats = BulkStats()
+        res = {'friendship_statuses': {}, 'failed_user_ids': [], 'errors': [], 'stats': stats}
+        for chunk in map_chunks(self._friendship_statuses, user_ids, chunk_size, max_workers=max_workers, stats=stats):
+            if chunk.ok:
+                res['friendship_statuses'].update(chunk.result)
+            else:
+                res['failed_user_ids'].extend(chunk.items)
+                res['errors'].append(chunk.error)
+        return res
+
     def friendships_create(self, user_id):
         """
         Follow a user
@@ -337,8 +389,7 @@ class FriendshipsEndpointsMixin:
         warnings.warn('This endpoint is experimental. Do not use.', ClientExperimentalWarning)
         res = self._call_api('friendships/blocked_reels/', params=self.authenticated_params)
         if self.auto_patch and res.get('users'):
-            [ClientCompatPatch.list_user(u, drop_incompat_keys=self.drop_incompat_keys)
-             for u in res.get('users', [])]
+            self._patch_list_users(res.get('users', []))
         return res
 
     def enable_post_notifications(self, user_id):
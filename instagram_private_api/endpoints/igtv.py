@@ -1,6 +1,5 @@
 import re
 
-from ..compatpatch import ClientCompatPatch
 
 USER_CHANNEL_ID_RE = r'^user_[1-9]\d+$'
 
@@ -27,8 +26,7 @@ class IGTVEndpointsMixin:
         res = self._call_api(endpoint, params=params)
 
         if self.auto_patch:
-            [ClientCompatPatch.media(m, drop_incompat_keys=self.drop_incompat_keys)
-             for m in res.get('items', [])]
+            self._patch_medias(res.get('items', []))
 
         return res
 
@@ -37,10 +35,8 @@ class IGTVEndpointsMixin:
         res = self._call_api('igtv/tv_guide/')
         if self.auto_patch:
             for c in res.get('channels', []):
-                [ClientCompatPatch.media(m, drop_incompat_keys=self.drop_incompat_keys)
-                 for m in c.get('items', [])]
-            [ClientCompatPatch.media(m, drop_incompat_keys=self.drop_incompat_keys)
-             for m in res.get('my_channel', {}).get('items', [])]
+                self._patch_medias(c.get('items', []))
+            self._patch_medias(res.get('my_channel', {}).get('items', []))
         return res
 
     def search_igtv(self, text):
@@ -56,8 +52,7 @@ class IGTVEndpointsMixin:
         res = self._call_api('igtv/search/', query={'query': text})
         if self.auto_patch:
             for r in res.get('results', []):
-                [ClientCompatPatch.media(m, drop_incompat_keys=self.drop_incompat_keys)
-                 for m in r.get('channel', {}).get('items', [])]
+                self._patch_medias(r.get('channel', {}).get('items', []))
                 if r.get('user'):
-                    ClientCompatPatch.user(r['user'], drop_incompat_keys=self.drop_incompat_keys)
+                    r['user'] = self._patch_user(r['user'])
         return res
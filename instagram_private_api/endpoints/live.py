@@ -1,5 +1,4 @@
 from ..utils import gen_user_breadcrumb
-from ..compatpatch import ClientCompatPatch
 
 
 class LiveEndpointsMixin:
@@ -54,9 +53,9 @@ class LiveEndpointsMixin:
         endpoint = f'live/{broadcast_id}/get_comment/'
         res = self._call_api(endpoint, query={'last_comment_ts': last_comment_ts})
         if self.auto_patch and res.get('comments'):
-            [ClientCompatPatch.comment(c) for c in res.get('comments', [])]
+            self._patch_comments(res.get('comments', []))
             if res.get('pinned_comment'):
-                ClientCompatPatch.comment(res['pinned_comment'])
+                res['pinned_comment'] = self._patch_comment(res['pinned_comment'])
         return res
 
     def broadcast_heartbeat_and_viewercount(self, broadcast_id):
@@ -94,7 +93,7 @@ class LiveEndpointsMixin:
         params.update(self.authenticated_params)
         res = self._call_api(endpoint, params=params)
         if self.auto_patch and res.get('comment'):
-            ClientCompatPatch.comment(res['comment'])
+            res['comment'] = self._patch_comment(res['comment'])
         return res
 
     def broadcast_info(self, broadcast_id):
@@ -148,7 +147,10 @@ class LiveEndpointsMixin:
         :param kwargs:
         :return:
         """
-        return self._call_api('live/get_suggested_broadcasts/', query=kwargs)
+        res = self._call_api('live/get_suggested_broadcasts/', query=kwargs)
+        if self.auto_patch and res.get('broadcasts'):
+            res['broadcasts'] = [self._patch_broadcast(b) for b in res['broadcasts']]
+        return res
 
     def replay_broadcast_comments(
             self, broadcast_id, starting_offset=0,
@@ -169,8 +171,9 @@ class LiveEndpointsMixin:
         endpoint = f'live/{broadcast_id}/get_post_live_comments/'
         res = self._call_api(endpoint, query=query)
         if self.auto_patch and res.get('comments'):
-            [ClientCompatPatch.comment(c['comment']) for c in res.get('comments', [])
-             if c.get('comment')]
+            for c in res.get('comments', []):
+                if c.get('comment'):
+                    c['comment'] = self._patch_comment(c['comment'])
         return res
 
     def replay_broadcast_likes(
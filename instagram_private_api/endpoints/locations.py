@@ -1,7 +1,7 @@
 import time
 
 from ..compat import jdumps
-from ..compatpatch import ClientCompatPatch
+from ..pagination import SectionPaginator, SearchPaginator
 from ..utils import raise_if_invalid_rank_token
 
 
@@ -93,6 +93,22 @@ class LocationsEndpointsMixin:
         query_params.update(kwargs)
         return self._call_api('fbsearch/places/', query=query_params)
 
+    def location_fb_search_iter(self, query, rank_token=None, **kwargs):
+        """
+        Get a paginator for all the results of a location search. See :class:`SearchPaginator`.
+
+        :param query: search terms
+        :param rank_token: Optional, one will be generated if not specified
+        :param kwargs:
+            - **max_exclude**, **max_url_length**, **trim**: exclusion list limits for :class:`SearchPaginator`
+        :return: :class:`SearchPaginator`, iterate over it to get the location results
+        """
+        paginator_kwargs = {k: kwargs.pop(k) for k in ('max_exclude', 'max_url_length', 'trim') if k in kwargs}
+        return SearchPaginator(
+            lambda token, exclude_list: self.location_fb_search(query, token, exclude_list=exclude_list, **kwargs),
+            get_id=lambda i: i['location']['pk'], rank_token=rank_token or self.generate_uuid(),
+            results_key='items', **paginator_kwargs)
+
     def location_section(self, location_id, rank_token, tab='ranked', **kwargs):
         """
         Get a location feed
@@ -133,18 +149,31 @@ class LocationsEndpointsMixin:
 
         params.update(kwargs)
         results = self._call_api(endpoint, params=params, unsigned=True)
-        extracted_medias = []
         if self.auto_patch:
-            for s in results.get('sections', []):
-                for m in s.get('layout_content', {}).get('medias', []):
-                    if m.get('media'):
-                        ClientCompatPatch.media(m['media'], drop_incompat_keys=self.drop_incompat_keys)
-                        if extract_media_only:
-                            extracted_medias.append(m['media'])
+            self._patch_nested_medias([
+                m for section in results.get('sections', [])
+                for m in (section.get('layout_content') or {}).get('medias', [])])
         if extract_media_only:
-            return extracted_medias
+            return SectionPaginator.extract_medias(results)
         return results
 
+    def location_section_iter(self, location_id, rank_token, tabs=('ranked', 'recent'), **kwargs):
+        """
+        Get a paginator for the media in one or more location feed sections, paging through each tab in turn.
+        Media is deduped by pk across pages and tabs.
+
+        :param location_id:
+        :param rank_token: Required for paging through a single feed and can be generated with
+            :meth:`generate_uuid`.
+        :param tabs: list of tabs from 'ranked', 'recent'
+        :param kwargs: Additional kwargs for :meth:`location_section`
+        :return: :class:`SectionPaginator`, iterate over it to get the media objects
+        """
+        kwargs.pop('extract', None)
+        return SectionPaginator(
+            lambda tab, **cursor: self.location_section(location_id, rank_token, tab=tab, **dict(kwargs, **cursor)),
+            tabs)
+
     def location_stories(self, location_id, **kwargs):
         """
         Get a location story feed
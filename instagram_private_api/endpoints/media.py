@@ -1,15 +1,21 @@
 import re
 import warnings
-import time
 
-from random import randint
+from concurrent.futures import ThreadPoolExecutor
 
 from .common import ClientExperimentalWarning, MediaTypes
+from ..bulk import BulkStats, map_chunks
 from ..compat import jdumps
-from ..compatpatch import ClientCompatPatch
+from ..loaders import MediaInfoLoader
+from ..reporters import SeenReporter, reels_seen
 from ..utils import gen_user_breadcrumb
 
 
+def _comment_pk(comment):
+    """Get the pk of a comment, whether patched or not"""
+    return comment.get('pk') or int(comment['id'])
+
+
 class MediaEndpointsMixin:
     """For endpoints in ``/media/``."""
 
@@ -23,8 +29,7 @@ class MediaEndpointsMixin:
         endpoint = f'media/{media_id}/info/'
         res = self._call_api(endpoint)
         if self.auto_patch:
-            [ClientCompatPatch.media(m, drop_incompat_keys=self.drop_incompat_keys)
-             for m in res.get('items', [])]
+            self._patch_medias(res.get('items', []))
         return res
 
     def medias_info(self, media_ids):
@@ -47,10 +52,21 @@ class MediaEndpointsMixin:
         }
         res = self._call_api('media/infos/', query=params)
         if self.auto_patch:
-            [ClientCompatPatch.media(m, drop_incompat_keys=self.drop_incompat_keys)
-             for m in res.get('items', [])]
+            self._patch_medias(res.get('items', []))
         return res
 
+    def media_info_loader(self, max_batch_size=50, wait=0.01, max_workers=4):
+        """
+        Get a :class:`MediaInfoLoader` that batches single media lookups from
+        threads and asyncio tasks into :meth:`medias_info` calls
+
+        :param max_batch_size: Maximum number of media ids per call
+        :param wait: Seconds to wait for more lookups after the first lookup of a batch
+        :param max_workers: Maximum number of concurrent calls
+        :return: MediaInfoLoader
+        """
+        return MediaInfoLoader(self, max_batch_size=max_batch_size, wait=wait, max_workers=max_workers)
+
     def media_permalink(self, media_id):
         """
         Get media permalink
@@ -77,52 +93,95 @@ class MediaEndpointsMixin:
         }
         if kwargs:
             query.update(kwargs)
-        res = self._call_api(endpoint, query=query)
+        res = self._call_api(endpoint, query=query, schema='CommentsResponse')
 
-        if self.auto_patch:
-            [ClientCompatPatch.comment(c, drop_incompat_keys=self.drop_incompat_keys)
-             for c in res.get('comments', [])]
-            [ClientCompatPatch.comment(c, drop_incompat_keys=self.drop_incompat_keys)
-             for c in res.get('preview_comments', [])]
+        if self.auto_patch and not self.typed_responses:
+            self._patch_comments(res.get('comments', []))
+            self._patch_comments(res.get('preview_comments', []))
         return res
 
-    def media_n_comments(self, media_id, n=150, reverse=False, **kwargs):
+    def _media_comments_pages(self, media_id, directions=('max_id', 'min_id'), **kwargs):
         """
-        Helper method to retrieve n number of comments for a media id
+        Generator for the raw pages of a media's comments. From the first page, older comments are
+        followed via ``has_more_comments``/``next_max_id`` and newer comments via
+        ``has_more_headload_comments``/``next_min_id``, one direction after the other, so that
+        the pages of each direction are in time order.
 
         :param media_id: Media id
-        :param n: Minimum number of comments to fetch
-        :param reverse: Reverse list of comments (ordered by created_time)
+        :param directions: Cursors to follow, in order: ``'max_id'`` for older comments, ``'min_id'`` for newer
         :param kwargs:
+            **max_id**, **min_id**: Starting cursor
         :return:
         """
-
         endpoint = f'media/{media_id}/comments/'
+        cursors = {
+            'max_id': ('has_more_comments', 'next_max_id'),
+            'min_id': ('has_more_headload_comments', 'next_min_id'),
+        }
+        base_query = {k: v for k, v in kwargs.items() if k not in cursors}
+        first = self._call_api(endpoint, query=kwargs)
+        yield first
+        for cursor_key in directions:
+            has_more_key, next_cursor_key = cursors[cursor_key]
+            query, results = kwargs, first
+            # bail out if no comments returned
+            while results.get('comments'):
+                next_cursor = results.get(next_cursor_key)
+                if not (results.get(has_more_key) and next_cursor and next_cursor != query.get(cursor_key)):
+                    break
+                query = dict(base_query)
+                query[cursor_key] = next_cursor
+                results = self._call_api(endpoint, query=query)
+                yield results
+
+    def media_comments_iter(self, media_id, reverse=True, **kwargs):
+        """
+        Generator for a media's comments in time order. Comments are paged through on demand, one
+        page at a time, so the generator can be stopped early without fetching the remaining pages.
+
+        Pages are followed in one direction only, which keeps the order exact: newest first towards
+        older comments via ``next_max_id``, or oldest first towards newer comments via ``next_min_id``.
+        Without a cursor the first page holds the newest comments, so all the comments are streamed
+        newest first. To stream oldest first, start from a ``min_id`` cursor, or use
+        :meth:`media_n_comments` which sorts all the fetched comments.
 
-        comments = []
-        results = self._call_api(endpoint, query=kwargs)
-        comments.extend(results.get('comments', []))
-
-        while (((results.get('has_more_comments') and results.get('next_max_id'))
-                or (results.get('has_more_headload_comments') and results.get('next_min_id')))
-                and len(comments) < n):
+        :param media_id: Media id
+        :param reverse: Yield newer comments first and page towards older comments, otherwise
+            yield older comments first and page towards newer comments
+        :param kwargs:
+            **max_id**, **min_id**: Starting cursor
+        :return:
+        """
+        direction = 'max_id' if reverse else 'min_id'
+        for results in self._media_comments_pages(media_id, directions=(direction,), **kwargs):
+            comments = results.get('comments', [])
+            # read the sort key first because patching may drop it
+            comments = sorted(
+                comments, key=lambda c: c.get('created_at_utc') or c.get('created_at') or 0, reverse=reverse)
+            for c in comments:
+                yield self._patch_comment(c) if self.auto_patch else c
 
-            if results.get('has_more_comments'):
-                kwargs.update({'max_id': results.get('next_max_id')})
-            else:
-                kwargs.update({'min_id': results.get('next_min_id')})
+    def media_n_comments(self, media_id, n=150, reverse=False, **kwargs):
+        """
+        Helper method to retrieve n number of comments for a media id.
+        Use :meth:`media_comments_iter` to stream comments instead.
 
-            results = self._call_api(endpoint, query=kwargs)
+        :param media_id: Media id
+        :param n: Minimum number of comments to fetch
+        :param reverse: Reverse list of comments (ordered by created_time)
+        :param kwargs:
+        :return:
+        """
+        comments = []
+        for results in self._media_comments_pages(media_id, **kwargs):
             comments.extend(results.get('comments', []))
-            if not (results.get('next_max_id') or results.get('next_min_id') or results.get('comments')):
-                # bail out if no max_id/min_id or comments returned
+            if len(comments) >= n:
                 break
+        comments.sort(key=lambda k: k['created_at_utc'], reverse=reverse)
 
         if self.auto_patch:
-            [ClientCompatPatch.comment(c, drop_incompat_keys=self.drop_incompat_keys)
-             for c in comments]
-
-        return sorted(comments, key=lambda k: k['created_at_utc'], reverse=reverse)
+            self._patch_comments(comments)
+        return comments
 
     def comment_replies(self, media_id, comment_id, **kwargs):
         """
@@ -140,9 +199,9 @@ class MediaEndpointsMixin:
         res = self._call_api(endpoint, query=kwargs)
 
         if self.auto_patch:
-            [ClientCompatPatch.comment(c, drop_incompat_keys=self.drop_incompat_keys)
-             for c in res.get('child_comments', [])]
-            ClientCompatPatch.comment(res.get('parent_comment'))
+            self._patch_comments(res.get('child_comments', []))
+            if res.get('parent_comment'):
+                res['parent_comment'] = self._patch_comment(res['parent_comment'])
         return res
 
     def comment_inline_replies(self, media_id, comment_id, max_id, **kwargs):
@@ -162,11 +221,105 @@ class MediaEndpointsMixin:
             query.update(kwargs)
         res = self._call_api(endpoint, query=query)
         if self.auto_patch:
-            [ClientCompatPatch.comment(c, drop_incompat_keys=self.drop_incompat_keys)
-             for c in res.get('child_comments', [])]
-            ClientCompatPatch.comment(res.get('parent_comment'))
+            self._patch_comments(res.get('child_comments', []))
+            if res.get('parent_comment'):
+                res['parent_comment'] = self._patch_comment(res['parent_comment'])
         return res
 
+    def _comment_thread_replies(self, media_id, parent):
+        """
+        Get all the replies to a parent comment from ``media_comments()``, continuing from
+        its inline replies cursor and falling back to the full replies pages for any
+        replies not reachable from the inline cursor.
+
+        :param media_id: Media id
+        :param parent: Parent comment object
+        :return: list of reply comments, may contain duplicates
+        """
+        parent_pk = _comment_pk(parent)
+        replies = []
+        cursor = parent.get('next_max_child_cursor') if parent.get('has_more_tail_child_comments') else None
+        while cursor:
+            results = self.comment_inline_replies(media_id, parent_pk, cursor)
+            replies.extend(results.get('child_comments', []))
+            next_cursor = results.get('next_max_child_cursor')
+            if not (results.get('has_more_tail_child_comments') and results.get('child_comments')):
+                break
+            cursor = next_cursor if next_cursor != cursor else None
+
+        known = len({_comment_pk(c) for c in replies + parent.get('preview_child_comments', [])})
+        if known >= parent.get('child_comment_count', 0):
+            return replies
+
+        pending = [{}]
+        while pending:
+            query = pending.pop(0)
+            results = self.comment_replies(media_id, parent_pk, **query)
+            replies.extend(results.get('child_comments', []))
+            if not results.get('child_comments'):
+                continue
+            if ('min_id' not in query and results.get('has_more_tail_child_comments')
+                    and results.get('next_max_child_cursor')):
+                pending.append({'max_id': results['next_max_child_cursor']})
+            if ('max_id' not in query and results.get('has_more_head_child_comments')
+                    and results.get('next_min_child_cursor')):
+                pending.append({'min_id': results['next_min_child_cursor']})
+        return replies
+
+    def media_comment_threads(self, media_id, max_workers=4, **kwargs):
+        """
+        Get all the comments of a media together with all their replies.
+        Parent comments are paged through with ``media_comments()`` while the replies of
+        each parent are fetched concurrently, with at most ``max_workers`` requests in flight.
+
+        :param media_id: Media id
+        :param max_workers: Maximum number of concurrent requests for replies
+        :param kwargs:
+            **max_id**, **min_id**: Starting cursor
+        :return: dict of parent comment pk to the thread, with replies ordered by pk
+
+            .. code-block:: javascript
+
+                {
+                    17881229782160892: {
+                        "comment": {"pk": 17881229782160892, "text": "...", ...},
+                        "replies": [{"pk": 17881229782160899, "text": "...", ...}]
+                    }
+                }
+        """
+        threads = {}
+        futures = {}
+        preview_pks = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for results in self._media_comments_pages(media_id, can_support_threading='true', **kwargs):
+                for parent in results.get('comments', []):
+                    previews = parent.get('preview_child_comments') or []
+                    parent_pk = _comment_pk(parent)
+                    if parent_pk in threads:
+                        continue
+                    if parent.get('child_comment_count', 0) > len(previews):
+                        futures[parent_pk] = executor.submit(self._comment_thread_replies, media_id, parent)
+                    # replies are keyed by pk to dedupe inline and full reply pages
+                    threads[parent_pk] = {'comment': parent, 'replies': {_comment_pk(c): c for c in previews}}
+                    preview_pks[parent_pk] = list(threads[parent_pk]['replies'])
+
+            for parent_pk, future in futures.items():
+                replies = threads[parent_pk]['replies']
+                for c in future.result():
+                    replies.setdefault(_comment_pk(c), c)
+
+        for parent_pk, thread in threads.items():
+            parent = thread['comment']
+            parent.pop('preview_child_comments', None)
+            replies = thread['replies']
+            if self.auto_patch:
+                thread['comment'] = self._patch_comment(parent)
+                # inline previews are not patched by media_comments()
+                for reply_pk in preview_pks[parent_pk]:
+                    replies[reply_pk] = self._patch_comment(replies[reply_pk])
+            thread['replies'] = [c for _, c in sorted(replies.items())]
+        return threads
+
     def edit_media(self, media_id, caption, usertags=None):
         """
         Edit a media's caption
@@ -192,7 +345,7 @@ class MediaEndpointsMixin:
             params['usertags'] = jdumps(utags)
         res = self._call_api(endpoint, params=params)
         if self.auto_patch:
-            ClientCompatPatch.media(res.get('media'))
+            res['media'] = self._patch_media(res['media'])
         return res
 
     def delete_media(self, media_id):
@@ -264,7 +417,7 @@ class MediaEndpointsMixin:
         params.update(self.authenticated_params)
         res = self._call_api(endpoint, params=params)
         if self.auto_patch:
-            ClientCompatPatch.comment(res['comment'], drop_incompat_keys=self.drop_incompat_keys)
+            res['comment'] = self._patch_comment(res['comment'])
         return res
 
     def delete_comment(self, media_id, comment_id):
@@ -306,6 +459,40 @@ class MediaEndpointsMixin:
         res = self._call_api(endpoint, params=params)
         return res
 
+    def bulk_delete_comments_chunked(self, media_id, comment_ids, chunk_size=25, max_workers=2):
+        """
+        Delete any number of comments of a media, with concurrent :meth:`bulk_delete_comments` calls
+        of at most chunk_size comments, the number of comments the app allows to select at once.
+        Chunks that fail are reported without losing the others.
+
+        :param media_id: Media id
+        :param comment_ids: List of comment ids
+        :param chunk_size: Maximum number of comments per call
+        :param max_workers: Maximum number of concurrent calls
+        :return:
+            .. code-block:: javascript
+
+                {
+                    "deleted_comment_ids": ["17881229782160892"],
+                    "failed_comment_ids": ["17881229782160899"],
+                    "errors": [ClientThrottledError(...)],
+                    "stats": BulkStats(...)
+                }
+        """
+        stats = BulkStats()
+        res = {'deleted_comment_ids': [], 'failed_comment_ids': [], 'errors': [], 'stats': stats}
+
+        def delete(chunk):
+            return self.bulk_delete_comments(media_id, chunk)
+
+        for chunk in map_chunks(delete, comment_ids, chunk_size, max_workers=max_workers, stats=stats):
+            if chunk.ok:
+                res['deleted_comment_ids'].extend(chunk.items)
+            else:
+                res['failed_comment_ids'].extend(chunk.items)
+                res['errors'].append(chunk.error)
+        return res
+
     def media_likers(self, media_id, **kwargs):
         """
         Get users who have liked a post
@@ -316,8 +503,7 @@ class MediaEndpointsMixin:
         endpoint = f'media/{media_id}/likers/'
         res = self._call_api(endpoint, query=kwargs)
         if self.auto_patch:
-            [ClientCompatPatch.list_user(u, drop_incompat_keys=self.drop_incompat_keys)
-             for u in res.get('users', [])]
+            self._patch_list_users(res.get('users', []))
         return res
 
     def media_likers_chrono(self, media_id):
@@ -331,8 +517,7 @@ class MediaEndpointsMixin:
         warnings.warn('This endpoint is experimental. Do not use.', ClientExperimentalWarning)
         res = self._call_api(f'media/{media_id}/likers_chrono/')
         if self.auto_patch:
-            [ClientCompatPatch.list_user(u, drop_incompat_keys=self.drop_incompat_keys)
-             for u in res.get('users', [])]
+            self._patch_list_users(res.get('users', []))
         return res
 
     def post_like(self, media_id, module_name='feed_timeline'):
@@ -404,19 +589,24 @@ class MediaEndpointsMixin:
         """
         if isinstance(reels, list):
             # is a list of reel media
-            reels_seen = {}
-            reels = sorted(reels, key=lambda m: m['taken_at'], reverse=True)
-            now = int(time.time())
-            for i, reel in enumerate(reels):
-                reel_seen_at = now - min(i + 1 + randint(0, 2), max(0, now - reel['taken_at']))
-                reels_seen[f"{reel['id']}_{reel['user']['pk']}"] = [f"{reel['taken_at']}_{reel_seen_at}"]
-            params = {'reels': reels_seen}
+            params = {'reels': reels_seen(reels)}
         else:
             params = {'reels': reels}
         params.update(self.authenticated_params)
         res = self._call_api('media/seen/', params=params, version='v2')
         return res
 
+    def seen_reporter(self, max_batch_size=50, interval=10.0):
+        """
+        Get a :class:`SeenReporter` that buffers reel views and reports them in batches
+        with :meth:`media_seen`
+
+        :param max_batch_size: Number of pending views that triggers a report
+        :param interval: Maximum number of seconds a view is pending
+        :return: SeenReporter
+        """
+        return SeenReporter(self, max_batch_size=max_batch_size, interval=interval)
+
     def comment_like(self, comment_id):
         """
         Like a comment
@@ -442,8 +632,7 @@ class MediaEndpointsMixin:
         endpoint = f'media/{comment_id}/comment_likers/'
         res = self._call_api(endpoint)
         if self.auto_patch:
-            [ClientCompatPatch.list_user(u, drop_incompat_keys=self.drop_incompat_keys)
-             for u in res.get('users', [])]
+            self._patch_list_users(res.get('users', []))
         return res
 
     def comment_unlike(self, comment_id):
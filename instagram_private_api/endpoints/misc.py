@@ -1,8 +1,8 @@
 import warnings
 
 from .common import ClientDeprecationWarning
+from ..bulk import BulkStats, map_chunks
 from ..constants import Constants
-from ..compatpatch import ClientCompatPatch
 
 
 class MiscEndpointsMixin:
@@ -122,12 +122,40 @@ class MiscEndpointsMixin:
         :param comment_ids: list of comment/caption IDs
         :return:
         """
-        if isinstance(comment_ids, str):
+        if isinstance(comment_ids, (str, int)):
             comment_ids = [comment_ids]
-        query = {'comment_ids': ','.join(comment_ids)}
+        query = {'comment_ids': ','.join(str(comment_id) for comment_id in comment_ids)}
         res = self._call_api('language/bulk_translate/', query=query)
         return res
 
+    def bulk_translate_chunked(self, comment_ids, chunk_size=20, max_workers=4):
+        """
+        Get translations of any number of comments, with concurrent :meth:`bulk_translate` calls
+        of at most chunk_size comments. Chunks that fail are reported without losing the others.
+
+        :param comment_ids: list of comment/caption IDs
+        :param chunk_size: Maximum number of comments per call
+        :param max_workers: Maximum number of concurrent calls
+        :return:
+            .. code-block:: javascript
+
+                {
+                    "comment_translations": [{"id": 17881229782160892, "translation": "..."}],
+                    "failed_comment_ids": ["17881229782160899"],
+                    "errors": [ClientThrottledError(...)],
+                    "stats": BulkStats(...)
+                }
+        """
+        stats = BulkStats()
+        res = {'comment_translations': [], 'failed_comment_ids': [], 'errors': [], 'stats': stats}
+        for chunk in map_chunks(self.bulk_translate, comment_ids, chunk_size, max_workers=max_workers, stats=stats):
+            if chunk.ok:
+                res['comment_translations'].extend(chunk.result.get('comment_translations', []))
+            else:
+                res['failed_comment_ids'].extend(chunk.items)
+                res['errors'].append(chunk.error)
+        return res
+
     def top_search(self, query):
         """
         Search for top matching hashtags, users, locations
@@ -139,7 +167,8 @@ class MiscEndpointsMixin:
             'fbsearch/topsearch/',
             query={'context': 'blended', 'ranked_token': self.rank_token, 'query': query})
         if self.auto_patch and res.get('users', []):
-            [ClientCompatPatch.list_user(u['user']) for u in res['users']]
+            for u in res['users']:
+                u['user'] = self._patch_list_user(u['user'])
         return res
 
     def stickers(self, sticker_type='static_stickers', location=None):
@@ -1,6 +1,6 @@
 from ..compat import jdumps
 from ..utils import raise_if_invalid_rank_token
-from ..compatpatch import ClientCompatPatch
+from ..pagination import SectionPaginator, SearchPaginator
 
 
 class TagsEndpointsMixin:
@@ -56,6 +56,22 @@ class TagsEndpointsMixin:
         res = self._call_api('tags/search/', query=query)
         return res
 
+    def tag_search_iter(self, text, rank_token=None, **kwargs):
+        """
+        Get a paginator for all the results of a tag search. See :class:`SearchPaginator`.
+
+        :param text: Search term
+        :param rank_token: Optional, one will be generated if not specified
+        :param kwargs:
+            - **max_exclude**, **max_url_length**, **trim**: exclusion list limits for :class:`SearchPaginator`
+        :return: :class:`SearchPaginator`, iterate over it to get the tag results
+        """
+        paginator_kwargs = {k: kwargs.pop(k) for k in ('max_exclude', 'max_url_length', 'trim') if k in kwargs}
+        return SearchPaginator(
+            lambda token, exclude_list: self.tag_search(text, token, exclude_list=exclude_list, **kwargs),
+            get_id=lambda t: t['id'], rank_token=rank_token or self.generate_uuid(),
+            results_key='results', **paginator_kwargs)
+
     def tags_user_following(self, user_id):
         """
         Get tags a user is following
@@ -129,14 +145,24 @@ class TagsEndpointsMixin:
 
         params.update(kwargs)
         results = self._call_api(endpoint, params=params, unsigned=True)
-        extracted_medias = []
         if self.auto_patch:
-            for s in results.get('sections', []):
-                for m in s.get('layout_content', {}).get('medias', []):
-                    if m.get('media'):
-                        ClientCompatPatch.media(m['media'], drop_incompat_keys=self.drop_incompat_keys)
-                        if extract_media_only:
-                            extracted_medias.append(m['media'])
+            self._patch_nested_medias([
+                m for section in results.get('sections', [])
+                for m in (section.get('layout_content') or {}).get('medias', [])])
         if extract_media_only:
-            return extracted_medias
+            return SectionPaginator.extract_medias(results)
         return results
+
+    def tag_section_iter(self, tag, tabs=('top', 'recent'), **kwargs):
+        """
+        Get a paginator for the media in one or more tag feed sections, paging through each tab in turn.
+        Media is deduped by pk across pages and tabs.
+
+        :param tag: tag text (without '#')
+        :param tabs: list of tabs from 'top', 'recent', 'places'
+        :param kwargs: Additional kwargs for :meth:`tag_section`
+        :return: :class:`SectionPaginator`, iterate over it to get the media objects
+        """
+        kwargs.pop('extract', None)
+        return SectionPaginator(
+            lambda tab, **cursor: self.tag_section(tag, tab=tab, **dict(kwargs, **cursor)), tabs)
@@ -5,7 +5,6 @@ from random import randint
 
 from .common import ClientDeprecationWarning
 from ..compat import jdumps
-from ..compatpatch import ClientCompatPatch
 
 
 class MediaRatios:
@@ -188,7 +187,7 @@ class UploadEndpointsMixin:
         params.update(self.authenticated_params)
         res = self._call_api(endpoint, params=params)
         if self.auto_patch and res.get('media'):
-            ClientCompatPatch.media(res.get('media'), drop_incompat_keys=self.drop_incompat_keys)
+            res['media'] = self._patch_media(res['media'])
         return res
 
     def configure_video(self, upload_id, size, duration, thumbnail_data, caption='',
@@ -261,7 +260,7 @@ class UploadEndpointsMixin:
         params.update(self.authenticated_params)
         res = self._call_api('media/configure/', params=params, query={'video': 1})
         if res.get('media') and self.auto_patch:
-            ClientCompatPatch.media(res.get('media'), drop_incompat_keys=self.drop_incompat_keys)
+            res['media'] = self._patch_media(res['media'])
         return res
 
     def configure_to_reel(self, upload_id, size):
@@ -304,7 +303,7 @@ class UploadEndpointsMixin:
         params.update(self.authenticated_params)
         res = self._call_api(endpoint, params=params)
         if self.auto_patch and res.get('media'):
-            ClientCompatPatch.media(res.get('media'), drop_incompat_keys=self.drop_incompat_keys)
+            res['media'] = self._patch_media(res['media'])
         return res
 
     def configure_video_to_reel(self, upload_id, size, duration, thumbnail_data):
@@ -356,7 +355,7 @@ class UploadEndpointsMixin:
         params.update(self.authenticated_params)
         res = self._call_api('media/configure_to_story/', params=params, query={'video': '1'})
         if self.auto_patch and res.get('media'):
-            ClientCompatPatch.media(res.get('media'), drop_incompat_keys=self.drop_incompat_keys)
+            res['media'] = self._patch_media(res['media'])
         return res
 
     def post_photo(self, photo_data, size, caption='', upload_id=None, to_reel=False, **kwargs):
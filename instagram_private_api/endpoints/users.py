@@ -1,7 +1,6 @@
 import warnings
 
 from .common import ClientExperimentalWarning, ClientDeprecationWarning
-from ..compatpatch import ClientCompatPatch
 
 
 class UsersEndpointsMixin:
@@ -16,7 +15,7 @@ class UsersEndpointsMixin:
         """
         res = self._call_api(f'users/{user_id}/info/')
         if self.auto_patch:
-            ClientCompatPatch.user(res['user'], drop_incompat_keys=self.drop_incompat_keys)
+            res['user'] = self._patch_user(res['user'])
         return res
 
     def username_info(self, user_name):
@@ -27,7 +26,7 @@ class UsersEndpointsMixin:
         """
         res = self._call_api(f'users/{user_name}/usernameinfo/')
         if self.auto_patch:
-            ClientCompatPatch.user(res['user'], drop_incompat_keys=self.drop_incompat_keys)
+            res['user'] = self._patch_user(res['user'])
         return res
 
     def user_detail_info(self, user_id, **kwargs):
@@ -46,13 +45,10 @@ class UsersEndpointsMixin:
         endpoint = f'users/{user_id}/full_detail_info/'
         res = self._call_api(endpoint, query=kwargs)
         if self.auto_patch:
-            ClientCompatPatch.user(res['user_detail']['user'], drop_incompat_keys=self.drop_incompat_keys)
-            [ClientCompatPatch.media(m, drop_incompat_keys=self.drop_incompat_keys)
-             for m in res.get('feed', {}).get('items', [])]
-            [ClientCompatPatch.media(m, drop_incompat_keys=self.drop_incompat_keys)
-             for m in res.get('reel_feed', {}).get('items', [])]
-            [ClientCompatPatch.media(m, drop_incompat_keys=self.drop_incompat_keys)
-             for m in res.get('user_story', {}).get('reel', {}).get('items', [])]
+            res['user_detail']['user'] = self._patch_user(res['user_detail']['user'])
+            self._patch_medias(res.get('feed', {}).get('items', []))
+            self._patch_medias(res.get('reel_feed', {}).get('items', []))
+            self._patch_medias(res.get('user_story', {}).get('reel', {}).get('items', []))
         return res
 
     def user_map(self, user_id):    # pragma: no cover
@@ -84,8 +80,7 @@ class UsersEndpointsMixin:
         query_params.update(kwargs)
         res = self._call_api('users/search/', query=query_params)
         if self.auto_patch:
-            [ClientCompatPatch.list_user(u, drop_incompat_keys=self.drop_incompat_keys)
-             for u in res.get('users', [])]
+            self._patch_list_users(res.get('users', []))
         return res
 
     def check_username(self, username):
@@ -122,8 +117,7 @@ class UsersEndpointsMixin:
         """
         res = self._call_api('users/reel_settings/')
         if self.auto_patch and res.get('blocked_reels', {}).get('users'):
-            [ClientCompatPatch.list_user(u, drop_incompat_keys=self.drop_incompat_keys)
-             for u in res.get('blocked_reels', {}).get('users', [])]
+            self._patch_list_users(res['blocked_reels']['users'])
         return res
 
     def set_reel_settings(
@@ -1,6 +1,3 @@
-from ..compatpatch import ClientCompatPatch
-
-
 class UsertagsEndpointsMixin:
     """For endpoints in ``/usertags/``."""
 
@@ -17,8 +14,7 @@ class UsertagsEndpointsMixin:
         query.update(kwargs)
         res = self._call_api(endpoint, query=query)
         if self.auto_patch:
-            [ClientCompatPatch.media(m, drop_incompat_keys=self.drop_incompat_keys)
-             for m in res.get('items', [])]
+            self._patch_medias(res.get('items', []))
         return res
 
     def usertag_self_remove(self, media_id):
@@ -31,5 +27,5 @@ class UsertagsEndpointsMixin:
         endpoint = f'usertags/{media_id}/remove/'
         res = self._call_api(endpoint, params=self.authenticated_params)
         if self.auto_patch:
-            ClientCompatPatch.media(res.get('media'))
+            res['media'] = self._patch_media(res['media'])
         return res
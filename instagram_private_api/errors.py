@@ -24,6 +24,10 @@ class ClientError(Exception):
         self.error_response = error_response
         super().__init__(msg)
 
+    def __reduce__(self):
+        # keep the code and error_response when sent to or from another process
+        return self.__class__, (self.msg, self.code, self.error_response)
+
     @property
     def msg(self):
         return self.args[0]
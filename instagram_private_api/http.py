@@ -1,4 +1,13 @@
-from .compat import compat_cookiejar, compat_pickle
+from collections import deque
+from io import BytesIO
+import select
+import socket
+import threading
+from urllib.response import addinfourl
+
+from .compat import (
+    compat_cookiejar, compat_pickle, compat_http_client, compat_urllib_error,
+    compat_urllib_request)
 
 
 class ClientCookieJar(compat_cookiejar.CookieJar):
@@ -12,6 +21,12 @@ class ClientCookieJar(compat_cookiejar.CookieJar):
             else:
                 self._cookies = compat_pickle.loads(cookie_string.encode('utf-8'))
 
+    def __iter__(self):
+        # iterate over a snapshot so that cookies set by other threads do not break the iteration
+        with self._cookies_lock:
+            cookies = list(compat_cookiejar.CookieJar.__iter__(self))
+        return iter(cookies)
+
     @property
     def auth_expires(self):
         for cookie in self:
@@ -25,4 +40,126 @@ class ClientCookieJar(compat_cookiejar.CookieJar):
         return self.auth_expires
 
     def dump(self):
-        return compat_pickle.dumps(self._cookies)
+        with self._cookies_lock:
+            return compat_pickle.dumps(self._cookies)
+
+
+class PooledHTTPHandler(compat_urllib_request.HTTPSHandler):
+    """
+    HTTP and HTTPS handler that keeps connections alive and reuses them across requests and threads,
+    instead of opening a new connection per request. The response body is read before the
+    connection is returned to the pool. Requests through a proxy tunnel are not pooled.
+    Only GET and HEAD requests are sent again if a reused connection was closed by the server.
+    """
+
+    def __init__(self, max_idle=10, context=None):
+        """
+
+        :param max_idle: Maximum number of idle connections kept per scheme and host
+        :param context: ssl context
+        """
+        compat_urllib_request.HTTPSHandler.__init__(self, context=context)
+        self.max_idle = max_idle
+        self._context = context
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    def _acquire(self, key):
+        while True:
+            with self._lock:
+                idle = self._idle.get(key)
+                if not idle:
+                    return None
+                conn = idle.pop()
+            if not self._closed_by_peer(conn):
+                return conn
+            conn.close()
+
+    @staticmethod
+    def _closed_by_peer(conn):
+        """An idle connection is only readable if the server closed it or sent unexpected data"""
+        if conn.sock is None:
+            return True
+        try:
+            readable, _, _ = select.select([conn.sock], [], [], 0)
+        except (OSError, ValueError):
+            return True
+        return bool(readable)
+
+    def _release(self, key, conn):
+        with self._lock:
+            idle = self._idle.setdefault(key, deque())
+            if len(idle) < self.max_idle:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def close(self):
+        """Close the idle connections"""
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for conns in idle.values():
+            for conn in conns:
+                conn.close()
+
+    #: requests sent again on a new connection if a kept alive connection turns out to be closed
+    RETRY_METHODS = ('GET', 'HEAD')
+
+    # run before the default HTTPHandler that build_opener adds
+    handler_order = 499
+    http_request = compat_urllib_request.AbstractHTTPHandler.do_request_
+
+    def http_open(self, req):
+        return self._pooled_open(req, compat_http_client.HTTPConnection)
+
+    def https_open(self, req):
+        if req._tunnel_host:
+            return compat_urllib_request.HTTPSHandler.https_open(self, req)
+        return self._pooled_open(req, compat_http_client.HTTPSConnection, context=self._context)
+
+    def _pooled_open(self, req, connection_class, **kwargs):
+        host = req.host
+        if not host:
+            raise compat_urllib_error.URLError('no host given')
+        key = (req.type, host)
+        method = req.get_method()
+
+        headers = dict(req.unredirected_hdrs)
+        headers.update({k: v for k, v in req.headers.items() if k not in headers})
+        headers['Connection'] = 'keep-alive'
+        headers = {name.title(): val for name, val in headers.items()}
+
+        while True:
+            conn = self._acquire(key)
+            reused = conn is not None
+            if not reused:
+                conn = connection_class(host, timeout=req.timeout, **kwargs)
+            elif conn.sock is not None:
+                conn.sock.settimeout(
+                    socket.getdefaulttimeout() if req.timeout is socket._GLOBAL_DEFAULT_TIMEOUT else req.timeout)
+            try:
+                conn.request(method, req.selector, req.data, headers)
+                r = conn.getresponse()
+                body = r.read()
+            except (compat_http_client.RemoteDisconnected, ConnectionResetError, BrokenPipeError) as err:
+                conn.close()
+                if reused and method in self.RETRY_METHODS:
+                    # the server closed the idle connection, retry on a new one
+                    continue
+                # other requests may have been processed already, and are not sent again
+                raise compat_urllib_error.URLError(err)
+            except OSError as err:
+                conn.close()
+                raise compat_urllib_error.URLError(err)
+            except BaseException:
+                conn.close()
+                raise
+            break
+
+        if r.will_close:
+            conn.close()
+        else:
+            self._release(key, conn)
+        response = addinfourl(BytesIO(body), r.headers, req.get_full_url(), r.status)
+        response.msg = r.reason
+        return response
@@ -0,0 +1,151 @@
+"""
+Opt-in deduplication of the strings of large in-memory datasets, see the ``intern_strings``
+option of :class:`Client`.
+"""
+import threading
+
+#: url prefixes, a :class:`CompactUrl` stores the index of its prefix in this list
+_url_prefixes = []
+_url_prefix_ids = {}
+_url_prefixes_lock = threading.Lock()
+
+
+class CompactUrl(bytes):
+    """
+    A url stored as the id of a shared prefix, such as ``https://scontent.cdninstagram.com/v/t51.2885-19/``,
+    and the ascii bytes of the rest of the url. Use ``str(url)`` to get the url.
+    Compares and hashes equal to the str url.
+    """
+    __slots__ = ()
+
+    def __str__(self):
+        return _url_prefixes[int.from_bytes(self[:2], 'big')] + self[2:].decode('ascii')
+
+    @property
+    def url(self):
+        return str(self)
+
+    def __eq__(self, other):
+        if isinstance(other, str):
+            return str(self) == other
+        return bytes.__eq__(self, other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(str(self))
+
+    def __repr__(self):
+        return f'CompactUrl({str(self)!r})'
+
+    def __reduce__(self):
+        # prefix ids are per process
+        return compact_url, (str(self),)
+
+
+def compact_url(url):
+    """
+    Store a url as a :class:`CompactUrl`, urls that cannot be compacted are returned as is
+
+    :param url: str
+    :return: CompactUrl or url
+    """
+    if not url.isascii():
+        return url
+    split = url.rfind('/', 0, url.find('?') % (len(url) + 1)) + 1
+    if not split:
+        return url
+    prefix = url[:split]
+    prefix_id = _url_prefix_ids.get(prefix)
+    if prefix_id is None:
+        with _url_prefixes_lock:
+            prefix_id = _url_prefix_ids.get(prefix)
+            if prefix_id is None:
+                if len(_url_prefixes) >= 1 << 16:
+                    return url
+                # the prefix is added before its id is visible to other threads
+                _url_prefixes.append(prefix)
+                prefix_id = _url_prefix_ids[prefix] = len(_url_prefixes) - 1
+    return CompactUrl(prefix_id.to_bytes(2, 'big') + url[split:].encode('ascii'))
+
+
+class StringPool:
+    """
+    Dedupes repeated strings, such as the usernames and urls of users that appear in many follower
+    lists, so that each distinct string is only kept once. Urls in fields named ``*_url``
+    can also be stored as a :class:`CompactUrl`.
+
+    Example:
+        .. code-block:: python
+
+            pool = StringPool()
+            users = pool.intern_all(api.user_followers(user_id, rank_token)['users'])
+    """
+
+    def __init__(self, max_length=512, compact_urls=False):
+        """
+
+        :param max_length: Strings longer than this are not interned
+        :param compact_urls: Store the ``*_url`` fields of models as :class:`CompactUrl`
+        """
+        self.max_length = max_length
+        self.compact_urls = compact_urls
+        self.strings = {}
+        # compacted urls are pooled apart so that other fields with the same value get a str
+        self.urls = {}
+
+    def __len__(self):
+        return len(self.strings) + len(self.urls)
+
+    def intern(self, value, name=None):
+        """
+        Get the pooled copy of a string
+
+        :param value: any value, only str values are interned
+        :param name: field name, urls in fields ending with ``_url`` are compacted if compact_urls is set
+        :return: the pooled value
+        """
+        if type(value) is not str or len(value) > self.max_length:
+            return value
+        if self.compact_urls and name and name.endswith('_url'):
+            pooled = self.urls.get(value)
+            if pooled is None:
+                # keyed by the CompactUrl, which is equal to the url, so that the url is not kept
+                pooled = compact_url(value)
+                self.urls[pooled] = pooled
+            return pooled
+        pooled = self.strings.get(value)
+        if pooled is None:
+            pooled = self.strings[value] = value
+        return pooled
+
+    def intern_all(self, obj):
+        """
+        Intern all the str values in nested dicts and lists, in place. Urls are not compacted
+        so that the objects keep the same types.
+
+        :param obj: dict or list
+        :return: obj
+        """
+        strings = self.strings
+        max_length = self.max_length
+        stack = [obj]
+        while stack:
+            node = stack.pop()
+            items = node.items() if isinstance(node, dict) else enumerate(node)
+            for key, value in items:
+                if type(value) is str:
+                    if len(value) <= max_length:
+                        pooled = strings.get(value)
+                        if pooled is None:
+                            strings[value] = value
+                        elif pooled is not value:
+                            node[key] = pooled
+                elif isinstance(value, (dict, list)):
+                    stack.append(value)
+        return obj
+
+    def clear(self):
+        self.strings.clear()
+        self.urls.clear()
@@ -0,0 +1,177 @@
+"""
+Registry of the json libraries that can be used by the client, see :func:`get_codec`.
+
+Every codec has the same semantics:
+
+- ``dumps(obj)`` returns the same str as ``json.dumps(obj, separators=(',', ':'))``: compact,
+  with non-ascii characters escaped, unescaped ``/`` and keys in insertion order.
+  Request signatures are computed over this str, which must be ascii.
+- ``loads(s)`` accepts str or bytes.
+"""
+from functools import partial
+import json
+import re
+import timeit
+
+#: name -> JsonCodec, in order of preference
+CODECS = {}
+
+#: (direction) -> fastest codec for the default sample
+_fastest = {}
+
+_non_ascii = re.compile(r'[^\x00-\x7f]')
+
+
+def _escape_char(match):
+    code = ord(match.group())
+    if code > 0xFFFF:
+        code -= 0x10000
+        return '\\u%04x\\u%04x' % (0xD800 + (code >> 10), 0xDC00 + (code & 0x3FF))
+    return '\\u%04x' % code
+
+
+def ascii_escape(s):
+    """
+    Escape the non-ascii characters of a json str like ``json.dumps(ensure_ascii=True)``.
+    Non-ascii characters can only occur in json strings so the whole str can be escaped.
+
+    :param s: json str
+    :return: str
+    """
+    return s if s.isascii() else _non_ascii.sub(_escape_char, s)
+
+
+class JsonCodec:
+    """A pair of ``dumps``/``loads`` functions"""
+    __slots__ = ('name', 'dumps', 'loads')
+
+    def __init__(self, name, dumps, loads):
+        """
+
+        :param name: codec name
+        :param dumps: callable that serializes an object to a compact json str
+        :param loads: callable that parses a json str or bytes
+        """
+        self.name = name
+        self.dumps = dumps
+        self.loads = loads
+
+    def __repr__(self):
+        return f'JsonCodec({self.name!r})'
+
+
+def register_codec(name, dumps, loads):
+    """
+    Register a codec. Codecs are preferred in the order they are registered.
+
+    :param name: codec name
+    :param dumps: see :class:`JsonCodec`
+    :param loads: see :class:`JsonCodec`
+    :return: JsonCodec
+    """
+    codec = CODECS[name] = JsonCodec(name, dumps, loads)
+    _fastest.clear()
+    return codec
+
+
+try:
+    import orjson
+
+    def _orjson_dumps(obj, _dumps=orjson.dumps, _option=orjson.OPT_NON_STR_KEYS):
+        return ascii_escape(_dumps(obj, option=_option).decode('utf8'))
+
+    register_codec('orjson', _orjson_dumps, orjson.loads)
+except ImportError:
+    pass
+
+try:
+    import msgspec
+
+    def _msgspec_dumps(obj, _encode=msgspec.json.Encoder().encode):
+        return ascii_escape(_encode(obj).decode('utf8'))
+
+    register_codec('msgspec', _msgspec_dumps, msgspec.json.Decoder().decode)
+except ImportError:
+    pass
+
+try:
+    import ujson
+
+    def _ujson_dumps(obj, _dumps=ujson.dumps):
+        return _dumps(obj, escape_forward_slashes=False)
+
+    register_codec('ujson', _ujson_dumps, ujson.loads)
+except ImportError:
+    pass
+
+register_codec('json', json.JSONEncoder(separators=(',', ':')).encode, json.loads)
+
+
+def default_codec():
+    """
+    Get the preferred codec, orjson if installed otherwise the standard library json
+
+    :return: JsonCodec
+    """
+    return CODECS.get('orjson') or CODECS['json']
+
+
+def fastest_codec(direction=None, sample=None, number=20):
+    """
+    Benchmark the available codecs on ``sample`` and get the fastest.
+    The result for the default sample is cached.
+
+    :param direction: ``'dumps'``, ``'loads'``, or None for a round trip
+    :param sample: object to serialize and parse, defaults to a feed-like page
+    :param number: number of runs per codec
+    :return: JsonCodec
+    """
+    if sample is None and direction in _fastest:
+        return _fastest[direction]
+    data = sample
+    if data is None:
+        user = {'pk': 1234567890, 'username': 'username', 'full_name': 'Full Name é', 'is_private': False}
+        data = {
+            'status': 'ok', 'more_available': True, 'next_max_id': '1234567890_1234567890',
+            'items': [
+                {'pk': i, 'id': f'{i}_1', 'taken_at': 1500000000, 'user': user, 'like_count': i,
+                 'caption': {'text': 'caption ❤', 'user': user}, 'video_duration': 1.5,
+                 'image_versions2': {'candidates': [{'width': 640, 'height': 640, 'url': 'https://x/y.jpg'}] * 3}}
+                for i in range(20)
+            ],
+        }
+    encoded = json.dumps(data)
+    timings = []
+    for codec in CODECS.values():
+        if direction == 'dumps':
+            stmt = partial(codec.dumps, data)
+        elif direction == 'loads':
+            stmt = partial(codec.loads, encoded)
+        else:
+            stmt = partial(lambda dumps, loads: loads(dumps(data)), codec.dumps, codec.loads)
+        timings.append((min(timeit.repeat(stmt, number=number, repeat=3)), codec.name))
+    fastest = CODECS[min(timings)[1]]
+    if sample is None:
+        _fastest[direction] = fastest
+    return fastest
+
+
+def get_codec(codec=None, direction=None):
+    """
+    Get a codec
+
+    :param codec: a :class:`JsonCodec`, a registered codec name, ``'auto'`` for the fastest
+        available codec from :func:`fastest_codec`, or None for :func:`default_codec`
+    :param direction: ``'dumps'`` or ``'loads'`` if the codec is only used for that, for ``'auto'``
+    :return: JsonCodec
+    """
+    if codec is None:
+        return default_codec()
+    if isinstance(codec, JsonCodec):
+        return codec
+    if codec == 'auto':
+        return fastest_codec(direction)
+    try:
+        return CODECS[codec]
+    except KeyError:
+        raise ValueError(f'Unknown json codec: {codec}. Available: {", ".join(CODECS)}')
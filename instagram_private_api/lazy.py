@@ -0,0 +1,139 @@
+from typing import Dict, List
+
+from .compat import jloads
+
+try:
+    import msgspec
+except ImportError:
+    # msgspec is optional, without it documents are parsed in full on first access
+    msgspec = None
+
+if msgspec is not None:
+    _decode_object = msgspec.json.Decoder(Dict[str, msgspec.Raw]).decode
+    _decode_array = msgspec.json.Decoder(List[msgspec.Raw]).decode
+    _decode_value = msgspec.json.decode
+
+
+class LazyDocument:
+    """
+    A json document that is only parsed as far as it is read, returned with ``Client(lazy_responses=True)``.
+
+    The document keeps the raw response body. Reading a field parses the top level into an index
+    of raw value slices without building the nested objects. Objects and arrays are returned as
+    LazyDocuments over their slice and are only indexed when read in turn. Scalars are returned
+    as python values. Use :meth:`at` to read a value by json pointer and :meth:`materialize`
+    to parse the whole document.
+
+    Example:
+        .. code-block:: python
+
+            api = Client(user_name, password, lazy_responses=True)
+            tray = api.reels_tray()
+            usernames = [reel['user']['username'] for reel in tray['tray']]
+            first_reel_id = tray.at('/tray/0/id')
+
+    Without msgspec, the document is parsed in full on first access but has the same interface.
+    """
+    __slots__ = ('_raw', '_index')
+
+    def __init__(self, raw, index=None):
+        """
+
+        :param raw: json bytes, or a ``msgspec.Raw``
+        :param index: parsed dict or list, used when msgspec is not available
+        """
+        self._raw = raw
+        self._index = index
+
+    def _get_index(self):
+        if self._index is None:
+            if msgspec is None:
+                self._index = jloads(bytes(self._raw))
+            elif bytes(memoryview(self._raw)[:1]) == b'[':
+                self._index = _decode_array(self._raw)
+            else:
+                try:
+                    self._index = _decode_object(self._raw)
+                except msgspec.ValidationError:
+                    # a body with leading whitespace that is not an object
+                    self._index = _decode_array(self._raw)
+        return self._index
+
+    @staticmethod
+    def _wrap(value):
+        if msgspec is not None and isinstance(value, msgspec.Raw):
+            first = bytes(memoryview(value)[:1])
+            if first in (b'{', b'['):
+                return LazyDocument(value)
+            return _decode_value(value)
+        if isinstance(value, (dict, list)):
+            return LazyDocument(None, index=value)
+        return value
+
+    @property
+    def is_array(self):
+        return isinstance(self._get_index(), list)
+
+    def __getitem__(self, key):
+        return self._wrap(self._get_index()[key])
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except (KeyError, IndexError, TypeError):
+            return default
+
+    def __contains__(self, key):
+        return key in self._get_index()
+
+    def __len__(self):
+        return len(self._get_index())
+
+    def __iter__(self):
+        index = self._get_index()
+        if isinstance(index, list):
+            return (self._wrap(v) for v in index)
+        return iter(index)
+
+    def keys(self):
+        return self._get_index().keys()
+
+    def items(self):
+        return ((k, self._wrap(v)) for k, v in self._get_index().items())
+
+    def at(self, pointer, default=None):
+        """
+        Read a value by json pointer, e.g. ``'/tray/0/user/username'``
+
+        :param pointer: json pointer
+        :param default: value returned if the pointer does not resolve
+        :return: value, or a LazyDocument for objects and arrays
+        """
+        node = self
+        for token in pointer.split('/')[1:]:
+            if not isinstance(node, LazyDocument):
+                return default
+            token = token.replace('~1', '/').replace('~0', '~')
+            if node.is_array:
+                if not token.isdigit():
+                    return default
+                token = int(token)
+            node = node.get(token, default)
+            if node is default:
+                return default
+        return node
+
+    def materialize(self):
+        """
+        Parse the whole document
+
+        :return: dict or list
+        """
+        if self._index is not None and (self._raw is None or msgspec is None):
+            return self._index
+        return jloads(bytes(self._raw))
+
+    def __repr__(self):
+        if self._raw is None:
+            return 'LazyDocument(...)'
+        return f'LazyDocument({bytes(memoryview(self._raw)[:50])!r}...)'
@@ -0,0 +1,144 @@
+"""
+Batching loaders that coalesce single lookups made from many threads or tasks into bulk calls.
+"""
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from .errors import ClientError, ClientErrorCodes
+
+
+class MediaInfoLoader:
+    """
+    Collects :meth:`load` calls made within ``wait`` seconds of each other, or until
+    ``max_batch_size`` medias are pending, and fetches them with one :meth:`Client.medias_info`
+    call. Each caller gets its own media back. Batches are fetched in a thread pool, so
+    :meth:`load` can be called from threads and :meth:`aload` from asyncio tasks.
+
+    Example:
+        .. code-block:: python
+
+            with MediaInfoLoader(api) as loader:
+                # in any number of threads
+                media = loader.load('1234567890123456789_123456')
+                # or in asyncio tasks
+                media = await loader.aload('1234567890123456789_123456')
+    """
+
+    def __init__(self, client, max_batch_size=50, wait=0.01, max_workers=4):
+        """
+
+        :param client: :class:`Client`
+        :param max_batch_size: Maximum number of media ids per ``medias_info`` call
+        :param wait: Seconds to wait for more lookups after the first lookup of a batch
+        :param max_workers: Maximum number of concurrent ``medias_info`` calls
+        """
+        self.client = client
+        self.max_batch_size = max_batch_size
+        self.wait = wait
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._timer = None
+        self._closed = False
+        #: number of medias_info calls made
+        self.batches = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def load_future(self, media_id):
+        """
+        Queue a media lookup
+
+        :param media_id: Media id
+        :return: :class:`concurrent.futures.Future` of the media object
+        """
+        media_id = str(media_id)
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError('Cannot load medias after the loader is closed')
+            self._pending.setdefault(media_id, []).append(future)
+            if len(self._pending) >= self.max_batch_size:
+                self._flush()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.wait, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        return future
+
+    def load(self, media_id):
+        """
+        Get a media object, as returned in the ``items`` of :meth:`Client.media_info`
+
+        :param media_id: Media id
+        :return: media object
+        """
+        return self.load_future(media_id).result()
+
+    def load_many(self, media_ids):
+        """
+        Get several media objects, batched with the lookups of other callers
+
+        :param media_ids: list of media ids
+        :return: list of media objects
+        """
+        return [f.result() for f in [self.load_future(media_id) for media_id in media_ids]]
+
+    async def aload(self, media_id):
+        """
+        Get a media object from an asyncio task, see :meth:`load`
+
+        :param media_id: Media id
+        :return: media object
+        """
+        return await asyncio.wrap_future(self.load_future(media_id))
+
+    def flush(self):
+        """Fetch the pending lookups now"""
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._pending:
+            batch, self._pending = self._pending, {}
+            self.batches += 1
+            try:
+                self.executor.submit(self._fetch, batch)
+            except Exception as e:  # noqa
+                for futures in batch.values():
+                    for future in futures:
+                        future.set_exception(e)
+
+    def _fetch(self, batch):
+        try:
+            items = self.client.medias_info(list(batch)).get('items', [])
+        except Exception as e:  # noqa
+            for futures in batch.values():
+                for future in futures:
+                    future.set_exception(e)
+            return
+        found = {}
+        for item in items:
+            found[str(item.get('id'))] = found[str(item.get('pk'))] = item
+        for media_id, futures in batch.items():
+            item = found.get(media_id) or found.get(media_id.split('_')[0])
+            for future in futures:
+                if item is None:
+                    future.set_exception(ClientError(f'Media not found: {media_id}', ClientErrorCodes.NOT_FOUND))
+                else:
+                    future.set_result(item)
+
+    def close(self):
+        """Fetch the pending lookups and wait for all the batches to complete"""
+        with self._lock:
+            self._closed = True
+            self._flush()
+        self.executor.shutdown(wait=True)
@@ -0,0 +1,157 @@
+from . import compatpatch
+from .interning import CompactUrl
+
+
+class Model:
+    """
+    Base class for the compact models returned with ``Client(as_models=True)``.
+
+    Models only keep the fields declared in ``__slots__``, so they take a fraction of the memory
+    of the api objects they are built from. Fields missing from the api object are None.
+    For compatibility with code written for the api objects, fields can also be read
+    with ``model['field']`` and ``model.get('field')``.
+    """
+    __slots__ = ()
+
+    #: field -> model class of a nested object
+    _models = {}
+    #: field -> model class of the items of a nested list
+    _list_models = {}
+
+    def __init__(self, **kwargs):
+        for name in self.__slots__:
+            setattr(self, name, kwargs.get(name))
+
+    @classmethod
+    def from_dict(cls, obj, pool=None):
+        """
+        Build a model from an api object, keeping only the declared fields
+
+        :param obj: api object
+        :param pool: :class:`StringPool` to dedupe the str fields with
+        :return: model
+        """
+        model = cls.__new__(cls)
+        get = obj.get
+        if pool is None:
+            for name in cls.__slots__:
+                setattr(model, name, get(name))
+        else:
+            intern = pool.intern
+            for name in cls.__slots__:
+                setattr(model, name, intern(get(name), name))
+        for name, model_cls in cls._models.items():
+            value = get(name)
+            if value:
+                setattr(model, name, model_cls.from_dict(value, pool))
+        for name, model_cls in cls._list_models.items():
+            value = get(name)
+            if value:
+                setattr(model, name, [model_cls.from_dict(v, pool) for v in value])
+        return model
+
+    def to_dict(self):
+        """
+        Convert the model, and the models nested in it, back to a dict
+
+        :return: dict
+        """
+        obj = {}
+        for name in self.__slots__:
+            value = getattr(self, name)
+            if isinstance(value, Model):
+                value = value.to_dict()
+            elif isinstance(value, list):
+                value = [v.to_dict() if isinstance(v, Model) else v for v in value]
+            elif isinstance(value, CompactUrl):
+                value = str(value)
+            obj[name] = value
+        return obj
+
+    def get(self, key, default=None):
+        value = getattr(self, key, None) if key in self.__slots__ else None
+        return default if value is None else value
+
+    def __getitem__(self, key):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key):
+        # like a key check on the api object, fields missing from it are None
+        return key in self.__slots__ and getattr(self, key) is not None
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self):
+        fields = ', '.join(f'{name}={getattr(self, name)!r}' for name in self.__slots__[:3])
+        return f'{type(self).__name__}({fields}, ...)'
+
+
+class User(Model):
+    """Compact user, from user lists or :meth:`Client.user_info`"""
+    __slots__ = (
+        'pk', 'username', 'full_name', 'is_private', 'is_verified', 'profile_pic_url',
+        'biography', 'external_url', 'media_count', 'follower_count', 'following_count',
+    )
+
+
+class Comment(Model):
+    """Compact comment or caption"""
+    __slots__ = (
+        'pk', 'text', 'created_at', 'created_at_utc', 'user', 'media_id',
+        'comment_like_count', 'child_comment_count', 'parent_comment_id',
+    )
+    _models = {'user': User}
+
+
+class Media(Model):
+    """
+    Compact media. Instead of all the image and video versions, only the url of the
+    closest image and video to the original width is kept.
+    """
+    __slots__ = (
+        'pk', 'id', 'code', 'media_type', 'taken_at', 'user', 'caption',
+        'like_count', 'comment_count', 'view_count', 'video_duration', 'has_liked',
+        'original_width', 'original_height', 'image_url', 'video_url', 'carousel_media',
+    )
+    _models = {'user': User, 'caption': Comment}
+
+    @classmethod
+    def from_dict(cls, obj, pool=None):
+        media = super(Media, cls).from_dict(obj, pool)
+        width = obj.get('original_width') or 1000
+        candidates = obj.get('image_versions2', {}).get('candidates')
+        if candidates:
+            media.image_url = compatpatch.ClientCompatPatch.closest_sizes(candidates, {'url': width})['url']['url']
+        video_versions = obj.get('video_versions')
+        if video_versions:
+            media.video_url = compatpatch.ClientCompatPatch.closest_sizes(video_versions, {'url': width})['url']['url']
+        if pool is not None:
+            media.image_url = pool.intern(media.image_url, 'image_url')
+            media.video_url = pool.intern(media.video_url, 'video_url')
+        return media
+
+
+Media._list_models = {'carousel_media': Media}
+
+
+class Reel(Model):
+    """Compact story reel, from :meth:`Client.reels_tray` or :meth:`Client.reels_media`"""
+    __slots__ = (
+        'id', 'user', 'items', 'latest_reel_media', 'expiring_at', 'seen', 'media_count',
+    )
+    _models = {'user': User}
+    _list_models = {'items': Media}
+
+
+class Broadcast(Model):
+    """Compact live broadcast"""
+    __slots__ = (
+        'id', 'broadcast_owner', 'broadcast_status', 'broadcast_message', 'media_id',
+        'published_time', 'viewer_count', 'cover_frame_url', 'dash_playback_url', 'dash_abr_playback_url',
+    )
+    _models = {'broadcast_owner': User}
@@ -0,0 +1,194 @@
+from collections import deque
+
+from .compat import compat_urllib_parse, jdumps
+
+
+def _media_pk(media):
+    """Get the pk of a media object, whether patched or not"""
+    return media.get('pk') or int(str(media['id']).split('_')[0])
+
+
+class SectionPaginator:
+    """
+    Pages through the sections feeds of :meth:`Client.tag_section` and :meth:`Client.location_section`,
+    yielding the media in ``sections[].layout_content.medias`` deduped by pk.
+
+    Multiple tabs are crawled at once by fetching a page from each tab in turn.
+
+    Example:
+        .. code-block:: python
+
+            paginator = SectionPaginator(
+                lambda tab, **cursor: api.tag_section('cats', tab=tab, **cursor),
+                tabs=('top', 'recent'))
+            for media in paginator:
+                print(media['code'])
+    """
+
+    def __init__(self, fetch, tabs, cursors=None):
+        """
+
+        :param fetch: callable that takes the tab and the cursor kwargs (``max_id``, ``page``, ``next_media_ids``)
+            and returns a sections page
+        :param tabs: list of tabs to crawl
+        :param cursors: Saved :attr:`cursors` from a previous paginator to resume crawling
+        """
+        self.fetch = fetch
+        self.tabs = list(tabs)
+        #: tab -> cursor kwargs for the next page, or None if the tab has no more pages
+        self.cursors = {tab: {} for tab in self.tabs}
+        if cursors:
+            self.cursors.update(cursors)
+        self.seen_pks = set()
+
+    @staticmethod
+    def extract_medias(results):
+        """
+        Flatten the media objects from a sections page
+
+        :param results: sections page
+        :return: list of media objects
+        """
+        return [
+            m['media']
+            for s in results.get('sections', [])
+            for m in (s.get('layout_content') or {}).get('medias', [])
+            if m.get('media')
+        ]
+
+    @staticmethod
+    def next_cursor(results):
+        """
+        Get the cursor kwargs for the page after ``results``
+
+        :param results: sections page
+        :return: dict of cursor kwargs, or None if there are no more pages
+        """
+        if not (results.get('more_available') and results.get('next_max_id')):
+            return None
+        cursor = {'max_id': results['next_max_id']}
+        if results.get('next_page'):
+            cursor['page'] = results['next_page']
+        if results.get('next_media_ids'):
+            cursor['next_media_ids'] = results['next_media_ids']
+        return cursor
+
+    def pages(self):
+        """
+        Generator for the raw pages of each tab, fetching a page from each remaining tab in turn
+
+        :return: generator of (tab, results)
+        """
+        while True:
+            tabs = [tab for tab in self.tabs if self.cursors.get(tab) is not None]
+            if not tabs:
+                return
+            for tab in tabs:
+                cursor = self.cursors[tab]
+                results = self.fetch(tab, **cursor)
+                next_cursor = self.next_cursor(results)
+                if next_cursor == cursor:
+                    # cursor did not advance
+                    next_cursor = None
+                self.cursors[tab] = next_cursor
+                yield tab, results
+
+    def __iter__(self):
+        for _, results in self.pages():
+            for media in self.extract_medias(results):
+                media_pk = _media_pk(media)
+                if media_pk in self.seen_pks:
+                    continue
+                self.seen_pks.add(media_pk)
+                yield media
+
+
+class SearchPaginator:
+    """
+    Pages through searches that use a ``rank_token`` and an ``exclude_list`` of the ids already seen,
+    such as :meth:`Client.tag_search` and :meth:`Client.location_fb_search`.
+
+    Sending every id seen makes each request larger than the last, so the exclusion list is capped
+    at ``max_exclude`` ids and trimmed further if the encoded ``exclude_list`` param exceeds
+    ``max_url_length``. Results are deduped locally so ids dropped from the exclusion list are
+    not yielded twice.
+
+    Example:
+        .. code-block:: python
+
+            paginator = SearchPaginator(
+                lambda rank_token, exclude_list: api.tag_search('cats', rank_token, exclude_list=exclude_list),
+                get_id=lambda t: t['id'], rank_token=api.generate_uuid())
+            for tag in paginator:
+                print(tag['name'])
+    """
+
+    #: Drop the earliest seen ids from the exclusion list first
+    TRIM_OLDEST = 'oldest'
+    #: Stop adding ids to the exclusion list once it is full
+    TRIM_NEWEST = 'newest'
+
+    def __init__(self, search, get_id, rank_token, results_key='results',
+                 max_exclude=150, max_url_length=2000, trim=TRIM_OLDEST):
+        """
+
+        :param search: callable that takes the rank_token and exclude_list and returns a results page
+        :param get_id: callable that returns the id of a result item for the exclusion list
+        :param rank_token: Initial rank_token
+        :param results_key: key of the results list in each page
+        :param max_exclude: Maximum number of ids in the exclusion list
+        :param max_url_length: Maximum length of the url encoded ``exclude_list`` query param
+        :param trim: One of :attr:`TRIM_OLDEST`, :attr:`TRIM_NEWEST`
+        """
+        if trim not in (self.TRIM_OLDEST, self.TRIM_NEWEST):
+            raise ValueError(f'Invalid trim: {trim}')
+        self.search = search
+        self.get_id = get_id
+        self.rank_token = rank_token
+        self.results_key = results_key
+        self.max_url_length = max_url_length
+        self.trim = trim
+        self.excluded = deque(maxlen=max_exclude if trim == self.TRIM_OLDEST else None)
+        self.max_exclude = max_exclude
+        self.seen_ids = set()
+        #: Number of requests made
+        self.request_count = 0
+        #: Length of the url encoded ``exclude_list`` param of the last request
+        self.exclude_list_length = 0
+
+    def exclude_list(self):
+        """
+        Get the exclusion list for the next request
+
+        :return: list of ids
+        """
+        exclude_list = list(self.excluded)
+        while True:
+            self.exclude_list_length = len(compat_urllib_parse.urlencode({'exclude_list': jdumps(exclude_list)}))
+            if self.exclude_list_length <= self.max_url_length or not exclude_list:
+                return exclude_list
+            # trim 10% at a time
+            trim_count = max(1, len(exclude_list) // 10)
+            if self.trim == self.TRIM_OLDEST:
+                exclude_list = exclude_list[trim_count:]
+            else:
+                exclude_list = exclude_list[:-trim_count]
+
+    def __iter__(self):
+        has_more = True
+        while has_more:
+            results = self.search(self.rank_token, self.exclude_list())
+            self.request_count += 1
+            self.rank_token = results.get('rank_token') or self.rank_token
+            new_count = 0
+            for item in results.get(self.results_key, []):
+                item_id = self.get_id(item)
+                if item_id in self.seen_ids:
+                    continue
+                self.seen_ids.add(item_id)
+                if len(self.excluded) < self.max_exclude or self.trim == self.TRIM_OLDEST:
+                    self.excluded.append(item_id)
+                new_count += 1
+                yield item
+            # stop if a page has nothing new to avoid looping forever
+            has_more = bool(results.get('has_more')) and new_count > 0
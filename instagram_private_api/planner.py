@@ -0,0 +1,278 @@
+"""
+Plan the fewest calls that fetch a set of entities, such as the profiles, first feed pages and
+stories of many users, and run them concurrently.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from itertools import combinations
+
+from .bulk import chunked
+from .utils import get_field as _field
+
+#: entity -> kind of the ids it is requested for
+ENTITIES = {
+    'profile': 'user',
+    'feed': 'user',
+    'story': 'user',
+    'broadcast': 'user',
+    'highlights': 'user',
+    'media': 'media',
+    'highlight': 'highlight',
+}
+
+
+def _reels_by_id(res):
+    reels = {}
+    for reel in _field(res, 'reels_media', []):
+        reels[str(_field(reel, 'id'))] = reel
+    for reel_id, reel in (_field(res, 'reels') or {}).items():
+        reels[str(reel_id)] = reel
+    return reels
+
+
+def _medias_by_id(res):
+    medias = {}
+    for media in _field(res, 'items', []):
+        medias[str(_field(media, 'id'))] = medias[str(_field(media, 'pk'))] = media
+    return medias
+
+
+class PlannedEndpoint:
+    """What an endpoint returns for the planner, and how to call it"""
+    __slots__ = ('name', 'kind', 'provides', 'batch_size', 'weight', 'experimental', 'call', 'extract')
+
+    def __init__(self, name, kind, provides, call, extract, batch_size=1, weight=1.0, experimental=False):
+        """
+
+        :param name: name of the :class:`Client` method
+        :param kind: kind of the ids it takes, ``'user'``, ``'media'`` or ``'highlight'``
+        :param provides: entities in its response
+        :param call: callable taking a client and a list of at most batch_size ids, returns the response
+        :param extract: callable taking the response and the ids, returns a dict of entity to a dict of id to value
+        :param batch_size: maximum number of ids per call
+        :param weight: relative cost of a call, to prefer lighter endpoints when the number of calls is equal
+        :param experimental: if the endpoint is experimental
+        """
+        self.name = name
+        self.kind = kind
+        self.provides = frozenset(provides)
+        self.call = call
+        self.extract = extract
+        self.batch_size = batch_size
+        self.weight = weight
+        self.experimental = experimental
+
+    def __repr__(self):
+        return f'PlannedEndpoint({self.name!r})'
+
+
+def _user_detail(res, ids):
+    return {
+        'profile': {ids[0]: _field(_field(res, 'user_detail'), 'user')},
+        'feed': {ids[0]: _field(_field(res, 'feed'), 'items', [])},
+        'story': {ids[0]: _field(res, 'reel_feed')},
+    }
+
+
+def _reels_media(entity):
+    def extract(res, ids):
+        reels = _reels_by_id(res)
+        return {entity: {i: reels.get(i) for i in ids}}
+    return extract
+
+
+def _medias_info(res, ids):
+    medias = _medias_by_id(res)
+    return {'media': {i: medias.get(i) or medias.get(i.split('_')[0]) for i in ids}}
+
+
+ENDPOINTS = [
+    PlannedEndpoint(
+        'user_info', 'user', ['profile'],
+        lambda client, ids: client.user_info(ids[0]),
+        lambda res, ids: {'profile': {ids[0]: _field(res, 'user')}}),
+    PlannedEndpoint(
+        'user_detail_info', 'user', ['profile', 'feed', 'story'],
+        lambda client, ids: client.user_detail_info(ids[0]),
+        _user_detail, weight=1.2, experimental=True),
+    PlannedEndpoint(
+        'user_feed', 'user', ['feed'],
+        lambda client, ids: client.user_feed(ids[0]),
+        lambda res, ids: {'feed': {ids[0]: _field(res, 'items', [])}}),
+    PlannedEndpoint(
+        'reels_media', 'user', ['story'],
+        lambda client, ids: client.reels_media(ids),
+        _reels_media('story'), batch_size=20),
+    PlannedEndpoint(
+        'user_story_feed', 'user', ['story', 'broadcast'],
+        lambda client, ids: client.user_story_feed(ids[0]),
+        lambda res, ids: {'story': {ids[0]: _field(res, 'reel')}, 'broadcast': {ids[0]: _field(res, 'broadcast')}}),
+    PlannedEndpoint(
+        'highlights_user_feed', 'user', ['highlights'],
+        lambda client, ids: client.highlights_user_feed(ids[0]),
+        lambda res, ids: {'highlights': {ids[0]: _field(res, 'tray', [])}}),
+    PlannedEndpoint(
+        'medias_info', 'media', ['media'],
+        lambda client, ids: client.medias_info(ids),
+        _medias_info, batch_size=50),
+    PlannedEndpoint(
+        'reels_media', 'highlight', ['highlight'],
+        lambda client, ids: client.reels_media(ids),
+        _reels_media('highlight'), batch_size=20),
+]
+
+
+class PlannedCall:
+    """A call of a plan"""
+    __slots__ = ('endpoint', 'ids', 'entities')
+
+    def __init__(self, endpoint, ids, entities):
+        self.endpoint = endpoint
+        self.ids = ids
+        self.entities = entities
+
+    def __repr__(self):
+        return f'PlannedCall({self.endpoint.name!r}, ids={self.ids!r}, entities={sorted(self.entities)!r})'
+
+
+class Plan(list):
+    """List of :class:`PlannedCall`"""
+
+    def __init__(self, calls, naive_count):
+        super().__init__(calls)
+        #: number of calls with one single id call per entity and id, for comparison
+        self.naive_count = naive_count
+
+    def count_calls(self, name=None):
+        """
+        Number of calls
+
+        :param name: only count the calls of this endpoint
+        """
+        return sum(1 for c in self if name is None or c.endpoint.name == name)
+
+
+class FetchPlanner:
+    """
+    Fetches entities for sets of ids with the fewest calls. Each entity can be returned by several
+    endpoints, some of which return several entities, such as :meth:`Client.user_detail_info` which
+    returns the profile, first feed page and story of a user, or take many ids, such as
+    :meth:`Client.medias_info` and :meth:`Client.reels_media`. The planner picks, for each group of
+    ids that need the same entities, the combination of endpoints with the lowest cost per id,
+    batches the ids and runs the calls concurrently.
+
+    Entities:
+        - **profile**: user object, for user ids
+        - **feed**: media of the first page of the user feed, for user ids
+        - **story**: current story reel or None, for user ids
+        - **broadcast**: current live broadcast or None, for user ids
+        - **highlights**: highlight reels tray, for user ids
+        - **media**: media object, for media ids
+        - **highlight**: highlight reel with its items, for highlight ids such as ``'highlight:1770000'``
+
+    Example:
+        .. code-block:: python
+
+            planner = FetchPlanner(api)
+            results = planner.fetch({'profile': user_ids, 'story': user_ids, 'media': media_ids})
+            results['story']['123456']  # story reel of user 123456
+    """
+
+    def __init__(self, client, max_workers=4, experimental=True, endpoints=None):
+        """
+
+        :param client: :class:`Client`
+        :param max_workers: Maximum number of concurrent calls
+        :param experimental: Use experimental endpoints, such as :meth:`Client.user_detail_info`
+        :param endpoints: list of :class:`PlannedEndpoint`, defaults to :data:`ENDPOINTS`
+        """
+        self.client = client
+        self.max_workers = max_workers
+        self.endpoints = [
+            e for e in (ENDPOINTS if endpoints is None else endpoints) if experimental or not e.experimental]
+
+    def _cheapest(self, kind, needs):
+        """Get the combination of endpoints providing needs with the lowest cost per id"""
+        candidates = [e for e in self.endpoints if e.kind == kind and e.provides & needs]
+        best = None
+        for size in range(1, len(needs) + 1):
+            for combination in combinations(candidates, size):
+                if not needs <= frozenset().union(*(e.provides for e in combination)):
+                    continue
+                cost = sum(e.weight / e.batch_size for e in combination)
+                if best is None or cost < best[0]:
+                    best = (cost, combination)
+        if best is None:
+            raise ValueError(f'No endpoint provides {", ".join(sorted(needs))} for {kind} ids')
+        return best[1]
+
+    def plan(self, needs):
+        """
+        Plan the calls to fetch entities
+
+        :param needs: dict of entity to a list of ids
+        :return: :class:`Plan`
+        """
+        by_id = {}
+        for entity, ids in needs.items():
+            if entity not in ENTITIES:
+                raise ValueError(f'Unknown entity: {entity}. Available: {", ".join(ENTITIES)}')
+            kind = ENTITIES[entity]
+            for i in ids:
+                by_id.setdefault((kind, str(i)), set()).add(entity)
+
+        groups = {}
+        for (kind, i), entities in by_id.items():
+            groups.setdefault((kind, frozenset(entities)), []).append(i)
+
+        # endpoint -> (ids, entities), ids of batch endpoints from all groups are batched together
+        assigned = {}
+        for (kind, entities), ids in groups.items():
+            for endpoint in self._cheapest(kind, entities):
+                endpoint_ids, endpoint_entities = assigned.setdefault(id(endpoint), (endpoint, [], set()))[1:]
+                endpoint_ids.extend(ids)
+                endpoint_entities.update(endpoint.provides & entities)
+
+        calls = []
+        for endpoint, ids, entities in assigned.values():
+            for chunk in chunked(ids, endpoint.batch_size):
+                calls.append(PlannedCall(endpoint, chunk, frozenset(entities)))
+        return Plan(calls, sum(len(ids) for ids in by_id.values()))
+
+    def run(self, plan):
+        """
+        Run the calls of a plan concurrently. Failed calls do not stop the others, their ids
+        are missing from the results.
+
+        :param plan: :class:`Plan`
+        :return: dict of entity to a dict of id to value, and ``'errors'``, a list of
+            the failed :class:`PlannedCall` and exception
+        """
+        results = {'errors': []}
+
+        def run_call(call):
+            return call.endpoint.call(self.client, call.ids)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [(call, executor.submit(run_call, call)) for call in plan]
+            for call, future in futures:
+                try:
+                    res = future.result()
+                except Exception as e:  # noqa
+                    results['errors'].append((call, e))
+                    continue
+                for entity, values in call.endpoint.extract(res, call.ids).items():
+                    if entity not in call.entities:
+                        continue
+                    entity_results = results.setdefault(entity, {})
+                    for i, value in values.items():
+                        entity_results.setdefault(i, value)
+        return results
+
+    def fetch(self, needs):
+        """
+        Plan and run the calls to fetch entities, see :meth:`plan` and :meth:`run`
+
+        :param needs: dict of entity to a list of ids
+        :return: dict of entity to a dict of id to value, and ``'errors'``
+        """
+        return self.run(self.plan(needs))
@@ -0,0 +1,75 @@
+class Projection:
+    """
+    Selects fields from api objects, dropping everything else.
+
+    The spec is a collection of field names. Nested objects, or lists of objects, are
+    projected with a dict of field name -> spec. A spec of None or True keeps the whole field.
+
+    Example:
+        .. code-block:: python
+
+            projection = Projection(['pk', 'taken_at', 'like_count', {'user': {'pk', 'username'}}])
+            projection(media)
+            # {'pk': 1, 'taken_at': 1500000000, 'like_count': 3, 'user': {'pk': 2, 'username': 'x'}}
+
+            # with the client, for the media, comment and user objects returned by endpoints
+            api = Client(user_name, password, projections={'media': projection})
+    """
+
+    def __init__(self, spec):
+        """
+
+        :param spec: field names, or dict of field name -> spec, or a list mixing both
+        """
+        self.fields = self.compile(spec)
+
+    @classmethod
+    def compile(cls, spec):
+        """
+        Compile a spec into a tuple of (field, compiled spec or None)
+
+        :param spec: see :class:`Projection`
+        :return: tuple
+        """
+        if isinstance(spec, Projection):
+            return spec.fields
+        if isinstance(spec, (str, dict)):
+            spec = [spec]
+        fields = {}
+        for entry in spec:
+            if isinstance(entry, dict):
+                for name, sub_spec in entry.items():
+                    fields[name] = None if sub_spec in (None, True) else cls.compile(sub_spec)
+            elif isinstance(entry, str):
+                fields[entry] = None
+            else:
+                raise ValueError(f'Invalid projection field: {entry!r}')
+        return tuple(fields.items())
+
+    @staticmethod
+    def project(obj, fields):
+        """
+        Project an object with compiled fields
+
+        :param obj: dict
+        :param fields: compiled spec from :meth:`compile`
+        :return: a new dict
+        """
+        projected = {}
+        for name, sub_fields in fields:
+            if name not in obj:
+                continue
+            value = obj[name]
+            if sub_fields is not None:
+                if isinstance(value, list):
+                    value = [Projection.project(v, sub_fields) for v in value if isinstance(v, dict)]
+                elif isinstance(value, dict):
+                    value = Projection.project(value, sub_fields)
+            projected[name] = value
+        return projected
+
+    def __call__(self, obj):
+        return self.project(obj, self.fields)
+
+    def __repr__(self):
+        return f'Projection({self.fields!r})'
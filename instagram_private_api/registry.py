@@ -0,0 +1,464 @@
+"""
+Metadata of the endpoints of :class:`Client`, which drives response caching, retries,
+pagination, call metrics and the :class:`AsyncClient` wrappers.
+
+Every public method of the endpoint mixins is either described in :data:`ENDPOINTS`, if it makes
+one api call, or listed in :data:`HELPERS`, if it combines calls or makes none.
+"""
+import asyncio
+from collections import OrderedDict
+import functools
+import threading
+import time
+
+from .errors import ClientError, ClientConnectionError, ClientThrottledError
+from .utils import get_field
+
+GET = 'GET'
+POST = 'POST'
+
+
+class Paging:
+    """How an endpoint is paginated"""
+    __slots__ = ('param', 'next', 'more', 'items', 'iterator')
+
+    def __init__(self, param='max_id', next='next_max_id', more='more_available', items='items', iterator=None):
+        """
+
+        :param param: request kwarg of the cursor
+        :param next: response field of the next cursor
+        :param more: response field that is true if there are more pages, or None to
+            continue while there is a next cursor
+        :param items: response field of the items of a page
+        :param iterator: name of a :class:`Client` method that pages through the endpoint, for
+            endpoints with more complex cursors
+        """
+        self.param = param
+        self.next = next
+        self.more = more
+        self.items = items
+        self.iterator = iterator
+
+
+class Endpoint:
+    """Metadata of an endpoint method"""
+    __slots__ = ('name', 'path', 'method', 'signed', 'idempotent', 'paging', 'batch', 'batch_size', 'ttl', 'family')
+
+    def __init__(self, name, path, method=GET, signed=None, idempotent=None, paging=None,
+                 batch=None, batch_size=None, ttl=0, family='misc'):
+        """
+
+        :param name: name of the :class:`Client` method
+        :param path: api path, with the method arguments in braces
+        :param method: ``'GET'`` or ``'POST'``
+        :param signed: if the request body is signed, defaults to True for POST
+        :param idempotent: if the call can be retried, defaults to True for GET
+        :param paging: :class:`Paging`, or None if not paginated
+        :param batch: argument that takes a list of ids, for batch endpoints
+        :param batch_size: maximum number of ids per call of a batch endpoint
+        :param ttl: seconds a response can be cached, 0 if not cacheable
+        :param family: rate limit family, endpoints of a family share rate limits
+        """
+        self.name = name
+        self.path = path
+        self.method = method
+        self.signed = method == POST if signed is None else signed
+        self.idempotent = method == GET if idempotent is None else idempotent
+        self.paging = paging
+        self.batch = batch
+        self.batch_size = batch_size
+        self.ttl = ttl
+        self.family = family
+
+    @property
+    def labels(self):
+        """Metrics labels"""
+        return {'endpoint': self.name, 'family': self.family, 'method': self.method}
+
+    def __repr__(self):
+        return f'Endpoint({self.name!r}, {self.method} {self.path!r})'
+
+
+def _get(name, path, family, **kwargs):
+    return Endpoint(name, path, GET, family=family, **kwargs)
+
+
+def _post(name, path, family, **kwargs):
+    return Endpoint(name, path, POST, family=family, **kwargs)
+
+
+_feed = Paging()
+_users = Paging(more=None, items='users')
+
+#: name -> Endpoint
+ENDPOINTS = {e.name: e for e in [
+    # accounts
+    _post('current_user', 'accounts/current_user/', 'account', idempotent=True, ttl=60),
+    _post('edit_profile', 'accounts/edit_profile/', 'account'),
+    _post('remove_profile_picture', 'accounts/remove_profile_picture/', 'account'),
+    _post('set_account_private', 'accounts/set_private/', 'account', idempotent=True),
+    _post('set_account_public', 'accounts/set_public/', 'account', idempotent=True),
+    _post('logout', 'accounts/logout/', 'account', signed=False),
+    _get('presence_status', 'accounts/get_presence_disabled/', 'account'),
+    _post('set_presence_status', 'accounts/set_presence_disabled/', 'account', idempotent=True),
+    # collections
+    _get('list_collections', 'collections/list/', 'collections'),
+    _get('collection_feed', 'feed/collection/{collection_id}/', 'collections', paging=_feed),
+    _post('create_collection', 'collections/create/', 'collections'),
+    _post('edit_collection', 'collections/{collection_id}/edit/', 'collections'),
+    _post('delete_collection', 'collections/{collection_id}/delete/', 'collections'),
+    # discover
+    _get('explore', 'discover/explore/', 'discover', paging=_feed),
+    _get('discover_channels_home', 'discover/channels_home/', 'discover'),
+    _get('discover_chaining', 'discover/chaining/', 'discover', ttl=600),
+    _get('discover_top_live', 'discover/top_live/', 'live', paging=Paging(items='broadcasts')),
+    _post('top_live_status', 'discover/top_live_status/', 'live', idempotent=True, batch='broadcast_ids'),
+    # feed
+    _get('feed_liked', 'feed/liked/', 'feed', paging=_feed),
+    _post('feed_timeline', 'feed/timeline/', 'feed', signed=False, idempotent=True,
+          paging=Paging(items='feed_items')),
+    _get('feed_popular', 'feed/popular/', 'feed', paging=_feed),
+    _get('user_feed', 'feed/user/{user_id}/', 'feed', paging=_feed),
+    _get('username_feed', 'feed/user/{user_name}/username/', 'feed', paging=_feed),
+    _get('reels_tray', 'feed/reels_tray/', 'stories'),
+    _get('user_reel_media', 'feed/user/{user_id}/reel_media/', 'stories'),
+    _post('reels_media', 'feed/reels_media/', 'stories', idempotent=True, batch='user_ids', batch_size=20),
+    _get('feed_tag', 'feed/tag/{tag}/', 'tags', paging=_feed),
+    _get('user_story_feed', 'feed/user/{user_id}/story/', 'stories'),
+    _get('feed_location', 'feed/location/{location_id}/', 'locations', paging=_feed),
+    _get('saved_feed', 'feed/saved/', 'feed', paging=_feed),
+    _get('feed_only_me', 'feed/only_me_feed/', 'feed', paging=_feed),
+    # friendships
+    _get('autocomplete_user_list', 'friendships/autocomplete_user_list/', 'friendships'),
+    _get('user_following', 'friendships/{user_id}/following/', 'friendships', paging=_users),
+    _get('user_followers', 'friendships/{user_id}/followers/', 'friendships', paging=_users),
+    _get('friendships_pending', 'friendships/pending/', 'friendships'),
+    _get('friendships_show', 'friendships/show/{user_id}/', 'friendships', ttl=60),
+    _post('friendships_show_many', 'friendships/show_many/', 'friendships', signed=False, idempotent=True,
+          batch='user_ids', batch_size=100),
+    _post('friendships_create', 'friendships/create/{user_id}/', 'friendships', idempotent=True),
+    _post('friendships_destroy', 'friendships/destroy/{user_id}/', 'friendships', idempotent=True),
+    _post('friendships_block', 'friendships/block/{user_id}/', 'friendships', idempotent=True),
+    _post('friendships_unblock', 'friendships/unblock/{user_id}/', 'friendships', idempotent=True),
+    _post('block_friend_reel', 'friendships/block_friend_reel/{user_id}/', 'friendships', idempotent=True),
+    _post('unblock_friend_reel', 'friendships/unblock_friend_reel/{user_id}/', 'friendships', idempotent=True),
+    _post('set_reel_block_status', 'friendships/set_reel_block_status/', 'friendships', idempotent=True,
+          batch='user_ids'),
+    _post('blocked_reels', 'friendships/blocked_reels/', 'friendships', idempotent=True),
+    _post('enable_post_notifications', 'friendships/favorite/{user_id}/', 'friendships', idempotent=True),
+    _post('disable_post_notifications', 'friendships/unfavorite/{user_id}/', 'friendships', idempotent=True),
+    _post('ignore_user', 'friendships/ignore/{user_id}/', 'friendships', idempotent=True),
+    _post('remove_follower', 'friendships/remove_follower/{user_id}/', 'friendships', idempotent=True),
+    # highlights
+    _get('stories_archive', 'archive/reel/day_shells/', 'stories', paging=_feed),
+    _get('highlights_user_feed', 'highlights/{user_id}/highlights_tray/', 'stories', ttl=300),
+    _post('highlight_create', 'highlights/create_reel/', 'stories'),
+    _post('highlight_edit', 'highlights/{highlight_id}/edit_reel/', 'stories'),
+    _post('highlight_delete', 'highlights/{highlight_id}/delete_reel/', 'stories', idempotent=True),
+    # igtv
+    _post('tvchannel', 'igtv/channel/', 'igtv', idempotent=True, paging=Paging(items='items')),
+    _get('tvguide', 'igtv/tv_guide/', 'igtv'),
+    _get('search_igtv', 'igtv/search/', 'search'),
+    # live
+    _post('broadcast_like', 'live/{broadcast_id}/like/', 'live'),
+    _get('broadcast_like_count', 'live/{broadcast_id}/get_like_count/', 'live'),
+    _get('broadcast_comments', 'live/{broadcast_id}/get_comment/', 'live'),
+    _post('broadcast_heartbeat_and_viewercount', 'live/{broadcast_id}/heartbeat_and_get_viewer_count/', 'live',
+          signed=False, idempotent=True),
+    _post('broadcast_comment', 'live/{broadcast_id}/comment/', 'live'),
+    _get('broadcast_info', 'live/{broadcast_id}/info/', 'live'),
+    _get('suggested_broadcasts', 'live/get_suggested_broadcasts/', 'live'),
+    _get('replay_broadcast_comments', 'live/{broadcast_id}/get_post_live_comments/', 'live'),
+    _get('replay_broadcast_likes', 'live/{broadcast_id}/get_post_live_likes/', 'live'),
+    # locations
+    _get('location_info', 'locations/{location_id}/info/', 'locations', ttl=3600),
+    _get('location_related', 'locations/{location_id}/related/', 'locations', ttl=3600),
+    _get('location_search', 'location_search/', 'search', ttl=600),
+    _get('location_fb_search', 'fbsearch/places/', 'search', paging=Paging(iterator='location_fb_search_iter')),
+    _post('location_section', 'locations/{location_id}/sections/', 'locations', signed=False, idempotent=True,
+          paging=Paging(iterator='location_section_iter')),
+    _get('location_stories', 'locations/{location_id}/story/', 'locations'),
+    # media
+    _get('media_info', 'media/{media_id}/info/', 'media', ttl=60),
+    _get('medias_info', 'media/infos/', 'media', batch='media_ids', batch_size=50, ttl=60),
+    _get('media_permalink', 'media/{media_id}/permalink/', 'media', ttl=86400),
+    _get('media_comments', 'media/{media_id}/comments/', 'comments',
+         paging=Paging(more='has_more_comments', items='comments')),
+    _get('comment_replies', 'media/{media_id}/comments/{comment_id}/child_comments/', 'comments',
+         paging=Paging(next='next_max_child_cursor', more='has_more_tail_child_comments', items='child_comments')),
+    _get('comment_inline_replies', 'media/{media_id}/comments/{comment_id}/inline_child_comments/', 'comments'),
+    _post('edit_media', 'media/{media_id}/edit_media/', 'media', idempotent=True),
+    _post('delete_media', 'media/{media_id}/delete/', 'media', idempotent=True),
+    _post('post_comment', 'media/{media_id}/comment/', 'comments'),
+    _post('delete_comment', 'media/{media_id}/comment/{comment_id}/delete/', 'comments', idempotent=True),
+    _post('bulk_delete_comments', 'media/{media_id}/comment/bulk_delete/', 'comments', idempotent=True,
+          batch='comment_ids', batch_size=25),
+    _get('media_likers', 'media/{media_id}/likers/', 'likes'),
+    _get('media_likers_chrono', 'media/{media_id}/likers_chrono/', 'likes'),
+    _post('post_like', 'media/{media_id}/like/', 'likes', idempotent=True),
+    _post('delete_like', 'media/{media_id}/unlike/', 'likes', idempotent=True),
+    _post('media_seen', 'media/seen/', 'stories', idempotent=True),
+    _post('comment_like', 'media/{comment_id}/comment_like/', 'likes', idempotent=True),
+    _get('comment_likers', 'media/{comment_id}/comment_likers/', 'likes'),
+    _post('comment_unlike', 'media/{comment_id}/comment_unlike/', 'likes', idempotent=True),
+    _post('save_photo', 'media/{media_id}/save/', 'collections', idempotent=True),
+    _post('unsave_photo', 'media/{media_id}/unsave/', 'collections', idempotent=True),
+    _post('disable_comments', 'media/{media_id}/disable_comments/', 'media', signed=False, idempotent=True),
+    _post('enable_comments', 'media/{media_id}/enable_comments/', 'media', signed=False, idempotent=True),
+    _post('media_only_me', 'media/{media_id}/only_me/', 'media', idempotent=True),
+    _get('story_viewers', 'media/{story_pk}/list_reel_media_viewer/', 'stories', paging=_users),
+    # misc
+    _post('sync', 'qe/sync/', 'misc'),
+    _post('expose', 'qe/expose/', 'misc'),
+    _post('megaphone_log', 'megaphone/log/', 'misc', signed=False),
+    _get('ranked_recipients', 'direct_v2/ranked_recipients/', 'direct'),
+    _get('recent_recipients', 'direct_share/recent_recipients/', 'direct'),
+    _get('news', 'news/', 'news'),
+    _get('news_inbox', 'news/inbox/', 'news'),
+    _get('direct_v2_inbox', 'direct_v2/inbox/', 'direct'),
+    _get('oembed', 'oembed/', 'misc', ttl=3600),
+    _get('translate', 'language/translate/', 'misc', ttl=3600),
+    _get('bulk_translate', 'language/bulk_translate/', 'misc', batch='comment_ids', batch_size=20, ttl=3600),
+    _get('top_search', 'fbsearch/topsearch/', 'search', ttl=60),
+    _post('stickers', 'creatives/assets/', 'misc', idempotent=True, ttl=3600),
+    # tags
+    _get('tag_info', 'tags/{tag}/info/', 'tags', ttl=300),
+    _get('tag_related', 'tags/{tag}/related/', 'tags', ttl=3600),
+    _get('tag_search', 'tags/search/', 'search', paging=Paging(iterator='tag_search_iter')),
+    _get('tags_user_following', 'users/{user_id}/following_tags_info/', 'tags', ttl=300),
+    _get('tag_follow_suggestions', 'tags/suggested/', 'tags'),
+    _post('tag_follow', 'tags/follow/{tag}/', 'tags', idempotent=True),
+    _post('tag_unfollow', 'tags/unfollow/{tag}/', 'tags', idempotent=True),
+    _post('tag_section', 'tags/{tag}/sections/', 'tags', signed=False, idempotent=True,
+          paging=Paging(iterator='tag_section_iter')),
+    # upload
+    _post('configure', 'media/configure/', 'upload'),
+    _post('configure_video', 'media/configure/', 'upload'),
+    _post('configure_to_reel', 'media/configure_to_story/', 'upload'),
+    _post('configure_video_to_reel', 'media/configure_to_story/', 'upload'),
+    # users
+    _get('user_info', 'users/{user_id}/info/', 'users', ttl=300),
+    _get('username_info', 'users/{user_name}/usernameinfo/', 'users', ttl=300),
+    _get('user_detail_info', 'users/{user_id}/full_detail_info/', 'users', ttl=60),
+    _get('user_map', 'maps/user/{user_id}/', 'users'),
+    _get('search_users', 'users/search/', 'search', ttl=60),
+    _post('check_username', 'users/check_username/', 'users', idempotent=True),
+    _get('blocked_user_list', 'users/blocked_list/', 'users', paging=Paging(more=None, items='blocked_list')),
+    _get('user_reel_settings', 'users/reel_settings/', 'users'),
+    _post('set_reel_settings', 'users/set_reel_settings/', 'users', idempotent=True),
+    # usertags
+    _get('usertag_feed', 'usertags/{user_id}/feed/', 'feed', paging=_feed),
+    _post('usertag_self_remove', 'usertags/{media_id}/remove/', 'media', idempotent=True),
+]}
+
+#: public methods of the endpoint mixins that combine several calls, or make none
+HELPERS = frozenset([
+    'login', 'change_profile_picture', 'enable_presence_status', 'disable_presence_status',
+    'self_feed', 'story_fetcher', 'friendships_show_many_iter', 'friendships_show_many_bulk',
+    'user_broadcast', 'location_fb_search_iter', 'location_section_iter', 'media_info_loader',
+    'media_comments_iter', 'media_n_comments', 'media_comment_threads', 'bulk_delete_comments_chunked',
+    'media_undo_only_me', 'seen_reporter', 'bulk_translate_chunked', 'tag_search_iter', 'tag_section_iter',
+    'standard_ratios', 'reel_ratios', 'compatible_aspect_ratio', 'reel_compatible_aspect_ratio',
+    'post_photo', 'post_video', 'post_photo_story', 'post_video_story', 'post_album',
+])
+
+
+class ResponseCache:
+    """
+    Thread-safe LRU cache of responses, for the ``response_cache`` option of :class:`Client`.
+    Cached responses are shared between callers and should not be modified.
+    """
+
+    def __init__(self, maxsize=1024):
+        """
+
+        :param maxsize: Maximum number of responses
+        """
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """
+        Get a response
+
+        :param key: cache key
+        :return: the response, or None if not cached or expired
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value, ttl):
+        """
+        Cache a response
+
+        :param key: cache key
+        :param value: response
+        :param ttl: seconds before the response expires
+        """
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def retryable(error):
+    """True if a call that raised error can be retried: connection errors, throttling and server errors"""
+    if isinstance(error, (ClientConnectionError, ClientThrottledError)):
+        return True
+    return isinstance(error, ClientError) and (error.code or 0) >= 500
+
+
+def wrap(endpoint, func):
+    """
+    Wrap an endpoint method with the response cache, retries and ``on_call`` hook of the client,
+    according to the endpoint metadata
+
+    :param endpoint: :class:`Endpoint`
+    :param func: the endpoint method
+    :return: the wrapped method
+    """
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        cache, retries, on_call = self.response_cache, self.retries, self.on_call
+        if cache is None and not retries and on_call is None:
+            return func(self, *args, **kwargs)
+
+        key = None
+        if cache is not None and endpoint.ttl:
+            # responses such as current_user and friendships_show depend on the account
+            key = (self.authenticated_user_id, endpoint.name, repr(args), repr(sorted(kwargs.items())))
+            res = cache.get(key)
+            if res is not None:
+                return res
+
+        attempts = 1 + (retries if endpoint.idempotent else 0)
+        for attempt in range(attempts):
+            start = time.perf_counter()
+            try:
+                res = func(self, *args, **kwargs)
+            except Exception as e:
+                if on_call is not None:
+                    on_call(endpoint.labels, time.perf_counter() - start, e)
+                if attempt + 1 >= attempts or not retryable(e):
+                    raise
+                time.sleep(self.retry_backoff * 2 ** attempt)
+                continue
+            if on_call is not None:
+                on_call(endpoint.labels, time.perf_counter() - start, None)
+            if key is not None:
+                cache.set(key, res, endpoint.ttl)
+            return res
+
+    wrapper.endpoint = endpoint
+    return wrapper
+
+
+def install(cls):
+    """
+    Wrap the endpoint methods of a client class, see :func:`wrap`
+
+    :param cls: :class:`Client` class
+    :return: cls
+    """
+    for name, endpoint in ENDPOINTS.items():
+        func = getattr(cls, name)
+        if getattr(func, 'endpoint', None) is None:
+            setattr(cls, name, wrap(endpoint, func))
+    return cls
+
+
+def paginate(client, name, *args, **kwargs):
+    """
+    Page through a paginated endpoint
+
+    :param client: :class:`Client`
+    :param name: endpoint method name
+    :param args: endpoint method args
+    :param kwargs: endpoint method kwargs, including a starting cursor
+    :return: generator of pages
+    """
+    endpoint = ENDPOINTS.get(name)
+    if endpoint is None or endpoint.paging is None:
+        raise ValueError(f'{name} is not a paginated endpoint')
+    paging = endpoint.paging
+    if paging.iterator:
+        yield from getattr(client, paging.iterator)(*args, **kwargs)
+        return
+    method = getattr(client, name)
+    cursor = None
+    while True:
+        res = method(*args, **kwargs)
+        yield res
+        next_cursor = get_field(res, paging.next)
+        more = get_field(res, paging.more) if paging.more else True
+        if not (next_cursor and more) or next_cursor == cursor:
+            return
+        cursor = kwargs[paging.param] = next_cursor
+
+
+class AsyncClient:
+    """
+    Async wrappers of the endpoints of a :class:`Client`, run in an executor.
+    Other attributes are those of the client.
+
+    Example:
+        .. code-block:: python
+
+            aclient = AsyncClient(api)
+            feeds = await asyncio.gather(*[aclient.user_feed(user_id) for user_id in user_ids])
+            async for page in aclient.paginate('user_followers', user_id, rank_token):
+                ...
+    """
+
+    def __init__(self, client, executor=None):
+        """
+
+        :param client: :class:`Client`
+        :param executor: :class:`concurrent.futures.Executor` to run the calls in, defaults to
+            the event loop default executor
+        """
+        self.client = client
+        self.executor = executor
+
+    def _run(self, func, *args, **kwargs):
+        return asyncio.get_running_loop().run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+
+    def __getattr__(self, name):
+        attr = getattr(self.client, name)
+        if name not in ENDPOINTS:
+            return attr
+
+        @functools.wraps(attr)
+        async def call(*args, **kwargs):
+            return await self._run(attr, *args, **kwargs)
+
+        return call
+
+    async def paginate(self, name, *args, **kwargs):
+        """Async version of :meth:`Client.paginate`"""
+        pages = paginate(self.client, name, *args, **kwargs)
+        done = object()
+        while True:
+            page = await self._run(next, pages, done)
+            if page is done:
+                return
+            yield page
@@ -0,0 +1,149 @@
+"""
+Buffered reporters that batch per item reports into fewer calls.
+"""
+import atexit
+import logging
+from random import randint
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def reel_seen_entry(reel, seen_at):
+    """
+    Get the ``reels`` key and value of :meth:`Client.media_seen` for a reel media
+
+    :param reel: reel media object
+    :param seen_at: view timestamp
+    :return: tuple of key, value
+    """
+    return f"{reel['id']}_{reel['user']['pk']}", [f"{reel['taken_at']}_{seen_at}"]
+
+
+def reels_seen(reels, now=None):
+    """
+    Build the ``reels`` param of :meth:`Client.media_seen` from a list of reel media, with
+    view times a few seconds apart, the most recent media seen last
+
+    :param reels: list of reel media objects
+    :param now: timestamp of the last view, defaults to the current time
+    :return: dict
+    """
+    now = int(now or time.time())
+    seen = {}
+    for i, reel in enumerate(sorted(reels, key=lambda m: m['taken_at'], reverse=True)):
+        reel_seen_at = now - min(i + 1 + randint(0, 2), max(0, now - reel['taken_at']))
+        key, value = reel_seen_entry(reel, reel_seen_at)
+        seen[key] = value
+    return seen
+
+
+class SeenReporter:
+    """
+    Buffers reel views and reports them with one :meth:`Client.media_seen` call when
+    ``max_batch_size`` views are pending, ``interval`` seconds after the first pending view,
+    on :meth:`flush`, or on :meth:`close`, which is also called at interpreter exit.
+    Views of a failed call are kept for the next flush.
+
+    Example:
+        .. code-block:: python
+
+            with api.seen_reporter() as reporter:
+                for reel in reels:
+                    for item in reel['items']:
+                        reporter.add(item)
+    """
+
+    def __init__(self, client, max_batch_size=50, interval=10.0):
+        """
+
+        :param client: :class:`Client`
+        :param max_batch_size: Number of pending views that triggers a flush
+        :param interval: Maximum number of seconds a view is pending
+        """
+        self.client = client
+        self.max_batch_size = max_batch_size
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending = {}
+        self._timer = None
+        self._closed = False
+        #: number of media_seen calls made
+        self.batches = 0
+        #: number of views reported
+        self.reported = 0
+        atexit.register(self.close)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return len(self._pending)
+
+    def add(self, reel, seen_at=None):
+        """
+        Add a reel media view
+
+        :param reel: reel media object, with ``id``, ``taken_at`` and ``user``
+        :param seen_at: view timestamp, defaults to now
+        """
+        if self._closed:
+            raise RuntimeError('SeenReporter is closed')
+        seen_at = int(seen_at or time.time())
+        key, value = reel_seen_entry(reel, max(seen_at, reel['taken_at']))
+        with self._lock:
+            self._pending[key] = value
+            full = len(self._pending) >= self.max_batch_size
+            if not full and self._timer is None:
+                self._timer = threading.Timer(self.interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if full:
+            self.flush()
+
+    def flush(self):
+        """
+        Report the pending views now
+
+        :return: the :meth:`Client.media_seen` response, or None if nothing was pending or the call failed
+        """
+        with self._flush_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                batch, self._pending = self._pending, {}
+            if not batch:
+                return None
+            try:
+                res = self.client.media_seen(batch)
+            except Exception as e:  # noqa
+                logger.warning(f'media_seen failed, {len(batch)} views kept for the next flush: {e!r}')
+                with self._lock:
+                    batch.update(self._pending)
+                    self._pending = batch
+                    if self._timer is None and not self._closed:
+                        self._timer = threading.Timer(self.interval, self.flush)
+                        self._timer.daemon = True
+                        self._timer.start()
+                return None
+            self.batches += 1
+            self.reported += len(batch)
+            return res
+
+    def close(self):
+        """Report the pending views and stop the reporter"""
+        if self._closed:
+            return
+        self._closed = True
+        atexit.unregister(self.close)
+        self.flush()
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
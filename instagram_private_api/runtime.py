@@ -0,0 +1,205 @@
+"""
+Run a task over many work items, such as user ids, tags or media ids, in several processes,
+each with its own :class:`Client` rebuilt from saved settings, for jobs that are limited by
+the CPU time spent decoding and transforming responses rather than by the network.
+"""
+import multiprocessing
+import pickle
+import queue
+
+from .client import Client
+
+
+def _call(func, item):
+    if isinstance(item, tuple):
+        return func(*item)
+    if isinstance(item, dict):
+        return func(**item)
+    return func(item)
+
+
+def _dumps(index, result, error):
+    """Pickle a result in the worker, so that unpicklable results are reported rather than lost"""
+    try:
+        return pickle.dumps((index, result, error), pickle.HIGHEST_PROTOCOL)
+    except Exception as e:  # noqa
+        return pickle.dumps(
+            (index, None, RuntimeError(f'Cannot pickle the result of item {index}: {e!r}')), pickle.HIGHEST_PROTOCOL)
+
+
+def _worker(task, username, password, settings, client_kwargs, tasks, results):
+    try:
+        client = Client(username, password, settings=settings, **client_kwargs)
+    except Exception as e:  # noqa
+        results.put(_dumps(None, None, e))
+        return
+    if isinstance(task, str):
+        func = getattr(client, task)
+    else:
+        def func(*args, **kwargs):
+            return task(client, *args, **kwargs)
+    while True:
+        job = tasks.get()
+        if job is None:
+            return
+        index, item = job
+        try:
+            payload = _dumps(index, _call(func, item), None)
+        except Exception as e:  # noqa
+            payload = _dumps(index, None, e)
+        results.put(payload)
+
+
+class ShardedRuntime:
+    """
+    Runs a task over work items in a pool of processes, each with a :class:`Client` rebuilt from
+    the settings of a logged in client, so that workers do not log in again. Items are sent to
+    the workers through a local queue, with at most max_pending items queued or running so that
+    a large or endless iterable of items is consumed only as fast as the workers keep up.
+
+    The task is an endpoint method name, or a function taking the worker client and an item,
+    which must be importable by the workers, i.e. defined at the top level of a module.
+
+    Example:
+        .. code-block:: python
+
+            def top_likers(client, user_id):
+                feed = client.user_feed(user_id)
+                return user_id, sorted(feed['items'], key=lambda m: m['like_count'])[-3:]
+
+            with ShardedRuntime(top_likers, api.settings, processes=4) as runtime:
+                for user_id, medias in runtime.map(user_ids):
+                    ...
+    """
+
+    def __init__(self, task, settings, processes=None, max_pending=None, username=None, password=None,
+                 mp_context=None, **client_kwargs):
+        """
+
+        :param task: :class:`Client` method name, or a function taking a client and an item
+        :param settings: :attr:`Client.settings` of a logged in client
+        :param processes: Number of worker processes. Default: the number of cpus
+        :param max_pending: Maximum number of items queued or running, and results waiting to be
+            yielded in order. Default: 4 per process
+        :param username: Login username, only used if the session cookie is rejected
+        :param password: Login password
+        :param mp_context: :mod:`multiprocessing` context, e.g. ``multiprocessing.get_context('spawn')``
+        :param client_kwargs: options of the worker clients, e.g. ``as_models=True``
+        """
+        if not (settings or {}).get('cookie'):
+            raise ValueError('settings with a cookie are required, the workers do not log in')
+        self.task = task
+        self.settings = settings
+        self.processes = processes or multiprocessing.cpu_count()
+        self.max_pending = max_pending or 4 * self.processes
+        self.username = username
+        self.password = password
+        self.client_kwargs = client_kwargs
+        self._context = mp_context or multiprocessing.get_context()
+        self._workers = []
+        self._tasks = None
+        self._results = None
+        self._run = 0
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def start(self):
+        """Start the worker processes, :meth:`map` starts them if needed"""
+        if self._workers:
+            return
+        self._tasks = self._context.Queue()
+        self._results = self._context.Queue()
+        for _ in range(self.processes):
+            worker = self._context.Process(
+                target=_worker, daemon=True,
+                args=(self.task, self.username, self.password, self.settings, self.client_kwargs,
+                      self._tasks, self._results))
+            worker.start()
+            self._workers.append(worker)
+
+    def close(self):
+        """Stop the worker processes once they finish the queued items"""
+        if not self._workers:
+            return
+        # one sentinel per worker, any worker can take any of them
+        for _ in self._workers:
+            self._tasks.put(None)
+        # a worker cannot exit until its results are read from the pipe,
+        # so the results left by an aborted map are drained and dropped
+        while any(worker.is_alive() for worker in self._workers):
+            try:
+                self._results.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        for worker in self._workers:
+            worker.join()
+        self._workers = []
+        self._tasks.close()
+        self._results.close()
+
+    def _get_result(self):
+        while True:
+            try:
+                return pickle.loads(self._results.get(timeout=1))
+            except queue.Empty:
+                dead = [w for w in self._workers if not w.is_alive()]
+                if dead:
+                    raise RuntimeError(f'Worker process exited with code {dead[0].exitcode}')
+
+    def map(self, items, ordered=True, return_exceptions=False):
+        """
+        Run the task for each item
+
+        :param items: iterable of items: a tuple of positional arguments, a dict of keyword arguments,
+            or a single argument
+        :param ordered: yield results in the order of items, otherwise (index, result) tuples as they complete
+        :param return_exceptions: yield the exception of a failed item instead of raising it
+        :return: generator
+        """
+        self.start()
+        # results of the items of an earlier map that was not run to completion are dropped
+        self._run += 1
+        run = self._run
+        items = (((run, index), item) for index, item in enumerate(items))
+        sent = 0
+        received = 0
+        next_index = 0
+        done = {}
+        exhausted = False
+        while True:
+            # back-pressure: results waiting to be yielded in order count as pending
+            pending = sent - (next_index if ordered else received)
+            while not exhausted and pending < self.max_pending:
+                try:
+                    self._tasks.put(next(items))
+                except StopIteration:
+                    exhausted = True
+                    break
+                sent += 1
+                pending += 1
+            if received == sent:
+                return
+
+            index, result, error = self._get_result()
+            if index is None:
+                raise error
+            if index[0] != run:
+                continue
+            index = index[1]
+            received += 1
+            if error is not None:
+                if not return_exceptions:
+                    raise error
+                result = error
+            if not ordered:
+                yield index, result
+                continue
+            done[index] = result
+            while next_index in done:
+                yield done.pop(next_index)
+                next_index += 1
@@ -0,0 +1,122 @@
+"""
+Typed response schemas for ``Client(typed_responses=True)``.
+
+The responses of the endpoints that declare a schema are decoded straight into
+msgspec Structs. Decoding, validation and type conversion are done in a single pass,
+and fields not declared in the schema are skipped instead of being built as dicts.
+"""
+from typing import List, Optional, Union
+
+try:
+    import msgspec
+except ImportError:
+    # msgspec is optional and only required for typed responses
+    msgspec = None
+
+
+if msgspec is not None:
+    class Struct(msgspec.Struct, gc=False):
+        """Base struct. Responses are trees so the structs do not need to be tracked by the gc."""
+
+    class ImageVersion(Struct):
+        url: str
+        width: int = 0
+        height: int = 0
+
+    class ImageVersions(Struct):
+        candidates: List[ImageVersion] = []
+
+    class VideoVersion(Struct):
+        url: str
+        width: int = 0
+        height: int = 0
+        type: Optional[int] = None
+
+    class User(Struct):
+        pk: int
+        username: str
+        full_name: str = ''
+        is_private: bool = False
+        is_verified: bool = False
+        profile_pic_url: str = ''
+        biography: Optional[str] = None
+        external_url: Optional[str] = None
+        media_count: Optional[int] = None
+        follower_count: Optional[int] = None
+        following_count: Optional[int] = None
+
+    class Comment(Struct):
+        pk: int
+        text: str = ''
+        created_at: int = 0
+        created_at_utc: int = 0
+        user: Optional[User] = None
+        media_id: Optional[int] = None
+        comment_like_count: int = 0
+        child_comment_count: int = 0
+        parent_comment_id: Optional[int] = None
+
+    class CarouselMedia(Struct):
+        id: str = ''
+        media_type: int = 1
+        original_width: int = 0
+        original_height: int = 0
+        image_versions2: Optional[ImageVersions] = None
+        video_versions: List[VideoVersion] = []
+        video_duration: Optional[float] = None
+
+    class Media(CarouselMedia):
+        pk: int = 0
+        code: str = ''
+        taken_at: int = 0
+        user: Optional[User] = None
+        caption: Optional[Comment] = None
+        like_count: int = 0
+        comment_count: int = 0
+        view_count: Optional[int] = None
+        has_liked: bool = False
+        carousel_media: List[CarouselMedia] = []
+
+    class Response(Struct):
+        status: str = ''
+        message: Optional[str] = None
+
+    class FeedResponse(Response):
+        """:meth:`Client.user_feed`, :meth:`Client.username_feed`"""
+        items: List[Media] = []
+        num_results: int = 0
+        more_available: bool = False
+        next_max_id: Union[str, int, None] = None
+
+    class UsersResponse(Response):
+        """:meth:`Client.user_followers`, :meth:`Client.user_following`"""
+        users: List[User] = []
+        big_list: bool = False
+        next_max_id: Union[str, int, None] = None
+
+    class CommentsResponse(Response):
+        """:meth:`Client.media_comments`"""
+        comments: List[Comment] = []
+        preview_comments: List[Comment] = []
+        comment_count: int = 0
+        has_more_comments: bool = False
+        has_more_headload_comments: bool = False
+        next_max_id: Union[str, int, None] = None
+        next_min_id: Union[str, int, None] = None
+
+
+_decoders = {}
+
+
+def decode(content, schema):
+    """
+    Decode a json response into a schema
+
+    :param content: json str or bytes
+    :param schema: name of a response schema in this module, e.g. ``'FeedResponse'``
+    :return: schema instance
+    """
+    decoder = _decoders.get(schema)
+    if decoder is None:
+        decoder = _decoders[schema] = msgspec.json.Decoder(globals()[schema])
+    return decoder.decode(content)
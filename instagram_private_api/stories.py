@@ -0,0 +1,116 @@
+"""
+Fetch the stories of many users, refetching only the reels that changed.
+"""
+import time
+
+from .bulk import map_chunks
+from .models import Reel
+
+
+class StoryFetcher:
+    """
+    Keeps the story reels of a set of users up to date with as few calls as possible.
+
+    Each :meth:`fetch` gets the :meth:`Client.reels_tray` and compares the ``latest_reel_media``
+    of each user with that of the reel fetched last time. Only the users with newer stories
+    are fetched, with concurrent :meth:`Client.reels_media` calls of up to ``batch_size`` users.
+    Reels are kept as compact :class:`Reel` models.
+
+    Example:
+        .. code-block:: python
+
+            fetcher = api.story_fetcher()
+            while True:
+                stories = fetcher.fetch(user_ids)
+                for user_id, reel in stories.items():
+                    print(user_id, len(reel.items))
+                time.sleep(300)
+    """
+
+    def __init__(self, client, batch_size=20, max_workers=4, fetch_untracked=True):
+        """
+
+        :param client: :class:`Client`
+        :param batch_size: Maximum number of users per ``reels_media`` call
+        :param max_workers: Maximum number of concurrent ``reels_media`` calls
+        :param fetch_untracked: Also fetch the users that are not in the reels tray, such as
+            users that are not followed, whose ``latest_reel_media`` is not known. If False,
+            only the users in the tray are fetched.
+        """
+        self.client = client
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.fetch_untracked = fetch_untracked
+        #: user id -> latest Reel
+        self.reels = {}
+        #: user ids of the chunks that failed in the last fetch, they are retried by the next fetch
+        self.failed_user_ids = []
+        #: number of users fetched with reels_media in the last fetch
+        self.fetched = 0
+
+    @staticmethod
+    def _reel_user_id(reel):
+        user = reel.get('user')
+        return str(user.get('pk') if user else reel.get('id'))
+
+    def changed_user_ids(self, user_ids=None, tray=None):
+        """
+        Get the users whose stories changed since the last fetch
+
+        :param user_ids: list of user ids, or None for all the users in the tray
+        :param tray: list of reels from :meth:`Client.reels_tray`, fetched if None
+        :return: list of user ids
+        """
+        if tray is None:
+            tray = self.client.reels_tray().get('tray') or []
+        latest = {self._reel_user_id(r): r.get('latest_reel_media') or 0 for r in tray}
+        if user_ids is None:
+            user_ids = list(latest)
+        changed = []
+        for user_id in map(str, user_ids):
+            reel = self.reels.get(user_id)
+            if user_id in latest:
+                if reel is None or latest[user_id] > (reel.latest_reel_media or 0):
+                    changed.append(user_id)
+            elif self.fetch_untracked:
+                changed.append(user_id)
+            elif reel is not None:
+                # no longer in the tray, no active stories
+                del self.reels[user_id]
+        return changed
+
+    def fetch(self, user_ids=None, tray=None):
+        """
+        Get the current story reels of users
+
+        :param user_ids: list of user ids, or None for all the users in the reels tray
+        :param tray: list of reels from :meth:`Client.reels_tray`, fetched if None
+        :return: dict of user id to :class:`Reel`, for the users with active stories
+        """
+        changed = self.changed_user_ids(user_ids, tray)
+        self.failed_user_ids = []
+        self.fetched = len(changed)
+        pool = self.client.string_pool
+        for chunk in map_chunks(self.client.reels_media, changed, self.batch_size, max_workers=self.max_workers):
+            if not chunk.ok:
+                self.failed_user_ids.extend(chunk.items)
+                continue
+            found = set()
+            res = chunk.result
+            for reel in (res.get('reels_media') or []) + list((res.get('reels') or {}).values()):
+                if not isinstance(reel, Reel):
+                    reel = Reel.from_dict(reel, pool)
+                user_id = self._reel_user_id(reel)
+                found.add(user_id)
+                self.reels[user_id] = reel
+            for user_id in chunk.items:
+                if user_id not in found:
+                    self.reels.pop(user_id, None)
+
+        now = time.time()
+        for user_id, reel in list(self.reels.items()):
+            if reel.expiring_at and reel.expiring_at < now:
+                del self.reels[user_id]
+        if user_ids is None:
+            return dict(self.reels)
+        return {user_id: self.reels[user_id] for user_id in map(str, user_ids) if user_id in self.reels}
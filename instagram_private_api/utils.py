@@ -1,10 +1,18 @@
 from base64 import b64encode
+from binascii import a2b_base64, b2a_base64, Error as BinasciiError
 from hashlib import sha256
 from hmac import new as hmac_new
+from operator import index as to_index
 from random import randint
 from re import match
 from time import time
 
+try:
+    import numpy as np
+except ImportError:
+    # numpy is optional and only used to vectorise the batch InstagramID conversions
+    np = None
+
 
 VALID_UUID_RE = r'^[a-f\d]{8}\-[a-f\d]{4}\-[a-f\d]{4}-[a-f\d]{4}-[a-f\d]{12}$'
 
@@ -16,6 +24,17 @@ def raise_if_invalid_rank_token(val, required=True):
         raise ValueError(f'Invalid rank_token: {val}')
 
 
+def get_field(obj, key, default=None):
+    """Get a field of a dict, model, lazy document or typed response"""
+    if obj is None:
+        return default
+    if hasattr(obj, 'get'):
+        value = obj.get(key)
+    else:
+        value = getattr(obj, key, None)
+    return default if value is None else value
+
+
 def gen_user_breadcrumb(size):
     """
     Used in comments posting.
@@ -43,16 +62,28 @@ class InstagramID:
     """
     ENCODING_CHARS = 'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_'
 
+    # ENCODING_CHARS is the url-safe base64 alphabet, so shortcodes can be converted
+    # with binascii 4 characters (3 bytes) at a time. 12 chars = 9 bytes covers any 64-bit id.
+    _B64_CODE_LENGTH = 12
+    _B64_BYTE_LENGTH = 9
+    _B64_ENCODE_TABLE = bytes.maketrans(b'+/', b'-_')
+    # standard base64 chars not in ENCODING_CHARS are mapped to a char that binascii discards
+    _B64_DECODE_TABLE = bytes.maketrans(b'-_+/', b'+/**')
+
     @staticmethod
     def _encode(num, alphabet=ENCODING_CHARS):
         """Covert a numeric value to a shortcode."""
+        # int-like values such as numpy integers have no to_bytes
+        num = to_index(num)
         if num == 0:
             return alphabet[0]
+        if alphabet == InstagramID.ENCODING_CHARS and 0 < num < 1 << (8 * InstagramID._B64_BYTE_LENGTH):
+            code = b2a_base64(num.to_bytes(InstagramID._B64_BYTE_LENGTH, 'big'), newline=False)
+            return code.translate(InstagramID._B64_ENCODE_TABLE).lstrip(b'A').decode('ascii')
         arr = []
         base = len(alphabet)
         while num:
-            rem = num % base
-            num //= base
+            num, rem = divmod(num, base)
             arr.append(alphabet[rem])
         arr.reverse()
         return ''.join(arr)
@@ -60,14 +91,22 @@ class InstagramID:
     @staticmethod
     def _decode(shortcode, alphabet=ENCODING_CHARS):
         """Covert a shortcode to a numeric value."""
+        if alphabet == InstagramID.ENCODING_CHARS and len(shortcode) <= InstagramID._B64_CODE_LENGTH:
+            try:
+                value = a2b_base64(
+                    shortcode.rjust(InstagramID._B64_CODE_LENGTH, 'A').encode('ascii').translate(
+                        InstagramID._B64_DECODE_TABLE))
+            except (BinasciiError, UnicodeEncodeError):
+                raise ValueError(f'Invalid shortcode: {shortcode}')
+            # discarded invalid characters result in a short read
+            if len(value) != InstagramID._B64_BYTE_LENGTH:
+                raise ValueError(f'Invalid shortcode: {shortcode}')
+            return int.from_bytes(value, 'big')
+
         base = len(alphabet)
-        strlen = len(shortcode)
         num = 0
-        idx = 0
         for char in shortcode:
-            power = (strlen - (idx + 1))
-            num += alphabet.index(char) * (base ** power)
-            idx += 1
+            num = num * base + alphabet.index(char)
         return num
 
     @classmethod
@@ -111,3 +150,76 @@ class InstagramID:
         :return:
         """
         return cls._decode(short_code)
+
+    @classmethod
+    def shorten_ids(cls, internal_ids):
+        """
+        Returns the shortcodes for multiple numeric media PKs
+
+        :param internal_ids: list of numeric ID values, or a numpy array of int64/uint64
+        :return: list of shortcodes, or a numpy str array if a numpy array is passed in
+        """
+        if np is not None and isinstance(internal_ids, np.ndarray):
+            return cls._encode_array(internal_ids)
+        encode = cls._encode
+        return [encode(int(internal_id)) for internal_id in internal_ids]
+
+    @classmethod
+    def expand_codes(cls, short_codes, dtype=None):
+        """
+        Returns the numeric IDs for multiple shortcodes
+
+        :param short_codes: list of shortcodes, or a numpy array of str/bytes
+        :param dtype: One of 'int64', 'uint64'. Return a numpy array of this dtype. Requires numpy.
+        :return: list of numeric IDs, or a numpy array if a numpy array is passed in or dtype is specified
+        """
+        if dtype or (np is not None and isinstance(short_codes, np.ndarray)):
+            if np is None:
+                raise ValueError('numpy is required for dtype')
+            return cls._decode_array(short_codes, dtype=dtype or 'int64')
+        decode = cls._decode
+        return [decode(short_code) for short_code in short_codes]
+
+    @classmethod
+    def _encode_array(cls, internal_ids):
+        """Vectorised :meth:`_encode` for a numpy array of int64/uint64"""
+        if internal_ids.dtype.kind not in 'iu':
+            raise ValueError(f'Invalid dtype: {internal_ids.dtype}')
+        if internal_ids.dtype.kind == 'i' and (internal_ids < 0).any():
+            raise ValueError('Invalid id: ids cannot be negative')
+
+        values = np.zeros((internal_ids.size, cls._B64_BYTE_LENGTH), dtype=np.uint8)
+        values[:, 1:] = internal_ids.astype('>u8').reshape(-1, 1).view(np.uint8)
+        codes = b2a_base64(values.tobytes(), newline=False).translate(cls._B64_ENCODE_TABLE)
+        codes = np.char.lstrip(np.frombuffer(codes, dtype=f'S{cls._B64_CODE_LENGTH}'), b'A')
+        codes[codes == b''] = b'A'
+        return codes.astype('U').reshape(internal_ids.shape)
+
+    @classmethod
+    def _decode_array(cls, short_codes, dtype='int64'):
+        """Vectorised :meth:`_decode` for an array of shortcodes"""
+        if dtype not in ('int64', 'uint64'):
+            raise ValueError(f'Invalid dtype: {dtype}')
+        codes = np.asarray(short_codes)
+        if codes.dtype.kind == 'U':
+            try:
+                codes = codes.astype('S')
+            except UnicodeEncodeError:
+                raise ValueError('Invalid shortcode')
+        if codes.dtype.kind != 'S':
+            raise ValueError(f'Invalid dtype: {codes.dtype}')
+        if codes.dtype.itemsize > cls._B64_CODE_LENGTH:
+            raise ValueError('Invalid shortcode: value too large')
+
+        padded = np.char.rjust(codes.ravel(), cls._B64_CODE_LENGTH, b'A').astype(f'S{cls._B64_CODE_LENGTH}')
+        try:
+            values = a2b_base64(padded.tobytes().translate(cls._B64_DECODE_TABLE))
+        except BinasciiError:
+            raise ValueError('Invalid shortcode')
+        if len(values) != padded.size * cls._B64_BYTE_LENGTH:
+            raise ValueError('Invalid shortcode')
+
+        values = np.frombuffer(values, dtype=np.uint8).reshape(-1, cls._B64_BYTE_LENGTH)
+        if values[:, 0].any() or (dtype == 'int64' and (values[:, 1] & 0x80).any()):
+            raise ValueError(f'Invalid shortcode: value too large for {dtype}')
+        return values[:, 1:].copy().view('>u8').astype(dtype).reshape(codes.shape)
@@ -0,0 +1,531 @@
+"""
+Work queues of endpoint jobs shared by crawlers on several processes or machines, with leases,
+retries and dedupe, see :class:`ClientPool` to run them.
+
+- :class:`SQLiteQueue`: a database file, for crawlers on one machine
+- :class:`RedisQueue`: a server that speaks the Redis protocol, for crawlers on many machines
+
+A job is leased by one crawler for lease_time seconds. Unless completed, failed or released
+before then, it is leased again by another crawler, so jobs are run at least once even if
+a crawler dies.
+"""
+from contextlib import contextmanager
+import hashlib
+import json
+import socket
+import sqlite3
+import threading
+import time
+
+from .registry import ENDPOINTS
+
+QUEUED = 'queued'
+LEASED = 'leased'
+DONE = 'done'
+FAILED = 'failed'
+
+
+def _dumps(obj):
+    return json.dumps(obj, sort_keys=True, separators=(',', ':'), default=str)
+
+
+class Job:
+    """A call of an endpoint method, identified by its endpoint and arguments"""
+    __slots__ = ('id', 'endpoint', 'args', 'kwargs', 'family', 'attempts', 'error', 'lease_expires')
+
+    def __init__(self, endpoint, args=(), kwargs=None, attempts=0, error=None, lease_expires=None):
+        """
+
+        :param endpoint: :class:`Client` method name, in :data:`registry.ENDPOINTS`
+        :param args: json serializable positional arguments
+        :param kwargs: json serializable keyword arguments
+        :param attempts: number of failed attempts
+        :param error: error of the last failed attempt
+        :param lease_expires: time the lease of the job expires, if leased
+        """
+        if endpoint not in ENDPOINTS:
+            raise ValueError(f'Unknown endpoint: {endpoint}')
+        self.endpoint = endpoint
+        self.args = list(args)
+        self.kwargs = kwargs or {}
+        self.family = ENDPOINTS[endpoint].family
+        self.id = hashlib.sha1(_dumps([endpoint, self.args, self.kwargs]).encode('utf-8')).hexdigest()
+        self.attempts = attempts
+        self.error = error
+        self.lease_expires = lease_expires
+
+    def to_dict(self):
+        return {
+            'endpoint': self.endpoint, 'args': self.args, 'kwargs': self.kwargs,
+            'attempts': self.attempts, 'error': self.error,
+        }
+
+    @classmethod
+    def from_dict(cls, obj, lease_expires=None):
+        return cls(obj['endpoint'], obj['args'], obj['kwargs'], obj.get('attempts', 0), obj.get('error'),
+                   lease_expires)
+
+    def __repr__(self):
+        return f'Job({self.endpoint!r}, args={self.args!r}, kwargs={self.kwargs!r}, attempts={self.attempts})'
+
+
+class WorkQueue:
+    """Base class of the work queues"""
+
+    def __init__(self, lease_time=60, max_attempts=3, retry_backoff=30):
+        """
+
+        :param lease_time: Seconds a job is leased for
+        :param max_attempts: Number of attempts before a job is marked as failed
+        :param retry_backoff: Seconds before a failed job is retried, doubled for each attempt
+        """
+        self.lease_time = lease_time
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+
+    def _retry_at(self, job, now):
+        return now + self.retry_backoff * 2 ** (job.attempts - 1)
+
+    def put(self, endpoint, *args, **kwargs):
+        """
+        Queue a call of an endpoint, unless the same call was queued before
+
+        :param endpoint: :class:`Client` method name
+        :return: True if queued, False if a duplicate
+        """
+        return self.put_many([Job(endpoint, args, kwargs)]) == 1
+
+    def put_many(self, jobs):
+        """
+        Queue jobs, skipping those queued before
+
+        :param jobs: iterable of :class:`Job`
+        :return: number of jobs queued
+        """
+        raise NotImplementedError()
+
+    def families(self):
+        """Rate limit families of the queued jobs"""
+        raise NotImplementedError()
+
+    def lease(self, count=1, families=None):
+        """
+        Lease queued jobs, and jobs whose lease expired
+
+        :param count: Maximum number of jobs
+        :param families: only lease jobs of these rate limit families
+        :return: list of :class:`Job`
+        """
+        raise NotImplementedError()
+
+    def complete(self, job, result=None):
+        """
+        Mark a leased job as done
+
+        :param job: :class:`Job`
+        :param result: json serializable result to keep, see :meth:`result`
+        :return: False if the lease had expired, the job may then also be run by another crawler
+        """
+        raise NotImplementedError()
+
+    def fail(self, job, error, retry=True):
+        """
+        Record a failed attempt of a leased job, the job is retried after a backoff
+        until max_attempts, then marked as failed
+
+        :param job: :class:`Job`
+        :param error: exception or message
+        :param retry: False to mark the job as failed without retrying it
+        :return: True if the job will be retried
+        """
+        raise NotImplementedError()
+
+    def release(self, job):
+        """
+        Return a leased job to the queue without counting an attempt, e.g. if no client has
+        the rate budget to run it
+        """
+        raise NotImplementedError()
+
+    def requeue_expired(self):
+        """
+        Requeue the jobs whose lease expired
+
+        :return: number of jobs requeued
+        """
+        raise NotImplementedError()
+
+    def result(self, job_id):
+        """Result kept by :meth:`complete`, or None"""
+        raise NotImplementedError()
+
+    def counts(self):
+        """Number of queued, leased, done and failed jobs"""
+        raise NotImplementedError()
+
+
+class SQLiteQueue(WorkQueue):
+    """
+    Work queue in a SQLite database file, that can be shared by crawlers in several processes
+    on one machine. It is safe to use from several threads.
+    """
+
+    def __init__(self, path, **kwargs):
+        """
+
+        :param path: database file path, or ``':memory:'`` for a queue local to this process
+        :param kwargs: See :class:`WorkQueue`
+        """
+        super().__init__(**kwargs)
+        self.path = path
+        self._lock = threading.RLock()
+        self._db = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        with self._lock:
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS jobs ('
+                'id TEXT PRIMARY KEY, family TEXT NOT NULL, payload TEXT NOT NULL, state TEXT NOT NULL, '
+                'available_at REAL NOT NULL, lease_expires REAL, result TEXT)')
+            self._db.execute('CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (state, family, available_at)')
+
+    def close(self):
+        self._db.close()
+
+    @contextmanager
+    def _transaction(self):
+        """Write transaction, that locks the database for other processes"""
+        self._db.execute('BEGIN IMMEDIATE')
+        try:
+            yield self._db
+        except BaseException:
+            self._db.execute('ROLLBACK')
+            raise
+        self._db.execute('COMMIT')
+
+    def put_many(self, jobs):
+        now = time.time()
+        with self._lock, self._transaction() as db:
+            return sum(
+                db.execute(
+                    'INSERT OR IGNORE INTO jobs (id, family, payload, state, available_at) VALUES (?, ?, ?, ?, ?)',
+                    (job.id, job.family, _dumps(job.to_dict()), QUEUED, now)).rowcount
+                for job in jobs)
+
+    def families(self):
+        with self._lock:
+            return [row[0] for row in self._db.execute(
+                'SELECT DISTINCT family FROM jobs WHERE state IN (?, ?)', (QUEUED, LEASED))]
+
+    def lease(self, count=1, families=None):
+        now = time.time()
+        query = (
+            'SELECT id, payload FROM jobs '
+            'WHERE ((state = ? AND available_at <= ?) OR (state = ? AND lease_expires <= ?))')
+        params = [QUEUED, now, LEASED, now]
+        if families is not None:
+            families = list(families)
+            if not families:
+                return []
+            query += f' AND family IN ({", ".join("?" * len(families))})'
+            params.extend(families)
+        query += ' ORDER BY available_at LIMIT ?'
+        params.append(count)
+        lease_expires = now + self.lease_time
+        with self._lock, self._transaction() as db:
+            rows = db.execute(query, params).fetchall()
+            db.executemany(
+                'UPDATE jobs SET state = ?, lease_expires = ? WHERE id = ?',
+                [(LEASED, lease_expires, row[0]) for row in rows])
+        return [Job.from_dict(json.loads(payload), lease_expires) for _, payload in rows]
+
+    def _held(self, db, job):
+        row = db.execute('SELECT state, lease_expires FROM jobs WHERE id = ?', (job.id, )).fetchone()
+        return row is not None and row[0] == LEASED and row[1] == job.lease_expires
+
+    def complete(self, job, result=None):
+        with self._lock, self._transaction() as db:
+            held = self._held(db, job)
+            db.execute(
+                'UPDATE jobs SET state = ?, lease_expires = NULL, result = ? WHERE id = ?',
+                (DONE, None if result is None else _dumps(result), job.id))
+        return held
+
+    def fail(self, job, error, retry=True):
+        now = time.time()
+        job.attempts += 1
+        job.error = str(error)
+        retry = retry and job.attempts < self.max_attempts
+        with self._lock, self._transaction() as db:
+            if not self._held(db, job):
+                return False
+            db.execute(
+                'UPDATE jobs SET state = ?, available_at = ?, lease_expires = NULL, payload = ? WHERE id = ?',
+                (QUEUED if retry else FAILED, self._retry_at(job, now), _dumps(job.to_dict()), job.id))
+        return retry
+
+    def release(self, job):
+        with self._lock, self._transaction() as db:
+            if self._held(db, job):
+                db.execute('UPDATE jobs SET state = ?, lease_expires = NULL WHERE id = ?', (QUEUED, job.id))
+
+    def requeue_expired(self):
+        with self._lock:
+            return self._db.execute(
+                'UPDATE jobs SET state = ?, lease_expires = NULL WHERE state = ? AND lease_expires <= ?',
+                (QUEUED, LEASED, time.time())).rowcount
+
+    def result(self, job_id):
+        with self._lock:
+            row = self._db.execute('SELECT result FROM jobs WHERE id = ?', (job_id, )).fetchone()
+        return json.loads(row[0]) if row and row[0] is not None else None
+
+    def counts(self):
+        counts = dict.fromkeys((QUEUED, LEASED, DONE, FAILED), 0)
+        with self._lock:
+            counts.update(self._db.execute('SELECT state, COUNT(*) FROM jobs GROUP BY state'))
+        return counts
+
+
+class RespError(Exception):
+    """Error reply of a Redis protocol server"""
+
+
+class RespClient:
+    """
+    Minimal thread-safe client of the Redis protocol (RESP2), with the ``execute_command`` method
+    of the redis package clients, which can be used instead.
+    """
+
+    def __init__(self, host='127.0.0.1', port=6379, db=0, password=None, timeout=10):
+        """
+
+        :param host: server host
+        :param port: server port
+        :param db: database number
+        :param password: password for AUTH
+        :param timeout: socket timeout in seconds
+        """
+        self.host = host
+        self.port = port
+        self.db = db
+        self.password = password
+        self.timeout = timeout
+        self._sock = None
+        self._file = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        self._sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self._file = self._sock.makefile('rb')
+        if self.password:
+            self._command('AUTH', self.password)
+        if self.db:
+            self._command('SELECT', self.db)
+
+    def close(self):
+        with self._lock:
+            if self._sock is not None:
+                self._file.close()
+                self._sock.close()
+                self._sock = self._file = None
+
+    @staticmethod
+    def _encode(args):
+        parts = [b'*%d\r\n' % len(args)]
+        for arg in args:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode('utf-8')
+            parts.append(b'$%d\r\n%s\r\n' % (len(arg), arg))
+        return b''.join(parts)
+
+    def _read(self):
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError('Connection closed by server')
+        kind, value = line[:1], line[1:-2]
+        if kind == b'+':
+            return value.decode('utf-8')
+        if kind == b'-':
+            return RespError(value.decode('utf-8'))
+        if kind == b':':
+            return int(value)
+        if kind == b'$':
+            if value == b'-1':
+                return None
+            data = self._file.read(int(value) + 2)
+            return data[:-2].decode('utf-8')
+        if kind == b'*':
+            if value == b'-1':
+                return None
+            return [self._read() for _ in range(int(value))]
+        raise RespError(f'Unexpected reply: {line!r}')
+
+    def _command(self, *args):
+        self._sock.sendall(self._encode(args))
+        reply = self._read()
+        if isinstance(reply, RespError):
+            raise reply
+        return reply
+
+    def execute_command(self, *args):
+        """
+        Send a command and read its reply, bulk strings are decoded to str
+
+        :param args: command name and arguments
+        """
+        with self._lock:
+            if self._sock is None:
+                self._connect()
+            try:
+                return self._command(*args)
+            except (OSError, ConnectionError):
+                # reset the connection, the reply of the command is unknown
+                self._sock.close()
+                self._sock = self._file = None
+                raise
+
+
+def _text(value):
+    return value.decode('utf-8') if isinstance(value, bytes) else value
+
+
+class RedisQueue(WorkQueue):
+    """
+    Work queue on a server that speaks the Redis protocol, that can be shared by crawlers on
+    many machines. Jobs are kept in a hash, with a list of queued job ids per rate limit family,
+    a list of leased job ids per family and sorted sets of the lease expiry and retry times.
+
+    Call :meth:`requeue_expired` regularly, as :class:`ClientPool` does, to requeue the jobs of
+    crawlers that died.
+    """
+
+    def __init__(self, client=None, prefix='igq', **kwargs):
+        """
+
+        :param client: :class:`RespClient` or redis package client. Default: RespClient on localhost
+        :param prefix: prefix of the keys, queues with different prefixes are independent
+        :param kwargs: See :class:`WorkQueue`
+        """
+        super().__init__(**kwargs)
+        self.redis = client or RespClient()
+        self.prefix = prefix
+
+    def _key(self, *parts):
+        return ':'.join((self.prefix, ) + parts)
+
+    def _call(self, *args):
+        return self.redis.execute_command(*args)
+
+    def _job(self, job_id, lease_expires=None):
+        payload = self._call('HGET', self._key('jobs'), job_id)
+        return None if payload is None else Job.from_dict(json.loads(_text(payload)), lease_expires)
+
+    def put_many(self, jobs):
+        queued = 0
+        for job in jobs:
+            if not self._call('HSETNX', self._key('jobs'), job.id, _dumps(job.to_dict())):
+                continue
+            self._call('SADD', self._key('families'), job.family)
+            self._call('LPUSH', self._key('ready', job.family), job.id)
+            queued += 1
+        return queued
+
+    def families(self):
+        return sorted(_text(f) for f in self._call('SMEMBERS', self._key('families')))
+
+    def _claim(self, key, now):
+        """Ids of a sorted set with a score up to now, removed from the set by this call"""
+        return [
+            _text(job_id) for job_id in self._call('ZRANGEBYSCORE', key, '-inf', now)
+            if self._call('ZREM', key, job_id)]
+
+    def _promote_delayed(self, now):
+        for job_id in self._claim(self._key('delayed'), now):
+            job = self._job(job_id)
+            if job is not None:
+                self._call('LPUSH', self._key('ready', job.family), job_id)
+
+    def lease(self, count=1, families=None):
+        now = time.time()
+        self._promote_delayed(now)
+        lease_expires = now + self.lease_time
+        jobs = []
+        for family in (self.families() if families is None else families):
+            while len(jobs) < count:
+                job_id = self._call('RPOPLPUSH', self._key('ready', family), self._key('leased', family))
+                if job_id is None:
+                    break
+                job_id = _text(job_id)
+                self._call('ZADD', self._key('leases'), repr(lease_expires), job_id)
+                job = self._job(job_id, lease_expires)
+                if job is not None:
+                    jobs.append(job)
+        return jobs
+
+    def _held(self, job):
+        """True if the lease of a job has not expired, the lease expiry time is the lease token"""
+        lease_expires = self._call('ZSCORE', self._key('leases'), job.id)
+        return lease_expires is not None and float(lease_expires) == job.lease_expires
+
+    def _unlease(self, job):
+        self._call('ZREM', self._key('leases'), job.id)
+        self._call('LREM', self._key('leased', job.family), 0, job.id)
+
+    def complete(self, job, result=None):
+        held = self._held(job)
+        self._unlease(job)
+        # the job may have been requeued after its lease expired
+        self._call('LREM', self._key('ready', job.family), 0, job.id)
+        self._call('ZREM', self._key('delayed'), job.id)
+        if result is not None:
+            self._call('HSET', self._key('results'), job.id, _dumps(result))
+        self._call('SADD', self._key('done'), job.id)
+        return held
+
+    def fail(self, job, error, retry=True):
+        if not self._held(job):
+            return False
+        self._unlease(job)
+        job.attempts += 1
+        job.error = str(error)
+        self._call('HSET', self._key('jobs'), job.id, _dumps(job.to_dict()))
+        if retry and job.attempts < self.max_attempts:
+            self._call('ZADD', self._key('delayed'), self._retry_at(job, time.time()), job.id)
+            return True
+        self._call('SADD', self._key('failed'), job.id)
+        return False
+
+    def release(self, job):
+        if self._held(job):
+            self._unlease(job)
+            # at the front of the queue
+            self._call('RPUSH', self._key('ready', job.family), job.id)
+
+    def requeue_expired(self):
+        now = time.time()
+        requeued = 0
+        for job_id in self._claim(self._key('leases'), now):
+            job = self._job(job_id)
+            if job is not None:
+                self._call('LREM', self._key('leased', job.family), 0, job_id)
+                self._call('LPUSH', self._key('ready', job.family), job_id)
+                requeued += 1
+        # jobs of a crawler that died between leasing a job and recording its lease expiry
+        # get a lease now, and are requeued if it expires
+        for family in self.families():
+            for job_id in self._call('LRANGE', self._key('leased', family), 0, -1):
+                self._call('ZADD', self._key('leases'), 'NX', now + self.lease_time, job_id)
+        return requeued
+
+    def result(self, job_id):
+        result = self._call('HGET', self._key('results'), job_id)
+        return None if result is None else json.loads(_text(result))
+
+    def counts(self):
+        families = self.families()
+        return {
+            QUEUED: sum(self._call('LLEN', self._key('ready', f)) for f in families) + self._call(
+                'ZCARD', self._key('delayed')),
+            LEASED: self._call('ZCARD', self._key('leases')),
+            DONE: self._call('SCARD', self._key('done')),
+            FAILED: self._call('SCARD', self._key('failed')),
+        }
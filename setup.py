@@ -30,7 +30,7 @@ setup(
     license='MIT',
     url='https://github.com/ping/instagram_private_api/tree/master',
     install_requires=[],
-    extra_requires={'fast_json': ['orjson']},
+    extras_require={'fast_json': ['orjson'], 'typed_responses': ['msgspec']},
     test_requires=test_reqs,
     keywords='instagram private api',
     description='A client interface for the private Instagram API.',
@@ -11,24 +11,28 @@ import os
 try:
     from instagram_private_api import (
         __version__, Client, ClientError, ClientLoginError,
-        ClientCookieExpiredError, ClientThrottledError, ClientCompatPatch,
+        ClientCookieExpiredError, ClientThrottledError, ClientCompatPatch, CompatPatchView, LazyDocument,
         ClientLoginRequiredError, MediaTypes,
         ClientSentryBlockError, ClientCheckpointRequiredError,
         ClientChallengeRequiredError)
     from instagram_private_api.utils import InstagramID, gen_user_breadcrumb  # noqa
+    from instagram_private_api import models, schemas, json_codecs, interning, bulk, planner, registry, runtime, workqueue, clientpool
+    from instagram_private_api.projection import Projection
     from instagram_private_api.constants import Constants
-    from instagram_private_api.compat import compat_urllib_parse
+    from instagram_private_api.compat import compat_urllib_parse, jdump, jload
 except ImportError:
     sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
     from instagram_private_api import (
         __version__, Client, ClientError, ClientLoginError,
-        ClientCookieExpiredError, ClientThrottledError, ClientCompatPatch,
+        ClientCookieExpiredError, ClientThrottledError, ClientCompatPatch, CompatPatchView, LazyDocument,
         ClientLoginRequiredError, MediaTypes,
         ClientSentryBlockError, ClientCheckpointRequiredError,
         ClientChallengeRequiredError)
     from instagram_private_api.utils import InstagramID, gen_user_breadcrumb  #noqa
+    from instagram_private_api import models, schemas, json_codecs, interning, bulk, planner, registry, runtime, workqueue, clientpool
+    from instagram_private_api.projection import Projection
     from instagram_private_api.constants import Constants
-    from instagram_private_api.compat import compat_urllib_parse
+    from instagram_private_api.compat import compat_urllib_parse, jdump, jload
 
 
 def to_json(python_object):
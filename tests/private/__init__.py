@@ -17,3 +17,17 @@ from .igtv import IGTVTests
 from .apiutils import ApiUtilsTests
 from .client import ClientTests
 from .compatpatch import CompatPatchTests
+from .models import ModelsTests
+from .projection import ProjectionTests
+from .schemas import SchemasTests
+from .lazy import LazyDocumentTests
+from .json_codecs import JsonCodecsTests
+from .interning import InterningTests
+from .loaders import LoadersTests
+from .bulk import BulkTests
+from .stories import StoriesTests
+from .reporters import ReportersTests
+from .planner import PlannerTests
+from .registry import RegistryTests
+from .runtime import RuntimeTests
+from .workqueue import WorkQueueTests
@@ -2,6 +2,11 @@ import unittest
 
 from ..common import InstagramID, MediaTypes
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 
 class ApiUtilsTests(unittest.TestCase):
     """Tests for the utility functions."""
@@ -25,6 +30,22 @@ class ApiUtilsTests(unittest.TestCase):
                 'name': 'test_weblink_from_media_id',
                 'test': ApiUtilsTests('test_weblink_from_media_id')
             },
+            {
+                'name': 'test_shorten_ids',
+                'test': ApiUtilsTests('test_shorten_ids')
+            },
+            {
+                'name': 'test_expand_codes',
+                'test': ApiUtilsTests('test_expand_codes')
+            },
+            {
+                'name': 'test_invalid_codes',
+                'test': ApiUtilsTests('test_invalid_codes')
+            },
+            {
+                'name': 'test_instagramid_numpy',
+                'test': ApiUtilsTests('test_instagramid_numpy')
+            },
             {
                 'name': 'test_mediatypes',
                 'test': ApiUtilsTests('test_mediatypes')
@@ -41,6 +62,8 @@ class ApiUtilsTests(unittest.TestCase):
     def test_shorten_id(self):
         shortcode = InstagramID.shorten_id(1470687481426853460)
         self.assertEqual(shortcode, 'BRo7njqD75U')
+        with self.assertRaises(TypeError):
+            InstagramID.shorten_id(1.5)
 
     def test_shorten_media_id(self):
         shortcode = InstagramID.shorten_media_id('1470654893538426156_25025320')
@@ -50,6 +73,40 @@ class ApiUtilsTests(unittest.TestCase):
         weblink = InstagramID.weblink_from_media_id('1470517649007430315_25025320')
         self.assertEqual(weblink, 'https://www.instagram.com/p/BRoVAK5B8qr/')
 
+    def test_shorten_ids(self):
+        shortcodes = InstagramID.shorten_ids([1470687481426853460, 1470654893538426156, 0, 64])
+        self.assertEqual(shortcodes, ['BRo7njqD75U', 'BRo0NV0jD0s', 'A', 'BA'])
+
+    def test_expand_codes(self):
+        ids = InstagramID.expand_codes(['BRo7njqD75U', 'BRo0NV0jD0s', 'A', 'BA'])
+        self.assertEqual(ids, [1470687481426853460, 1470654893538426156, 0, 64])
+        # values beyond 64 bits
+        self.assertEqual(InstagramID.expand_code(InstagramID.shorten_id(2 ** 80)), 2 ** 80)
+
+    def test_invalid_codes(self):
+        for shortcode in ('BRo7!jqD75U', 'BRo7+jqD75U', 'BRo7/jqD75U'):
+            with self.assertRaises(ValueError):
+                InstagramID.expand_code(shortcode)
+
+    @unittest.skipIf(numpy is None, 'numpy is not installed')
+    def test_instagramid_numpy(self):
+        ids = numpy.array([1470687481426853460, 1470654893538426156, 0, 64], dtype=numpy.int64)
+        shortcodes = InstagramID.shorten_ids(ids)
+        self.assertEqual(shortcodes.tolist(), ['BRo7njqD75U', 'BRo0NV0jD0s', 'A', 'BA'])
+        self.assertEqual(InstagramID.expand_codes(shortcodes).tolist(), ids.tolist())
+        self.assertEqual(InstagramID.expand_codes(shortcodes).dtype, numpy.int64)
+        # numpy scalars
+        self.assertEqual(InstagramID.shorten_id(ids[0]), 'BRo7njqD75U')
+        self.assertEqual(InstagramID.shorten_id(numpy.uint64(64)), 'BA')
+
+        max_id = numpy.array([2 ** 64 - 1], dtype=numpy.uint64)
+        shortcodes = InstagramID.shorten_ids(max_id)
+        self.assertEqual(InstagramID.expand_codes(shortcodes, dtype='uint64').tolist(), max_id.tolist())
+        with self.assertRaises(ValueError):
+            InstagramID.expand_codes(shortcodes, dtype='int64')
+        with self.assertRaises(ValueError):
+            InstagramID.expand_codes(numpy.array(['BRo7!jqD75U']))
+
     def test_mediatypes(self):
         self.assertEqual(MediaTypes.id_to_name(MediaTypes.PHOTO), 'image')
         self.assertEqual(MediaTypes.name_to_id('image'), MediaTypes.PHOTO)
@@ -0,0 +1,60 @@
+import threading
+import time
+
+from ..common import ApiTestBase, bulk
+
+
+class BulkTests(ApiTestBase):
+    """Tests for the bulk helpers."""
+
+    @staticmethod
+    def init_all(api):
+        return [
+            {
+                'name': 'test_chunked_mock',
+                'test': BulkTests('test_chunked_mock', api)
+            },
+            {
+                'name': 'test_map_chunks_mock',
+                'test': BulkTests('test_map_chunks_mock', api)
+            },
+        ]
+
+    def test_chunked_mock(self):
+        self.assertEqual([len(c) for c in bulk.chunked(range(250), 100)], [84, 83, 83])
+        self.assertEqual([len(c) for c in bulk.chunked(range(200), 100)], [100, 100])
+        self.assertEqual(bulk.chunked(range(3), 100), [[0, 1, 2]])
+        self.assertEqual(bulk.chunked([], 100), [])
+        self.assertEqual([i for c in bulk.chunked(range(1001), 7) for i in c], list(range(1001)))
+
+    def test_map_chunks_mock(self):
+        lock = threading.Lock()
+        running = [0, 0]
+
+        def func(items):
+            with lock:
+                running[0] += 1
+                running[1] = max(running)
+            time.sleep(0.01)
+            with lock:
+                running[0] -= 1
+            if 5 in items:
+                raise ValueError(items)
+            return sum(items)
+
+        results = list(bulk.map_chunks(func, range(20), 3, max_workers=2))
+        self.assertEqual(len(results), 7)
+        self.assertLessEqual(running[1], 2)
+        failed = [r for r in results if not r.ok]
+        self.assertEqual(len(failed), 1)
+        self.assertIsInstance(failed[0].error, ValueError)
+        self.assertIn(5, failed[0].items)
+        self.assertEqual(sum(r.result for r in results if r.ok), sum(range(20)) - sum(failed[0].items))
+        self.assertEqual(sorted(r.index for r in results), list(range(7)))
+
+        # closing the generator early does not run the remaining chunks
+        calls = []
+        results = bulk.map_chunks(lambda items: calls.append(items), range(100), 1, max_workers=2)
+        next(results)
+        results.close()
+        self.assertLessEqual(len(calls), 3)
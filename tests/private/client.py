@@ -1,5 +1,9 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from io import BytesIO
 import json
+import re
+import threading
+import time
 
 from ..common import (
     ApiTestBase, Client, ClientThrottledError,
@@ -9,6 +13,8 @@ from ..common import (
     gen_user_breadcrumb, compat_mock, compat_urllib_error,
     MockResponse
 )
+from instagram_private_api.compat import compat_urllib_request
+from instagram_private_api.http import PooledHTTPHandler
 
 
 class ClientTests(ApiTestBase):
@@ -57,6 +63,18 @@ class ClientTests(ApiTestBase):
                 'name': 'test_client_requests',
                 'test': ClientTests('test_client_requests', api)
             },
+            {
+                'name': 'test_client_map_mock',
+                'test': ClientTests('test_client_map_mock', api)
+            },
+            {
+                'name': 'test_pooled_connections_mock',
+                'test': ClientTests('test_pooled_connections_mock', api)
+            },
+            {
+                'name': 'test_pooled_connections_closed_mock',
+                'test': ClientTests('test_pooled_connections_closed_mock', api)
+            },
         ]
 
     def test_validate_useragent(self):
@@ -258,3 +276,123 @@ class ClientTests(ApiTestBase):
         with self.assertRaises(ClientError) as ce:
             self.api.feed_timeline()
         self.assertEqual(ce.exception.msg, 'Unknown error')
+
+    @compat_mock.patch('instagram_private_api.Client._call_api')
+    def test_client_map_mock(self, call_api):
+        auto_patch = self.api.auto_patch
+        self.api.auto_patch = False
+        try:
+            def api_call(endpoint, **kwargs):
+                user_id = int(re.search(r'\d+', endpoint).group())
+                time.sleep(0.001 * (10 - user_id % 10))
+                if user_id == 13:
+                    raise ClientError('Not Found', 404)
+                return {'user': {'pk': user_id}, 'items': [{'pk': user_id}], 'status': 'ok'}
+
+            call_api.side_effect = api_call
+            results = list(self.api.map('user_info', range(10), concurrency=4))
+            self.assertEqual([r['user']['pk'] for r in results], list(range(10)))
+
+            results = dict(self.api.map(self.api.user_info, [(i, ) for i in range(10, 20)], ordered=False,
+                                        return_exceptions=True))
+            self.assertEqual(sorted(results), list(range(10)))
+            self.assertIsInstance(results[3], ClientError)
+            self.assertEqual(results[4]['user']['pk'], 14)
+
+            with self.assertRaises(ClientError):
+                list(self.api.map('user_info', [{'user_id': i} for i in range(10, 20)]))
+
+            user, feed, other = self.api.gather([
+                ('user_info', (1, )),
+                (self.api.user_feed, (2, ), {'max_id': 'x'}),
+                lambda: self.api.user_info(3),
+            ])
+            self.assertEqual((user['user']['pk'], feed['items'][0]['pk'], other['user']['pk']), (1, 2, 3))
+            self.assertEqual(call_api.call_args_list[-2][1]['query'], {'max_id': 'x'})
+        finally:
+            self.api.auto_patch = auto_patch
+
+    def test_pooled_connections_mock(self):
+        connections = set()
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                connections.add(self.client_address)
+                user_id = int(self.path.split('/')[4])
+                body = json.dumps({'user': {'pk': user_id}, 'status': 'ok'}).encode('ascii')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            api = Client(
+                None, None, settings=self.api.settings, pool_connections=2,
+                api_url=f'http://127.0.0.1:{server.server_address[1]}/api/{{version}}/')
+            results = list(api.map('user_info', range(40), concurrency=2))
+            self.assertEqual([r['user']['pk'] for r in results], list(range(40)))
+            self.assertLessEqual(len(connections), 4)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_pooled_connections_closed_mock(self):
+        received = []
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # close each connection, without a response, on its second request
+            requests = 0
+
+            def respond(self):
+                received.append(self.command)
+                if self.headers.get('Content-Length'):
+                    self.rfile.read(int(self.headers['Content-Length']))
+                self.requests += 1
+                if self.requests == 2 or self.path == '/drop':
+                    self.close_connection = True
+                    return
+                self.send_response(200)
+                self.send_header('Content-Length', '2')
+                self.end_headers()
+                self.wfile.write(b'ok')
+
+            do_GET = do_POST = respond
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        handler = PooledHTTPHandler()
+        opener = compat_urllib_request.build_opener(handler)
+        url = f'http://127.0.0.1:{server.server_address[1]}/'
+        try:
+            # a GET is sent again on a new connection
+            self.assertEqual(opener.open(url).read(), b'ok')
+            self.assertEqual(opener.open(url).read(), b'ok')
+            self.assertEqual(received, ['GET', 'GET', 'GET'])
+
+            # a POST is not, the server may have processed it
+            del received[:]
+            with self.assertRaises(compat_urllib_error.URLError):
+                opener.open(url, data=b'x=1')
+            self.assertEqual(received, ['POST'])
+
+            # errors on a new connection are raised as URLError
+            with self.assertRaises(compat_urllib_error.URLError):
+                opener.open(url + 'drop')
+        finally:
+            handler.close()
+            server.shutdown()
+            server.server_close()
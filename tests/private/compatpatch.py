@@ -1,6 +1,7 @@
 import copy
+import json
 
-from ..common import ApiTestBase, ClientCompatPatch
+from ..common import ApiTestBase, ClientCompatPatch, CompatPatchView, compat_mock
 
 
 class CompatPatchTests(ApiTestBase):
@@ -26,8 +27,55 @@ class CompatPatchTests(ApiTestBase):
                 'name': 'test_compat_user_list',
                 'test': CompatPatchTests('test_compat_user_list', api, user_id='124317')
             },
+            {
+                'name': 'test_compat_media_view_mock',
+                'test': CompatPatchTests('test_compat_media_view_mock', api)
+            },
+            {
+                'name': 'test_closest_sizes_mock',
+                'test': CompatPatchTests('test_closest_sizes_mock', api)
+            },
+            {
+                'name': 'test_patch_batch_mock',
+                'test': CompatPatchTests('test_patch_batch_mock', api)
+            },
+            {
+                'name': 'test_lazy_patch_mock',
+                'test': CompatPatchTests('test_lazy_patch_mock', api)
+            },
         ]
 
+    @staticmethod
+    def _media():
+        def user(pk):
+            return {'pk': pk, 'username': f'user{pk}', 'full_name': 'User', 'profile_pic_url': 'pic.jpg',
+                    'is_private': False}
+
+        def comment(pk):
+            return {'pk': pk, 'created_at': pk, 'created_at_utc': pk, 'text': 'x', 'user': user(pk)}
+
+        return {
+            'pk': 1, 'id': '1_2', 'code': 'abc', 'taken_at': 1500000000, 'media_type': 8,
+            'caption': comment(10), 'user': user(2), 'like_count': 3, 'comment_count': 1,
+            'preview_comments': [comment(11)], 'filter_type': 112,
+            'location': {'pk': 7, 'lat': 1.0, 'lng': 2.0, 'name': 'Place', 'city': 'City'},
+            'usertags': {'in': [{'position': [0.1, 0.2], 'user': user(3)}]},
+            'carousel_media': [
+                {
+                    'media_type': 2, 'original_width': 640,
+                    'image_versions2': {'candidates': [{'width': 640, 'height': 640, 'url': '640.jpg'}]},
+                    'video_versions': [
+                        {'width': 480, 'height': 480, 'url': '480.mp4', 'type': 101},
+                        {'width': 640, 'height': 640, 'url': '640.mp4', 'type': 101},
+                    ],
+                },
+                {
+                    'media_type': 1,
+                    'image_versions2': {'candidates': [{'width': 1080, 'height': 1080, 'url': '1080.jpg'}]},
+                },
+            ],
+        }
+
     def test_compat_media(self):
         self.api.auto_patch = False
         results = self.api.media_info(self.test_media_id)
@@ -114,3 +162,98 @@ class CompatPatchTests(ApiTestBase):
         user_dropped = copy.deepcopy(user)
         ClientCompatPatch.list_user(user_dropped, drop_incompat_keys=True)
         self.assertIsNone(user_dropped.get('pk'))
+
+    def test_compat_media_view_mock(self):
+        for drop_incompat_keys in (False, True):
+            media = self._media()
+            view = ClientCompatPatch.media_view(media, drop_incompat_keys=drop_incompat_keys)
+            # fields are only computed on access
+            self.assertNotIn('link', list(view.keys()))
+            self.assertEqual(view['link'], 'https://www.instagram.com/p/abc/')
+            self.assertIn('link', list(view.keys()))
+            self.assertEqual(view['type'], 'video')
+            self.assertEqual(view['videos']['low_bandwidth']['url'], '480.mp4')
+            self.assertEqual(view['user']['id'], '2')
+            self.assertEqual(view['caption']['from']['id'], '10')
+            self.assertIn('users_in_photo', view)
+            self.assertNotIn('not_a_field', view)
+            self.assertIsNone(view.get('not_a_field'))
+            if drop_incompat_keys:
+                self.assertIsNone(view.get('pk'))
+                self.assertNotIn('preview_comments', view)
+                self.assertNotIn('type', view['videos']['low_bandwidth'])
+            else:
+                self.assertEqual(view.get('pk'), 1)
+                self.assertEqual(view['preview_comments'][0]['id'], '11')
+            # the raw object is not modified
+            self.assertEqual(media, self._media())
+            self.assertIs(view.raw, media)
+
+            # same result as ClientCompatPatch.media() once materialized
+            patched = ClientCompatPatch.media(self._media(), drop_incompat_keys=drop_incompat_keys)
+            materialized = json.loads(json.dumps(view.materialize()))
+            for k in ('usertags', 'carousel_media'):
+                # nested raw objects are patched in place by media()
+                patched.pop(k)
+                materialized.pop(k)
+            self.assertEqual(json.loads(json.dumps(patched)), materialized)
+
+    def test_closest_sizes_mock(self):
+        candidates = [
+            {'width': 1080, 'height': 1350, 'url': '1080.jpg'},
+            {'width': 640, 'height': 800, 'url': '640.jpg'},
+            {'width': 320, 'height': 400, 'url': '320.jpg'},
+            {'width': 150, 'height': 150, 'url': '150-square.jpg'},
+            {'width': 150, 'height': 188, 'url': '150.jpg'},
+        ]
+        targets = {'thumbnail': (150, 150), 'small': 300, 'large': 1000}
+        for _ in range(2):
+            # second time round uses the cached selection
+            sizes = ClientCompatPatch.closest_sizes(candidates, targets)
+            self.assertEqual(list(sizes.keys()), ['thumbnail', 'small', 'large'])
+            self.assertEqual(
+                [sizes[k]['url'] for k in targets], ['150-square.jpg', '320.jpg', '1080.jpg'])
+            for name, size in targets.items():
+                width, height = size if isinstance(size, tuple) else (size, 0)
+                self.assertIs(sizes[name], ClientCompatPatch._get_closest_size(candidates, width, height))
+        self.assertEqual(ClientCompatPatch.closest_sizes([], targets), {k: None for k in targets})
+
+    def test_patch_batch_mock(self):
+        for drop_incompat_keys in (False, True):
+            medias = [self._media(), self._media()]
+            medias[1]['media_type'] = 1
+            medias[1].pop('carousel_media')
+            expected = [ClientCompatPatch.media(m, drop_incompat_keys=drop_incompat_keys)
+                        for m in copy.deepcopy(medias)]
+            patched = ClientCompatPatch.patch_medias(medias, drop_incompat_keys=drop_incompat_keys)
+            self.assertIs(patched, medias)
+            self.assertEqual(json.dumps(patched), json.dumps(expected))
+            self.assertEqual(patched[0]['caption']['from']['id'], '10')
+            self.assertEqual(patched[1]['type'], 'image')
+
+            users = [m['user'] for m in self._media()['usertags']['in']] + [self._media()['user']]
+            expected = [ClientCompatPatch.list_user(u, drop_incompat_keys=drop_incompat_keys)
+                        for u in copy.deepcopy(users)]
+            self.assertEqual(ClientCompatPatch.patch_users(users, drop_incompat_keys=drop_incompat_keys), expected)
+
+            comments = self._media()['preview_comments'] + [self._media()['caption']]
+            expected = [ClientCompatPatch.comment(c, drop_incompat_keys=drop_incompat_keys)
+                        for c in copy.deepcopy(comments)]
+            self.assertEqual(
+                ClientCompatPatch.patch_comments(comments, drop_incompat_keys=drop_incompat_keys), expected)
+            self.assertEqual(comments[0]['from']['id'], '11')
+
+    @compat_mock.patch('instagram_private_api.Client._call_api')
+    def test_lazy_patch_mock(self, call_api):
+        call_api.return_value = {'status': 'ok', 'items': [self._media()]}
+        auto_patch, lazy_patch = self.api.auto_patch, self.api.lazy_patch
+        self.api.auto_patch, self.api.lazy_patch = True, True
+        try:
+            results = self.api.user_feed('2')
+        finally:
+            self.api.auto_patch, self.api.lazy_patch = auto_patch, lazy_patch
+        media = results['items'][0]
+        self.assertIsInstance(media, CompatPatchView)
+        self.assertNotIn('images', list(media.keys()))
+        self.assertEqual(media['images']['standard_resolution']['url'], '640.jpg')
+        self.assertNotIn('images', media.raw)
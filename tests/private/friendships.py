@@ -1,7 +1,7 @@
 import unittest
 
 from ..common import (
-    ApiTestBase, compat_mock
+    ApiTestBase, ClientThrottledError, compat_mock
 )
 
 
@@ -39,6 +39,10 @@ class FriendshipTests(ApiTestBase):
                 'name': 'test_friendships_show_many2',
                 'test': FriendshipTests('test_friendships_show_many', api, user_id=['329452045', '124317'])
             },
+            {
+                'name': 'test_friendships_show_many_bulk_mock',
+                'test': FriendshipTests('test_friendships_show_many_bulk_mock', api)
+            },
             {
                 'name': 'test_friendships_pending',
                 'test': FriendshipTests('test_friendships_pending', api)
@@ -149,6 +153,30 @@ class FriendshipTests(ApiTestBase):
         self.assertEqual(results.get('status'), 'ok')
         self.assertGreater(len(results.get('friendship_statuses', [])), 0, 'No statuses returned.')
 
+    @compat_mock.patch('instagram_private_api.Client._call_api')
+    def test_friendships_show_many_bulk_mock(self, call_api):
+        def show_many(endpoint, params, unsigned):
+            user_ids = params['user_ids'].split(',')
+            if '13' in user_ids:
+                raise ClientThrottledError('Too Many Requests', 429)
+            return {'status': 'ok', 'friendship_statuses': {i: {'following': int(i) % 2 == 0} for i in user_ids}}
+
+        call_api.side_effect = show_many
+        user_ids = list(range(25))
+        res = self.api.friendships_show_many_bulk(user_ids, chunk_size=10, max_workers=2)
+        self.assertEqual(call_api.call_count, 3)
+        # chunks of 9, 8 and 8 ids, the second one failed
+        self.assertEqual(res['failed_user_ids'], list(range(9, 17)))
+        self.assertIsInstance(res['errors'][0], ClientThrottledError)
+        self.assertEqual(sorted(res['friendship_statuses'], key=int), [str(i) for i in user_ids[:9] + user_ids[17:]])
+        self.assertTrue(res['friendship_statuses']['2']['following'])
+        self.assertEqual((res['stats'].chunks, res['stats'].failed_items), (3, 8))
+
+        call_api.reset_mock()
+        chunks = list(self.api.friendships_show_many_iter(['1', '2', '3'], chunk_size=2))
+        self.assertEqual(sorted(c.index for c in chunks), [0, 1])
+        self.assertTrue(all(c.ok for c in chunks))
+
     @unittest.skip('Modifies data.')
     def test_friendships_create(self):
         results = self.api.friendships_create('2958144170')
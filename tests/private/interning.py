@@ -0,0 +1,125 @@
+from concurrent.futures import ThreadPoolExecutor
+import json
+import pickle
+
+from ..common import ApiTestBase, compat_mock, models, interning
+from .compatpatch import CompatPatchTests
+
+
+class InterningTests(ApiTestBase):
+    """Tests for string interning."""
+
+    @staticmethod
+    def init_all(api):
+        return [
+            {
+                'name': 'test_compact_url_mock',
+                'test': InterningTests('test_compact_url_mock', api)
+            },
+            {
+                'name': 'test_string_pool_mock',
+                'test': InterningTests('test_string_pool_mock', api)
+            },
+            {
+                'name': 'test_client_intern_strings_mock',
+                'test': InterningTests('test_client_intern_strings_mock', api)
+            },
+        ]
+
+    @staticmethod
+    def users(count=3):
+        # decoded from json so that equal strings are distinct objects
+        return json.loads(json.dumps([
+            {'pk': 1, 'username': 'user1', 'full_name': 'User',
+             'profile_pic_url': 'https://scontent.cdninstagram.com/v/t51.2885-19/1_n.jpg?oh=1&_nc_ht=a/b'}
+            for _ in range(count)
+        ]))
+
+    def test_compact_url_mock(self):
+        url = 'https://scontent.cdninstagram.com/v/t51.2885-19/s150x150/1_n.jpg?_nc_ht=scontent.cdninstagram.com/x'
+        compact = interning.compact_url(url)
+        self.assertIsInstance(compact, interning.CompactUrl)
+        self.assertEqual(str(compact), url)
+        self.assertEqual(compact.url, url)
+        self.assertEqual(compact, url)
+        self.assertNotEqual(compact, url + '1')
+        self.assertEqual(hash(compact), hash(url))
+        self.assertEqual({url: 1}[compact], 1)
+        self.assertEqual(pickle.loads(pickle.dumps(compact)), url)
+        self.assertLess(len(compact), len(url))
+        # urls sharing the prefix share its id
+        other = interning.compact_url(url.replace('1_n', '2_n'))
+        self.assertEqual(compact[:2], other[:2])
+        for url in ('no_slash', 'https://x/é.jpg'):
+            self.assertIs(interning.compact_url(url), url)
+
+        # new prefixes added from many threads each get their own id
+        urls = [f'https://cdn{i}.example.com/p/{i}.jpg' for i in range(200)]
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            compacts = list(executor.map(interning.compact_url, urls))
+        self.assertEqual([str(c) for c in compacts], urls)
+
+    def test_string_pool_mock(self):
+        users = self.users()
+        self.assertIsNot(users[0]['username'], users[1]['username'])
+        pool = interning.StringPool()
+        self.assertIs(pool.intern_all(users), users)
+        self.assertEqual(users, self.users())
+        self.assertIs(users[0]['username'], users[2]['username'])
+        self.assertIs(users[0]['profile_pic_url'], users[1]['profile_pic_url'])
+        self.assertEqual(len(pool), 3)
+        self.assertIs(pool.intern('user1'), users[0]['username'])
+        self.assertEqual(pool.intern(1), 1)
+        self.assertIsNone(pool.intern(None))
+
+        pool = interning.StringPool(max_length=4)
+        pool.intern_all(users)
+        self.assertIs(pool.intern('User'), users[1]['full_name'])
+        self.assertNotIn('user1', pool.strings)
+
+        # models
+        pool = interning.StringPool(compact_urls=True)
+        user_models = [models.User.from_dict(u, pool) for u in self.users()]
+        self.assertIs(user_models[0].username, user_models[1].username)
+        self.assertIsInstance(user_models[0].profile_pic_url, interning.CompactUrl)
+        self.assertIs(user_models[0].profile_pic_url, user_models[2].profile_pic_url)
+        self.assertEqual(user_models[0], models.User.from_dict(self.users()[0]))
+        self.assertEqual(user_models[0].to_dict(), models.User.from_dict(self.users()[0]).to_dict())
+        self.assertIs(type(user_models[0].to_dict()['profile_pic_url']), str)
+
+        media = models.Media.from_dict(CompatPatchTests._media(), pool)
+        self.assertEqual(media.to_dict(), models.Media.from_dict(CompatPatchTests._media()).to_dict())
+        self.assertIs(media.user.username, pool.intern('user2'))
+
+        # a url pooled for a *_url field is a str in other fields
+        url = self.users()[0]['profile_pic_url']
+        self.assertIsInstance(pool.intern(url, 'profile_pic_url'), interning.CompactUrl)
+        for name in ('biography', None):
+            value = pool.intern(url, name)
+            self.assertIs(type(value), str)
+            self.assertTrue(value.startswith('https'))
+        self.assertIs(pool.intern(url, 'external_url'), pool.intern(url, 'profile_pic_url'))
+        self.assertIs(pool.intern_all([url])[0], pool.intern(url))
+
+    @compat_mock.patch('instagram_private_api.Client._call_api')
+    def test_client_intern_strings_mock(self, call_api):
+        settings = self.api.auto_patch, self.api.as_models, self.api.string_pool
+        self.api.auto_patch = True
+        self.api.string_pool = interning.StringPool()
+        try:
+            call_api.return_value = {'status': 'ok', 'users': self.users()}
+            users = self.api.user_followers('2', self.api.generate_uuid())['users']
+            self.assertIs(users[0]['username'], users[1]['username'])
+            self.assertIn('profile_picture', users[0])
+
+            call_api.return_value = {'status': 'ok', 'users': self.users()}
+            other_users = self.api.user_following('2', self.api.generate_uuid())['users']
+            self.assertIs(other_users[0]['username'], users[0]['username'])
+
+            self.api.as_models = True
+            call_api.return_value = {'status': 'ok', 'users': self.users()}
+            user_models = self.api.user_followers('2', self.api.generate_uuid())['users']
+            self.assertIsInstance(user_models[0], models.User)
+            self.assertIs(user_models[0].username, users[0]['username'])
+        finally:
+            self.api.auto_patch, self.api.as_models, self.api.string_pool = settings
@@ -0,0 +1,80 @@
+import io
+import json
+
+from ..common import ApiTestBase, compat_mock, MockResponse, json_codecs, jdump, jload
+
+
+class JsonCodecsTests(ApiTestBase):
+    """Tests for the json codecs registry."""
+
+    @staticmethod
+    def init_all(api):
+        return [
+            {
+                'name': 'test_codecs_consistent_mock',
+                'test': JsonCodecsTests('test_codecs_consistent_mock', api)
+            },
+            {
+                'name': 'test_get_codec_mock',
+                'test': JsonCodecsTests('test_get_codec_mock', api)
+            },
+            {
+                'name': 'test_client_codecs_mock',
+                'test': JsonCodecsTests('test_client_codecs_mock', api)
+            },
+        ]
+
+    def test_codecs_consistent_mock(self):
+        obj = {'b': [1, 2.5, None, True], 'a': 'é ❤ \U0001f600 "x" https://x/y', 1: {'c': ''}}
+        expected = json.dumps(obj, separators=(',', ':'))
+        self.assertIn('json', json_codecs.CODECS)
+        for codec in json_codecs.CODECS.values():
+            self.assertEqual(codec.dumps(obj), expected, codec.name)
+            self.assertEqual(codec.loads(expected), json.loads(expected), codec.name)
+            self.assertEqual(codec.loads(expected.encode('utf8')), json.loads(expected), codec.name)
+
+        fp = io.StringIO()
+        if json_codecs.default_codec().name != 'json':
+            jdump(obj, fp)
+            self.assertEqual(fp.getvalue(), expected)
+        else:
+            fp.write(expected)
+        fp.seek(0)
+        self.assertEqual(jload(fp), json.loads(expected))
+
+        obj = {'b': [1, None], 'a': 'é'}
+        with compat_mock.patch.dict(json_codecs.CODECS, {'json': json_codecs.CODECS['json']}, clear=True):
+            fp = io.StringIO()
+            jdump(obj, fp)
+        self.assertEqual(fp.getvalue(), json.dumps(obj, indent=4, sort_keys=True, ensure_ascii=False))
+
+    def test_get_codec_mock(self):
+        self.assertIs(json_codecs.get_codec('json'), json_codecs.CODECS['json'])
+        self.assertIs(json_codecs.get_codec(None), json_codecs.default_codec())
+        self.assertIn(json_codecs.get_codec('auto'), json_codecs.CODECS.values())
+        self.assertIs(json_codecs.fastest_codec(), json_codecs.fastest_codec())
+        for direction in ('dumps', 'loads', None):
+            self.assertIn(json_codecs.get_codec('auto', direction), json_codecs.CODECS.values())
+            self.assertIn(
+                json_codecs.fastest_codec(direction, sample={'a': 1}, number=1), json_codecs.CODECS.values())
+        codec = json_codecs.JsonCodec('custom', json.dumps, json.loads)
+        self.assertIs(json_codecs.get_codec(codec), codec)
+        with self.assertRaises(ValueError):
+            json_codecs.get_codec('simplejson')
+
+    @compat_mock.patch('instagram_private_api.client.compat_urllib_request.OpenerDirector.open')
+    def test_client_codecs_mock(self, open_mock):
+        open_mock.side_effect = [MockResponse(body=json.dumps({'status': 'ok', 'a': 1}))]
+        codec = json_codecs.CODECS['json']
+        request_codec = json_codecs.JsonCodec('request', compat_mock.Mock(wraps=codec.dumps), codec.loads)
+        response_codec = json_codecs.JsonCodec('response', codec.dumps, compat_mock.Mock(wraps=codec.loads))
+        codecs = self.api.request_json_codec, self.api.response_json_codec
+        self.api.request_json_codec, self.api.response_json_codec = request_codec, response_codec
+        try:
+            res = self.api._call_api('x/', params={'a': 'é'})
+        finally:
+            self.api.request_json_codec, self.api.response_json_codec = codecs
+        self.assertEqual(res, {'status': 'ok', 'a': 1})
+        request_codec.dumps.assert_called_once_with({'a': 'é'})
+        self.assertIn('%5Cu00e9', open_mock.call_args[0][0].data.decode('ascii'))
+        response_codec.loads.assert_called_once()
@@ -0,0 +1,83 @@
+import json
+
+from ..common import ApiTestBase, ClientError, LazyDocument, compat_mock, MockResponse
+
+
+class LazyDocumentTests(ApiTestBase):
+    """Tests for lazy documents."""
+
+    @staticmethod
+    def init_all(api):
+        return [
+            {
+                'name': 'test_lazy_document_mock',
+                'test': LazyDocumentTests('test_lazy_document_mock', api)
+            },
+            {
+                'name': 'test_lazy_document_fallback_mock',
+                'test': LazyDocumentTests('test_lazy_document_fallback_mock', api)
+            },
+            {
+                'name': 'test_lazy_responses_mock',
+                'test': LazyDocumentTests('test_lazy_responses_mock', api)
+            },
+        ]
+
+    tray = {
+        'status': 'ok', 'broadcasts': [], 'none': None,
+        'tray': [
+            {'id': 1, 'seen': 0.0, 'user': {'pk': 1, 'username': 'a/b'}, 'items': [{'pk': 10}]},
+            {'id': 2, 'seen': 1.5, 'user': {'pk': 2, 'username': 'c~d'}},
+        ],
+    }
+
+    def check_document(self, doc):
+        self.assertEqual(doc['status'], 'ok')
+        self.assertIsNone(doc['none'])
+        self.assertIn('tray', doc)
+        self.assertEqual(list(doc.keys()), list(self.tray.keys()))
+        self.assertIsInstance(doc['tray'], LazyDocument)
+        self.assertTrue(doc['tray'].is_array)
+        self.assertEqual(len(doc['tray']), 2)
+        self.assertEqual([r['user']['username'] for r in doc['tray']], ['a/b', 'c~d'])
+        self.assertEqual(doc.at('/tray/1/seen'), 1.5)
+        self.assertEqual(doc.at('/tray/0/items/0/pk'), 10)
+        self.assertIsNone(doc.at('/tray/1/items/0/pk'))
+        self.assertIsNone(doc.at('/tray/x'))
+        self.assertIsNone(doc.at('/status/x'))
+        self.assertEqual(doc.get('missing', 1), 1)
+        self.assertEqual(doc['tray'].get(5, 1), 1)
+        self.assertEqual(doc['tray'][0]['user'].materialize(), self.tray['tray'][0]['user'])
+        self.assertEqual(doc.materialize(), self.tray)
+        with self.assertRaises(KeyError):
+            doc['missing']
+
+    def test_lazy_document_mock(self):
+        doc = LazyDocument(json.dumps(self.tray, indent=2).encode('utf8'))
+        self.assertIn('LazyDocument', repr(doc))
+        self.check_document(doc)
+        doc = LazyDocument(b' [{"a": 1}, 2]')
+        self.assertEqual(doc[0]['a'], 1)
+        self.assertEqual(doc.at('/1'), 2)
+
+    @compat_mock.patch('instagram_private_api.lazy.msgspec', None)
+    def test_lazy_document_fallback_mock(self):
+        self.check_document(LazyDocument(json.dumps(self.tray).encode('utf8')))
+
+    @compat_mock.patch('instagram_private_api.client.compat_urllib_request.OpenerDirector.open')
+    def test_lazy_responses_mock(self, open_mock):
+        open_mock.side_effect = [
+            MockResponse(body=json.dumps(self.tray)),
+            MockResponse(body=json.dumps({'status': 'fail', 'message': 'Not found'})),
+        ]
+        lazy_responses, auto_patch = self.api.lazy_responses, self.api.auto_patch
+        self.api.lazy_responses, self.api.auto_patch = True, True
+        try:
+            res = self.api.reels_tray()
+            self.assertIsInstance(res, LazyDocument)
+            self.assertEqual(res.at('/tray/0/user/username'), 'a/b')
+            with self.assertRaises(ClientError) as ce:
+                self.api.feed_timeline()
+            self.assertEqual(ce.exception.msg, 'Not found')
+        finally:
+            self.api.lazy_responses, self.api.auto_patch = lazy_responses, auto_patch
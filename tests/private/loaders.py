@@ -0,0 +1,109 @@
+import asyncio
+import threading
+
+from ..common import ApiTestBase, ClientError, compat_mock
+
+
+class LoadersTests(ApiTestBase):
+    """Tests for the batching loaders."""
+
+    @staticmethod
+    def init_all(api):
+        return [
+            {
+                'name': 'test_media_info_loader_mock',
+                'test': LoadersTests('test_media_info_loader_mock', api)
+            },
+            {
+                'name': 'test_media_info_loader_async_mock',
+                'test': LoadersTests('test_media_info_loader_async_mock', api)
+            },
+            {
+                'name': 'test_media_info_loader_errors_mock',
+                'test': LoadersTests('test_media_info_loader_errors_mock', api)
+            },
+            {
+                'name': 'test_media_info_loader_closed_mock',
+                'test': LoadersTests('test_media_info_loader_closed_mock', api)
+            },
+        ]
+
+    @staticmethod
+    def medias_info(media_ids):
+        return {
+            'status': 'ok',
+            'items': [{'pk': int(i.split('_')[0]), 'id': f'{i.split("_")[0]}_1'} for i in media_ids if i != '404'],
+        }
+
+    @compat_mock.patch('instagram_private_api.Client.medias_info')
+    def test_media_info_loader_mock(self, medias_info):
+        medias_info.side_effect = self.medias_info
+        with self.api.media_info_loader(max_batch_size=10, wait=0.5) as loader:
+            results = {}
+
+            def load(media_id):
+                results[media_id] = loader.load(media_id)
+
+            threads = [threading.Thread(target=load, args=(f'{i}_1',)) for i in range(1, 6)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            self.assertEqual(medias_info.call_count, 1)
+            self.assertEqual(sorted(medias_info.call_args[0][0]), [f'{i}_1' for i in range(1, 6)])
+            self.assertEqual(results['3_1'], {'pk': 3, 'id': '3_1'})
+
+            # full batches are fetched without waiting, and duplicate ids are fetched once
+            medias_info.reset_mock()
+            loader.wait = 60
+            medias = loader.load_many(['5'] + [str(i) for i in range(20)])
+            self.assertEqual(medias_info.call_count, 2)
+            self.assertEqual([m['pk'] for m in medias], [5] + list(range(20)))
+        self.assertEqual(loader.batches, 3)
+
+    @compat_mock.patch('instagram_private_api.Client.medias_info')
+    def test_media_info_loader_async_mock(self, medias_info):
+        medias_info.side_effect = self.medias_info
+
+        async def main(loader):
+            return await asyncio.gather(*[loader.aload(f'{i}_1') for i in range(1, 4)])
+
+        with self.api.media_info_loader(wait=0.01) as loader:
+            medias = asyncio.run(main(loader))
+        medias_info.assert_called_once()
+        self.assertEqual([m['id'] for m in medias], ['1_1', '2_1', '3_1'])
+
+    @compat_mock.patch('instagram_private_api.Client.medias_info')
+    def test_media_info_loader_errors_mock(self, medias_info):
+        medias_info.side_effect = self.medias_info
+        with self.api.media_info_loader(wait=60) as loader:
+            found, missing = loader.load_future('1'), loader.load_future('404')
+        self.assertEqual(found.result()['pk'], 1)
+        with self.assertRaises(ClientError) as ce:
+            missing.result()
+        self.assertEqual(ce.exception.code, 404)
+
+        medias_info.side_effect = ClientError('Bad Request', 400)
+        with self.api.media_info_loader(wait=60) as loader:
+            futures = [loader.load_future('1'), loader.load_future('2')]
+        for future in futures:
+            with self.assertRaises(ClientError):
+                future.result()
+
+    @compat_mock.patch('instagram_private_api.Client.medias_info')
+    def test_media_info_loader_closed_mock(self, medias_info):
+        medias_info.side_effect = self.medias_info
+        loader = self.api.media_info_loader(wait=60)
+        loader.close()
+        with self.assertRaises(RuntimeError):
+            loader.load('1_2')
+        medias_info.assert_not_called()
+
+        # a batch that cannot be submitted fails its lookups instead of leaving them pending
+        loader = self.api.media_info_loader(wait=60)
+        future = loader.load_future('1_2')
+        loader.executor.shutdown()
+        loader.flush()
+        with self.assertRaises(RuntimeError):
+            future.result(timeout=5)
+        loader.close()
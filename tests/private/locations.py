@@ -1,4 +1,4 @@
-from ..common import ApiTestBase
+from ..common import ApiTestBase, compat_mock
 
 
 class LocationTests(ApiTestBase):
@@ -27,6 +27,10 @@ class LocationTests(ApiTestBase):
                 'name': 'test_location_section',
                 'test': LocationTests('test_location_section', api)
             },
+            {
+                'name': 'test_location_section_iter_mock',
+                'test': LocationTests('test_location_section_iter_mock', api)
+            },
         ]
 
     def test_location_info(self):
@@ -55,3 +59,34 @@ class LocationTests(ApiTestBase):
         self.assertEqual(results.get('status'), 'ok')
         self.assertIn('sections', results)
         self.assertGreater(len(results.get('sections', [])), 0, 'No results returned.')
+
+    @compat_mock.patch('instagram_private_api.Client._call_api')
+    def test_location_section_iter_mock(self, call_api):
+        auto_patch = self.api.auto_patch
+        self.api.auto_patch = False
+        try:
+            def section_page(pks, **kwargs):
+                page = {'status': 'ok', 'sections': [
+                    {'layout_content': {'medias': [{'media': {'pk': pk, 'id': f'{pk}_1'}} for pk in pks]}}]}
+                page.update(kwargs)
+                return page
+
+            location_id = 229573811
+            rank_token = self.api.generate_uuid()
+            call_api.side_effect = [
+                section_page([1, 2], more_available=True, next_max_id='abc', next_page=1),
+                section_page([2, 3], more_available=False),
+                section_page([3, 4], more_available=False),
+            ]
+            paginator = self.api.location_section_iter(location_id, rank_token)
+            self.assertEqual([m['pk'] for m in paginator], [1, 2, 3, 4])
+            self.assertEqual(call_api.call_count, 3)
+            call_api.assert_called_with(
+                f'locations/{location_id}/sections/',
+                params={
+                    'rank_token': rank_token, 'tab': 'ranked', 'session_id': self.api.session_id,
+                    'max_id': 'abc', 'page': 1,
+                },
+                unsigned=True)
+        finally:
+            self.api.auto_patch = auto_patch
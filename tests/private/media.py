@@ -47,6 +47,18 @@ class MediaTests(ApiTestBase):
                 'name': 'test_media_n_comments',
                 'test': MediaTests('test_media_n_comments', api, media_id=test_media_id)
             },
+            {
+                'name': 'test_media_n_comments_mock',
+                'test': MediaTests('test_media_n_comments_mock', api)
+            },
+            {
+                'name': 'test_media_comments_iter_mock',
+                'test': MediaTests('test_media_comments_iter_mock', api)
+            },
+            {
+                'name': 'test_media_comment_threads_mock',
+                'test': MediaTests('test_media_comment_threads_mock', api)
+            },
             {
                 'name': 'test_media_likers',
                 'test': MediaTests('test_media_likers', api, media_id=test_media_id)
@@ -119,6 +131,10 @@ class MediaTests(ApiTestBase):
                 'name': 'test_bulk_delete_comments_mock',
                 'test': MediaTests('test_bulk_delete_comments_mock', api)
             },
+            {
+                'name': 'test_bulk_delete_comments_chunked_mock',
+                'test': MediaTests('test_bulk_delete_comments_chunked_mock', api)
+            },
             {
                 'name': 'test_save_photo',
                 'test': MediaTests('test_save_photo', api, media_id=test_media_id)
@@ -220,6 +236,127 @@ class MediaTests(ApiTestBase):
         results = self.api.media_n_comments(self.test_media_id, n=num_of_comments)
         self.assertGreaterEqual(len(results), num_of_comments, 'No comment returned.')
 
+    @staticmethod
+    def _comments_pages():
+        def comment(pk):
+            return {
+                'pk': pk, 'created_at': pk, 'created_at_utc': pk, 'text': 'x',
+                'user': {'pk': 1, 'username': 'x', 'full_name': 'X', 'profile_pic_url': 'x.jpg'}}
+
+        # older pages are followed to the end before the newer pages
+        return [
+            {'status': 'ok', 'comments': [comment(5), comment(6)],
+             'has_more_comments': True, 'next_max_id': 'older',
+             'has_more_headload_comments': True, 'next_min_id': 'newer'},
+            {'status': 'ok', 'comments': [comment(3), comment(4)],
+             'has_more_comments': True, 'next_max_id': 'older2'},
+            {'status': 'ok', 'comments': [comment(1), comment(2)],
+             'has_more_comments': False},
+            {'status': 'ok', 'comments': [comment(7), comment(8)],
+             'has_more_headload_comments': False},
+        ]
+
+    @compat_mock.patch('instagram_private_api.Client._call_api')
+    def test_media_n_comments_mock(self, call_api):
+        call_api.side_effect = self._comments_pages()
+        media_id = '123_123'
+        comments = self.api.media_n_comments(media_id, n=5)
+        self.assertEqual([c['created_at_utc'] for c in comments], [1, 2, 3, 4, 5, 6])
+        call_api.assert_any_call(f'media/{media_id}/comments/', query={'max_id': 'older'})
+        call_api.assert_called_with(f'media/{media_id}/comments/', query={'max_id': 'older2'})
+
+        call_api.reset_mock()
+        call_api.side_effect = self._comments_pages()
+        comments = self.api.media_n_comments(media_id, n=100)
+        self.assertEqual([c['created_at_utc'] for c in comments], list(range(1, 9)))
+        call_api.assert_called_with(f'media/{media_id}/comments/', query={'min_id': 'newer'})
+
+    @compat_mock.patch('instagram_private_api.Client._call_api')
+    def test_media_comments_iter_mock(self, call_api):
+        media_id = '123_123'
+        endpoint = f'media/{media_id}/comments/'
+
+        def comment(pk):
+            return {
+                'pk': pk, 'created_at': pk, 'created_at_utc': pk, 'text': 'x',
+                'user': {'pk': 1, 'username': 'x', 'full_name': 'X', 'profile_pic_url': 'x.jpg'}}
+
+        # 10 pages of 20 comments, newest page first, each page oldest first
+        pages = {}
+        for page in range(10):
+            newest = 199 - 20 * page
+            pages[f'page{page}'] = {
+                'status': 'ok', 'comments': [comment(pk) for pk in range(newest - 19, newest + 1)],
+                'has_more_comments': page < 9, 'next_max_id': f'page{page + 1}',
+                'has_more_headload_comments': page > 0, 'next_min_id': f'page{page - 1}',
+            }
+
+        def call(path, query):
+            self.assertEqual(path, endpoint)
+            return pages[query.get('max_id') or query.get('min_id') or 'page0']
+
+        call_api.side_effect = call
+        comments = list(self.api.media_comments_iter(media_id))
+        self.assertEqual([c['pk'] for c in comments], list(range(199, -1, -1)))
+        self.assertEqual(call_api.call_count, 10)
+
+        # oldest first, from a cursor towards newer comments
+        call_api.reset_mock()
+        comments = list(self.api.media_comments_iter(media_id, reverse=False, min_id='page7'))
+        self.assertEqual([c['pk'] for c in comments], list(range(40, 200)))
+        call_api.assert_called_with(endpoint, query={'min_id': 'page0'})
+
+        # stopping early does not fetch any more pages
+        call_api.reset_mock()
+        comments = self.api.media_comments_iter(media_id)
+        self.assertEqual([next(comments)['pk'] for _ in range(21)], list(range(199, 178, -1)))
+        comments.close()
+        self.assertEqual(call_api.call_count, 2)
+
+    @compat_mock.patch('instagram_private_api.Client._call_api')
+    def test_media_comment_threads_mock(self, call_api):
+        media_id = '123_123'
+
+        def comment(pk, **kwargs):
+            c = {'pk': pk, 'created_at': pk, 'created_at_utc': pk, 'text': 'x',
+                 'user': {'pk': 1, 'username': 'x', 'full_name': 'X', 'profile_pic_url': 'x.jpg'}}
+            c.update(kwargs)
+            return c
+
+        responses = {
+            (f'media/{media_id}/comments/', None): {
+                'status': 'ok', 'comments': [
+                    comment(1),
+                    comment(2, child_comment_count=1, preview_child_comments=[comment(21)]),
+                    comment(3, child_comment_count=4, preview_child_comments=[comment(31)],
+                            has_more_tail_child_comments=True, next_max_child_cursor='c3'),
+                ], 'has_more_comments': True, 'next_max_id': 'p2'},
+            (f'media/{media_id}/comments/', 'p2'): {
+                'status': 'ok', 'comments': [comment(4, child_comment_count=2)]},
+            (f'media/{media_id}/comments/3/inline_child_comments/', 'c3'): {
+                'status': 'ok', 'child_comments': [comment(32), comment(33)],
+                'has_more_tail_child_comments': False},
+            (f'media/{media_id}/comments/3/child_comments/', None): {
+                'status': 'ok', 'child_comments': [comment(31), comment(32)],
+                'has_more_tail_child_comments': True, 'next_max_child_cursor': 'c3b'},
+            (f'media/{media_id}/comments/3/child_comments/', 'c3b'): {
+                'status': 'ok', 'child_comments': [comment(34)]},
+            (f'media/{media_id}/comments/4/child_comments/', None): {
+                'status': 'ok', 'child_comments': [comment(41), comment(42)]},
+        }
+
+        def call_api_side_effect(endpoint, query=None, **kwargs):
+            return responses[(endpoint, (query or {}).get('max_id'))]
+
+        call_api.side_effect = call_api_side_effect
+        threads = self.api.media_comment_threads(media_id, max_workers=2)
+        self.assertEqual(list(threads.keys()), [1, 2, 3, 4])
+        self.assertEqual(
+            {pk: [r['pk'] for r in t['replies']] for pk, t in threads.items()},
+            {1: [], 2: [21], 3: [31, 32, 33, 34], 4: [41, 42]})
+        self.assertNotIn('preview_child_comments', threads[2]['comment'])
+        self.assertEqual(call_api.call_count, 6)
+
     def test_comment_replies(self):
         results = self.api.comment_replies(
             '1652531711743017348_184692323', '17881229782160892')
@@ -503,8 +640,8 @@ class MediaTests(ApiTestBase):
         call_api.return_value = {'status': 'ok'}
         ts_now = 1493789777
 
-        with compat_mock.patch('instagram_private_api.endpoints.media.randint') as randint_mock, \
-                compat_mock.patch('instagram_private_api.endpoints.media.time.time') as time_mock:
+        with compat_mock.patch('instagram_private_api.reporters.randint') as randint_mock, \
+                compat_mock.patch('instagram_private_api.reporters.time.time') as time_mock:
 
             time_mock.return_value = ts_now
             randint_mock.return_value = 0
@@ -536,6 +673,23 @@ class MediaTests(ApiTestBase):
             f'media/{media_id}/comment/bulk_delete/',
             params=params)
 
+    @compat_mock.patch('instagram_private_api.Client._call_api')
+    def test_bulk_delete_comments_chunked_mock(self, call_api):
+        def bulk_delete(endpoint, params):
+            if '60' in params['comment_ids_to_delete'].split(','):
+                raise ClientError('Bad Request', 400)
+            return {'status': 'ok'}
+
+        call_api.side_effect = bulk_delete
+        media_id = '123_123'
+        results = self.api.bulk_delete_comments_chunked(media_id, [str(i) for i in range(100)])
+        self.assertEqual(call_api.call_count, 4)
+        self.assertEqual(call_api.call_args[0][0], f'media/{media_id}/comment/bulk_delete/')
+        self.assertEqual(results['failed_comment_ids'], [str(i) for i in range(50, 75)])
+        self.assertEqual(sorted(results['deleted_comment_ids'], key=int), [str(i) for i in range(50)] + [
+            str(i) for i in range(75, 100)])
+        self.assertEqual(results['stats'].failed_chunks, 1)
+
     @unittest.skip('Modifies data.')
     def test_media_only_me(self):
         results = self.api.self_feed()
@@ -1,6 +1,6 @@
 import unittest
 
-from ..common import ApiTestBase
+from ..common import ApiTestBase, ClientThrottledError, compat_mock
 
 
 class MiscTests(ApiTestBase):
@@ -41,6 +41,10 @@ class MiscTests(ApiTestBase):
                 'name': 'test_bulk_translate',
                 'test': MiscTests('test_bulk_translate', api)
             },
+            {
+                'name': 'test_bulk_translate_chunked_mock',
+                'test': MiscTests('test_bulk_translate_chunked_mock', api)
+            },
             {
                 'name': 'test_translate',
                 'test': MiscTests('test_translate', api)
@@ -114,6 +118,25 @@ class MiscTests(ApiTestBase):
         self.assertEqual(results.get('status'), 'ok')
         self.assertGreater(len(results.get('comment_translations', [])), 0, 'No translations returned.')
 
+    @compat_mock.patch('instagram_private_api.Client._call_api')
+    def test_bulk_translate_chunked_mock(self, call_api):
+        def bulk_translate(endpoint, query):
+            comment_ids = query['comment_ids'].split(',')
+            if '5' in comment_ids:
+                raise ClientThrottledError('Too Many Requests', 429)
+            return {'status': 'ok', 'comment_translations': [{'id': int(i), 'translation': i} for i in comment_ids]}
+
+        call_api.side_effect = bulk_translate
+        results = self.api.bulk_translate_chunked(list(range(10)), chunk_size=4, max_workers=2)
+        self.assertEqual(call_api.call_count, 3)
+        self.assertEqual(results['failed_comment_ids'], [4, 5, 6])
+        self.assertIsInstance(results['errors'][0], ClientThrottledError)
+        self.assertEqual(sorted(t['id'] for t in results['comment_translations']), [0, 1, 2, 3, 7, 8, 9])
+        stats = results['stats']
+        self.assertEqual((stats.chunks, stats.failed_chunks, stats.items, stats.failed_items), (3, 1, 10, 3))
+        self.assertGreater(stats.items_per_second, 0)
+        self.assertEqual(stats.to_dict()['chunks'], 3)
+
     def test_top_search(self):
         results = self.api.top_search('cats')
         self.assertEqual(results.get('status'), 'ok')
@@ -0,0 +1,96 @@
+import sys
+
+from ..common import ApiTestBase, compat_mock, models
+from .compatpatch import CompatPatchTests
+
+
+class ModelsTests(ApiTestBase):
+    """Tests for the compact models."""
+
+    @staticmethod
+    def init_all(api):
+        return [
+            {
+                'name': 'test_media_model_mock',
+                'test': ModelsTests('test_media_model_mock', api)
+            },
+            {
+                'name': 'test_model_compat_mock',
+                'test': ModelsTests('test_model_compat_mock', api)
+            },
+            {
+                'name': 'test_as_models_mock',
+                'test': ModelsTests('test_as_models_mock', api)
+            },
+        ]
+
+    def test_media_model_mock(self):
+        media = models.Media.from_dict(CompatPatchTests._media())
+        self.assertEqual(media.pk, 1)
+        self.assertEqual(media.code, 'abc')
+        self.assertIsInstance(media.user, models.User)
+        self.assertEqual(media.user.username, 'user2')
+        self.assertIsInstance(media.caption, models.Comment)
+        self.assertEqual(media.caption.user.pk, 10)
+        self.assertIsNone(media.view_count)
+        self.assertIsNone(media.image_url)
+
+        video, photo = media.carousel_media
+        self.assertIsInstance(video, models.Media)
+        self.assertEqual(video.image_url, '640.jpg')
+        self.assertEqual(video.video_url, '640.mp4')
+        self.assertEqual(photo.image_url, '1080.jpg')
+        self.assertIsNone(photo.video_url)
+
+        self.assertFalse(hasattr(media, '__dict__'))
+        with self.assertRaises(AttributeError):
+            media.filter_type = 1
+
+        # models keep a fraction of the fields
+        obj = media.to_dict()
+        self.assertEqual(obj['user']['pk'], 2)
+        self.assertEqual(obj['carousel_media'][0]['video_url'], '640.mp4')
+        self.assertNotIn('preview_comments', obj)
+        self.assertLess(sys.getsizeof(media), sys.getsizeof(CompatPatchTests._media()))
+
+    def test_model_compat_mock(self):
+        user = models.User.from_dict({'pk': 1, 'username': 'x', 'friendship_status': {}})
+        self.assertEqual(user['username'], 'x')
+        self.assertEqual(user.get('username'), 'x')
+        self.assertEqual(user.get('biography', ''), '')
+        self.assertEqual(user.get('friendship_status', 0), 0)
+        with self.assertRaises(KeyError):
+            user['friendship_status']
+        self.assertIn('username', user)
+        self.assertNotIn('biography', user)
+        self.assertNotIn('friendship_status', user)
+        self.assertNotIn(0, user)
+        self.assertEqual(user, models.User(pk=1, username='x'))
+        self.assertNotEqual(user, models.User(pk=2, username='x'))
+        self.assertIn('username', repr(user))
+
+    @compat_mock.patch('instagram_private_api.Client._call_api')
+    def test_as_models_mock(self, call_api):
+        as_models, auto_patch = self.api.as_models, self.api.auto_patch
+        self.api.as_models, self.api.auto_patch = True, True
+        try:
+            call_api.return_value = {'status': 'ok', 'items': [CompatPatchTests._media()]}
+            results = self.api.user_feed('2')
+            call_api.return_value = {'status': 'ok', 'users': [{'pk': 1, 'username': 'x'}]}
+            followers = self.api.user_followers('2', self.api.generate_uuid())
+            call_api.return_value = {
+                'status': 'ok',
+                'reel': {'id': 2, 'user': {'pk': 2}, 'items': [CompatPatchTests._media()]},
+                'broadcast': {'id': 3, 'broadcast_owner': {'pk': 2}, 'broadcast_status': 'active'},
+            }
+            story = self.api.user_story_feed('2')
+        finally:
+            self.api.as_models, self.api.auto_patch = as_models, auto_patch
+
+        self.assertIsInstance(results['items'][0], models.Media)
+        self.assertEqual(results['items'][0].carousel_media[0].video_url, '640.mp4')
+        self.assertIsInstance(followers['users'][0], models.User)
+        self.assertIsInstance(story['reel'], models.Reel)
+        self.assertIsInstance(story['reel'].items[0], models.Media)
+        self.assertIsInstance(story['broadcast'], models.Broadcast)
+        self.assertEqual(story['broadcast'].broadcast_owner.pk, 2)
@@ -0,0 +1,85 @@
+from ..common import ApiTestBase, ClientError, compat_mock, planner
+
+
+class PlannerTests(ApiTestBase):
+    """Tests for the fetch planner."""
+
+    @staticmethod
+    def init_all(api):
+        return [
+            {
+                'name': 'test_plan_mock',
+                'test': PlannerTests('test_plan_mock', api)
+            },
+            {
+                'name': 'test_planner_fetch_mock',
+                'test': PlannerTests('test_planner_fetch_mock', api)
+            },
+        ]
+
+    def test_plan_mock(self):
+        fetch_planner = planner.FetchPlanner(self.api)
+        user_ids = [str(i) for i in range(100)]
+        media_ids = [f'{i}_1' for i in range(120)]
+
+        # profile and story: one user_info per user, stories batched
+        plan = fetch_planner.plan({'profile': user_ids, 'story': user_ids})
+        self.assertEqual(plan.count_calls('user_info'), 100)
+        self.assertEqual(plan.count_calls('reels_media'), 5)
+        self.assertEqual((len(plan), plan.naive_count), (105, 200))
+
+        # profile and feed: user_detail_info returns both
+        plan = fetch_planner.plan({'profile': user_ids, 'feed': user_ids, 'media': media_ids})
+        self.assertEqual(plan.count_calls('user_detail_info'), 100)
+        self.assertEqual(plan.count_calls('medias_info'), 3)
+        self.assertEqual((len(plan), plan.naive_count), (103, 320))
+        self.assertEqual(
+            sorted(len(c.ids) for c in plan if c.endpoint.name == 'medias_info'), [40, 40, 40])
+
+        # without experimental endpoints
+        plan = planner.FetchPlanner(self.api, experimental=False).plan({'profile': user_ids, 'feed': user_ids})
+        self.assertEqual((plan.count_calls('user_info'), plan.count_calls('user_feed')), (100, 100))
+
+        # ids needing different entities share the batches
+        plan = fetch_planner.plan({'story': user_ids[:10], 'broadcast': user_ids[5:10], 'profile': user_ids[10:15]})
+        self.assertEqual(plan.count_calls('user_story_feed'), 5)
+        self.assertEqual(plan.count_calls('reels_media'), 1)
+        self.assertEqual(plan.count_calls('user_info'), 5)
+        self.assertEqual(
+            next(c for c in plan if c.endpoint.name == 'reels_media').ids, user_ids[:5])
+
+        with self.assertRaises(ValueError):
+            fetch_planner.plan({'comments': ['1']})
+
+    @compat_mock.patch('instagram_private_api.Client.medias_info')
+    @compat_mock.patch('instagram_private_api.Client.reels_media')
+    @compat_mock.patch('instagram_private_api.Client.user_detail_info')
+    def test_planner_fetch_mock(self, user_detail_info, reels_media, medias_info):
+        def detail(user_id):
+            if user_id == '3':
+                raise ClientError('Not Found', 404)
+            return {
+                'user_detail': {'user': {'pk': int(user_id)}},
+                'feed': {'items': [{'pk': 1}]},
+                'reel_feed': None,
+            }
+
+        user_detail_info.side_effect = detail
+        reels_media.side_effect = lambda ids: {
+            'reels_media': [{'id': i, 'items': []} for i in ids if i != 'highlight:2'], 'reels': {}}
+        medias_info.side_effect = lambda ids: {'items': [{'pk': int(i.split('_')[0]), 'id': i} for i in ids]}
+
+        results = planner.FetchPlanner(self.api, max_workers=2).fetch({
+            'profile': ['1', '2', '3'], 'feed': [1, 2, 3], 'media': ['10_1', '11'],
+            'highlight': ['highlight:1', 'highlight:2'],
+        })
+        self.assertEqual(user_detail_info.call_count, 3)
+        reels_media.assert_called_once_with(['highlight:1', 'highlight:2'])
+        self.assertEqual(results['profile'], {'1': {'pk': 1}, '2': {'pk': 2}})
+        self.assertEqual(results['feed']['2'], [{'pk': 1}])
+        self.assertNotIn('story', results)
+        self.assertEqual(results['media'], {'10_1': {'pk': 10, 'id': '10_1'}, '11': {'pk': 11, 'id': '11'}})
+        self.assertEqual(results['highlight'], {'highlight:1': {'id': 'highlight:1', 'items': []}, 'highlight:2': None})
+        call, error = results['errors'][0]
+        self.assertEqual((call.endpoint.name, call.ids), ('user_detail_info', ['3']))
+        self.assertEqual(error.code, 404)
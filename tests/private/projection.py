@@ -0,0 +1,68 @@
+from ..common import ApiTestBase, compat_mock, models, Projection
+from .compatpatch import CompatPatchTests
+
+
+class ProjectionTests(ApiTestBase):
+    """Tests for field projections."""
+
+    @staticmethod
+    def init_all(api):
+        return [
+            {
+                'name': 'test_projection_mock',
+                'test': ProjectionTests('test_projection_mock', api)
+            },
+            {
+                'name': 'test_client_projections_mock',
+                'test': ProjectionTests('test_client_projections_mock', api)
+            },
+        ]
+
+    def test_projection_mock(self):
+        media = CompatPatchTests._media()
+        projection = Projection(['pk', 'taken_at', 'missing', {'user': {'pk', 'username'}}])
+        self.assertEqual(
+            projection(media),
+            {'pk': 1, 'taken_at': 1500000000, 'user': {'pk': 2, 'username': 'user2'}})
+
+        # lists of objects, whole fields and nested projections
+        projection = Projection({
+            'pk': True,
+            'caption': None,
+            'carousel_media': ['media_type', {'image_versions2': {'candidates': ['url']}}],
+        })
+        projected = projection(media)
+        self.assertEqual(projected['caption'], media['caption'])
+        self.assertEqual(projected['carousel_media'], [
+            {'media_type': 2, 'image_versions2': {'candidates': [{'url': '640.jpg'}]}},
+            {'media_type': 1, 'image_versions2': {'candidates': [{'url': '1080.jpg'}]}},
+        ])
+        self.assertEqual(Projection(projection).fields, projection.fields)
+        self.assertEqual(Projection('pk')(media), {'pk': 1})
+        with self.assertRaises(ValueError):
+            Projection(['pk', 1])
+
+    @compat_mock.patch('instagram_private_api.Client._call_api')
+    def test_client_projections_mock(self, call_api):
+        auto_patch, as_models, projections = self.api.auto_patch, self.api.as_models, self.api.projections
+        self.api.auto_patch = True
+        self.api.projections = {'media': Projection(['pk', {'user': ['username']}])}
+        try:
+            call_api.return_value = {'status': 'ok', 'items': [CompatPatchTests._media()]}
+            results = self.api.user_feed('2')
+            self.api.as_models = True
+            call_api.return_value = {'status': 'ok', 'items': [CompatPatchTests._media()]}
+            models_results = self.api.user_feed('2')
+            call_api.return_value = {'status': 'ok', 'users': [{'pk': 1, 'username': 'x', 'profile_pic_id': '1_1'}]}
+            followers = self.api.user_followers('2', self.api.generate_uuid())
+        finally:
+            self.api.auto_patch, self.api.as_models, self.api.projections = auto_patch, as_models, projections
+
+        # projected objects are not patched
+        self.assertEqual(results['items'], [{'pk': 1, 'user': {'username': 'user2'}}])
+        media = models_results['items'][0]
+        self.assertIsInstance(media, models.Media)
+        self.assertEqual(media.user.username, 'user2')
+        self.assertIsNone(media.code)
+        # objects without a projection are converted as usual
+        self.assertIsInstance(followers['users'][0], models.User)
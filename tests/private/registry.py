@@ -0,0 +1,211 @@
+import asyncio
+import inspect
+import re
+import warnings
+
+from ..common import ApiTestBase, Client, ClientError, compat_mock, registry
+from instagram_private_api import endpoints
+from instagram_private_api.errors import ClientConnectionError
+
+CALL_API = inspect.signature(Client._call_api)
+
+
+class RegistryTests(ApiTestBase):
+    """Tests for the endpoint registry."""
+
+    @staticmethod
+    def init_all(api):
+        return [
+            {
+                'name': 'test_registry_coverage_mock',
+                'test': RegistryTests('test_registry_coverage_mock', api)
+            },
+            {
+                'name': 'test_registry_calls_mock',
+                'test': RegistryTests('test_registry_calls_mock', api)
+            },
+            {
+                'name': 'test_response_cache_mock',
+                'test': RegistryTests('test_response_cache_mock', api)
+            },
+            {
+                'name': 'test_retries_mock',
+                'test': RegistryTests('test_retries_mock', api)
+            },
+            {
+                'name': 'test_paginate_mock',
+                'test': RegistryTests('test_paginate_mock', api)
+            },
+            {
+                'name': 'test_async_client_mock',
+                'test': RegistryTests('test_async_client_mock', api)
+            },
+        ]
+
+    def setUp(self):
+        self.options = (
+            self.api.response_cache, self.api.retries, self.api.retry_backoff, self.api.on_call, self.api.auto_patch)
+        # the stub responses are not complete enough to be patched
+        self.api.auto_patch = False
+
+    def tearDown(self):
+        (self.api.response_cache, self.api.retries, self.api.retry_backoff, self.api.on_call,
+         self.api.auto_patch) = self.options
+        super().tearDown()
+
+    def test_registry_coverage_mock(self):
+        methods = set()
+        for name in dir(endpoints):
+            if name.endswith('EndpointsMixin'):
+                methods.update(
+                    n for n, v in vars(getattr(endpoints, name)).items()
+                    if not n.startswith('_') and (inspect.isfunction(v) or isinstance(v, (staticmethod, classmethod))))
+        self.assertEqual(methods - set(registry.ENDPOINTS) - registry.HELPERS, set())
+        self.assertEqual((set(registry.ENDPOINTS) | registry.HELPERS) - methods, set())
+        self.assertFalse(set(registry.ENDPOINTS) & registry.HELPERS)
+        for name, endpoint in registry.ENDPOINTS.items():
+            self.assertIs(getattr(self.api, name).endpoint, endpoint)
+            self.assertIn(endpoint.method, (registry.GET, registry.POST))
+            if endpoint.paging and endpoint.paging.iterator:
+                self.assertTrue(callable(getattr(self.api, endpoint.paging.iterator)))
+        self.assertTrue(registry.ENDPOINTS['user_info'].idempotent)
+        self.assertFalse(registry.ENDPOINTS['post_comment'].idempotent)
+        self.assertTrue(registry.ENDPOINTS['post_comment'].signed)
+
+    @staticmethod
+    def endpoint_args(name, func):
+        """Valid arguments for an endpoint method"""
+        values = {
+            'channel_id': 'for_you', 'media_type': 1, 'message_prefs': 'anyone', 'duration': 1,
+            'thumbnail_data': b'x', 'size': (1080, 1920) if name.endswith('_to_reel') else (640, 640),
+        }
+        args = []
+        for param in inspect.signature(func).parameters.values():
+            if param.default is not param.empty or param.kind != param.POSITIONAL_OR_KEYWORD:
+                continue
+            if param.name == 'rank_token':
+                args.append(Client.generate_uuid())
+            elif param.name.endswith('_ids'):
+                args.append(['1'])
+            else:
+                args.append(values.get(param.name, '1'))
+        return args, {'title': 'x'} if name == 'highlight_edit' else {}
+
+    @compat_mock.patch('instagram_private_api.Client._call_api')
+    def test_registry_calls_mock(self, call_api):
+        call_api.return_value = {'status': 'ok'}
+        for name, endpoint in registry.ENDPOINTS.items():
+            call_api.reset_mock()
+            args, kwargs = self.endpoint_args(name, getattr(self.api, name))
+            try:
+                with warnings.catch_warnings():
+                    warnings.simplefilter('ignore')
+                    getattr(self.api, name)(*args, **kwargs)
+            except NotImplementedError:
+                continue
+            self.assertEqual(call_api.call_count, 1, name)
+            # the declared method and path match the call
+            call = CALL_API.bind(self.api, *call_api.call_args[0], **call_api.call_args[1]).arguments
+            path = re.sub(r'\{\w+\}', '[^/]+', endpoint.path)
+            self.assertRegex(call['endpoint'].split('?')[0], f'^{path}$', name)
+            params = call.get('params')
+            method = registry.POST if params or params == '' else registry.GET
+            self.assertEqual(method, endpoint.method, name)
+            if method == registry.POST:
+                self.assertEqual(params != '' and not call.get('unsigned'), endpoint.signed, name)
+
+    @compat_mock.patch('instagram_private_api.Client._call_api')
+    def test_response_cache_mock(self, call_api):
+        call_api.side_effect = lambda endpoint, **kwargs: {'user': {'pk': 1}, 'items': [], 'status': 'ok'}
+        self.api.response_cache = registry.ResponseCache(maxsize=2)
+
+        self.assertEqual(self.api.user_info('1'), self.api.user_info('1'))
+        self.assertEqual(call_api.call_count, 1)
+        self.api.user_info('2')
+        self.api.user_info('3')
+        self.api.user_info('1')
+        self.assertEqual(call_api.call_count, 4)
+        self.assertEqual(len(self.api.response_cache), 2)
+
+        # no ttl
+        self.api.user_feed('1')
+        self.api.user_feed('1')
+        self.assertEqual(call_api.call_count, 6)
+
+        with compat_mock.patch('instagram_private_api.registry.time.monotonic') as monotonic:
+            monotonic.return_value = 10 ** 9
+            self.api.user_info('1')
+        self.assertEqual(call_api.call_count, 7)
+
+        # clients of other accounts sharing the cache do not get each other's responses
+        self.api.current_user()
+        self.api.current_user()
+        self.assertEqual(call_api.call_count, 8)
+        with compat_mock.patch.object(
+                Client, 'authenticated_user_id', new_callable=compat_mock.PropertyMock) as user_id:
+            user_id.return_value = '2'
+            self.api.current_user()
+            self.api.current_user()
+        self.assertEqual(call_api.call_count, 9)
+
+    @compat_mock.patch('instagram_private_api.registry.time.sleep')
+    @compat_mock.patch('instagram_private_api.Client._call_api')
+    def test_retries_mock(self, call_api, sleep):
+        calls = []
+        self.api.retries = 2
+        self.api.retry_backoff = 0.5
+        self.api.on_call = lambda labels, elapsed, error: calls.append((labels['endpoint'], labels['family'], error))
+
+        error = ClientConnectionError('timeout')
+        call_api.side_effect = [error, error, {'user': {'pk': 1}}]
+        self.assertEqual(self.api.user_info('1')['user']['pk'], 1)
+        self.assertEqual(call_api.call_count, 3)
+        self.assertEqual([c.args for c in sleep.call_args_list], [(0.5, ), (1.0, )])
+        self.assertEqual(calls, [('user_info', 'users', error), ('user_info', 'users', error),
+                                 ('user_info', 'users', None)])
+
+        # not retried: client errors and non idempotent endpoints
+        call_api.reset_mock()
+        call_api.side_effect = ClientError('Not Found', 404)
+        with self.assertRaises(ClientError):
+            self.api.user_info('1')
+        self.assertEqual(call_api.call_count, 1)
+
+        call_api.reset_mock()
+        call_api.side_effect = ClientError('Server Error', 500)
+        with self.assertRaises(ClientError):
+            self.api.logout()
+        self.assertEqual(call_api.call_count, 1)
+
+    @compat_mock.patch('instagram_private_api.Client._call_api')
+    def test_paginate_mock(self, call_api):
+        pages = {
+            None: {'users': [1, 2], 'next_max_id': 'a'},
+            'a': {'users': [3], 'next_max_id': 'b'},
+            'b': {'users': [4]},
+        }
+        call_api.side_effect = lambda endpoint, query, **kwargs: pages[query.get('max_id')]
+        rank_token = self.api.generate_uuid()
+        users = [u for page in self.api.paginate('user_followers', '1', rank_token) for u in page['users']]
+        self.assertEqual(users, [1, 2, 3, 4])
+        self.assertEqual(call_api.call_count, 3)
+
+        with self.assertRaises(ValueError):
+            next(self.api.paginate('user_info', '1'))
+
+    @compat_mock.patch('instagram_private_api.Client._call_api')
+    def test_async_client_mock(self, call_api):
+        call_api.side_effect = lambda endpoint, **kwargs: {
+            'user': {'pk': int(endpoint.split('/')[1]) if endpoint.startswith('users/') else None},
+            'items': [], 'more_available': False}
+        aclient = registry.AsyncClient(self.api)
+
+        async def run():
+            users = await asyncio.gather(*[aclient.user_info(str(i)) for i in range(5)])
+            pages = [page async for page in aclient.paginate('user_feed', '1')]
+            return users, pages
+
+        users, pages = asyncio.run(run())
+        self.assertEqual([u['user']['pk'] for u in users], list(range(5)))
+        self.assertEqual(len(pages), 1)
+        self.assertEqual(aclient.authenticated_user_name, self.api.authenticated_user_name)
@@ -0,0 +1,108 @@
+import gc
+import time
+import weakref
+
+from ..common import ApiTestBase, ClientError, compat_mock
+
+
+class ReportersTests(ApiTestBase):
+    """Tests for the buffered reporters."""
+
+    @staticmethod
+    def init_all(api):
+        return [
+            {
+                'name': 'test_seen_reporter_mock',
+                'test': ReportersTests('test_seen_reporter_mock', api)
+            },
+            {
+                'name': 'test_seen_reporter_interval_mock',
+                'test': ReportersTests('test_seen_reporter_interval_mock', api)
+            },
+            {
+                'name': 'test_seen_reporter_errors_mock',
+                'test': ReportersTests('test_seen_reporter_errors_mock', api)
+            },
+            {
+                'name': 'test_seen_reporter_atexit_mock',
+                'test': ReportersTests('test_seen_reporter_atexit_mock', api)
+            },
+        ]
+
+    @staticmethod
+    def reel(pk, taken_at=1470356135):
+        return {'id': f'{pk}_124317', 'taken_at': taken_at, 'user': {'pk': 124317}}
+
+    @compat_mock.patch('instagram_private_api.Client._call_api')
+    def test_seen_reporter_mock(self, call_api):
+        call_api.return_value = {'status': 'ok'}
+        with self.api.seen_reporter(max_batch_size=3, interval=60) as reporter:
+            for pk in range(4):
+                reporter.add(self.reel(pk), seen_at=1470372049)
+            # the 3rd view triggered a flush
+            call_api.assert_called_once()
+            self.assertEqual(len(reporter), 1)
+            params = call_api.call_args[1]['params']
+            self.assertEqual(params['reels'], {
+                f'{pk}_124317_124317': ['1470356135_1470372049'] for pk in range(3)})
+            self.assertEqual(params['_uuid'], self.api.uuid)
+        # closing flushes the rest
+        self.assertEqual(call_api.call_count, 2)
+        self.assertEqual(call_api.call_args[1]['params']['reels'], {'3_124317_124317': ['1470356135_1470372049']})
+        self.assertEqual((reporter.batches, reporter.reported), (2, 4))
+        with self.assertRaises(RuntimeError):
+            reporter.add(self.reel(5))
+
+    @compat_mock.patch('instagram_private_api.Client._call_api')
+    def test_seen_reporter_interval_mock(self, call_api):
+        call_api.return_value = {'status': 'ok'}
+        reporter = self.api.seen_reporter(interval=0.05)
+        try:
+            now = int(time.time())
+            reporter.add(self.reel(1, taken_at=now + 10))
+            for _ in range(100):
+                if call_api.called:
+                    break
+                time.sleep(0.05)
+            call_api.assert_called_once()
+            # views are never reported before the media was taken
+            self.assertEqual(call_api.call_args[1]['params']['reels'], {
+                '1_124317_124317': [f'{now + 10}_{now + 10}']})
+            self.assertIsNone(reporter.flush())
+        finally:
+            reporter.close()
+        call_api.assert_called_once()
+
+    @compat_mock.patch('instagram_private_api.Client._call_api')
+    def test_seen_reporter_errors_mock(self, call_api):
+        call_api.side_effect = ClientError('Bad Request', 400)
+        reporter = self.api.seen_reporter(interval=60)
+        try:
+            reporter.add(self.reel(1))
+            self.assertIsNone(reporter.flush())
+            self.assertEqual(len(reporter), 1)
+            call_api.side_effect = None
+            call_api.return_value = {'status': 'ok'}
+            reporter.add(self.reel(2))
+            self.assertEqual(reporter.flush(), {'status': 'ok'})
+            self.assertEqual(len(call_api.call_args[1]['params']['reels']), 2)
+            self.assertEqual(len(reporter), 0)
+        finally:
+            reporter.close()
+
+    @compat_mock.patch('instagram_private_api.Client._call_api')
+    def test_seen_reporter_atexit_mock(self, call_api):
+        call_api.return_value = {'status': 'ok'}
+        with compat_mock.patch('instagram_private_api.reporters.atexit') as atexit:
+            reporter = self.api.seen_reporter(interval=60)
+            atexit.register.assert_called_once_with(reporter.close)
+            reporter.close()
+            atexit.unregister.assert_called_once_with(reporter.close)
+        # a closed reporter is no longer referenced by the atexit handlers
+        reporter = self.api.seen_reporter(interval=60)
+        reporter.add(self.reel(1))
+        reporter.close()
+        ref = weakref.ref(reporter)
+        del reporter
+        gc.collect()
+        self.assertIsNone(ref())
@@ -0,0 +1,75 @@
+import os
+import pickle
+
+from ..common import ApiTestBase, ClientError, ClientThrottledError, runtime
+
+
+def transform(client, item, scale=1):
+    if item == 3:
+        raise ClientError('Not Found', 404, error_response='{"status": "fail"}')
+    return os.getpid(), item * scale, client.uuid
+
+
+def large(client, item):
+    return b'x' * (1 << 20)
+
+
+class RuntimeTests(ApiTestBase):
+    """Tests for the process sharded runtime."""
+
+    @staticmethod
+    def init_all(api):
+        return [
+            {
+                'name': 'test_sharded_runtime_mock',
+                'test': RuntimeTests('test_sharded_runtime_mock', api)
+            },
+            {
+                'name': 'test_sharded_runtime_early_exit_mock',
+                'test': RuntimeTests('test_sharded_runtime_early_exit_mock', api)
+            },
+            {
+                'name': 'test_client_error_pickle_mock',
+                'test': RuntimeTests('test_client_error_pickle_mock', api)
+            },
+        ]
+
+    def test_sharded_runtime_mock(self):
+        with self.assertRaises(ValueError):
+            runtime.ShardedRuntime(transform, {})
+
+        with runtime.ShardedRuntime(transform, self.api.settings, processes=2, max_pending=4) as sharded:
+            results = list(sharded.map(range(50), return_exceptions=True))
+            self.assertIsInstance(results[3], ClientError)
+            self.assertEqual(results[3].code, 404)
+            self.assertEqual([r[1] for i, r in enumerate(results) if i != 3], [i for i in range(50) if i != 3])
+            self.assertEqual({r[2] for i, r in enumerate(results) if i != 3}, {self.api.uuid})
+            self.assertNotIn(os.getpid(), {r[0] for i, r in enumerate(results) if i != 3})
+
+            results = dict(sharded.map([(i, 2) for i in range(10) if i != 3], ordered=False))
+            self.assertEqual(sorted(r[1] for r in results.values()), [i * 2 for i in range(10) if i != 3])
+
+            # an aborted map does not leak results into the next one
+            with self.assertRaises(ClientError):
+                list(sharded.map([{'item': i} for i in range(10)]))
+            self.assertEqual([r[1] for r in sharded.map([5, 6])], [5, 6])
+
+    def test_sharded_runtime_early_exit_mock(self):
+        # results that are never read do not keep the workers from exiting
+        with runtime.ShardedRuntime(large, self.api.settings, processes=2, max_pending=8) as sharded:
+            for result in sharded.map(range(20)):
+                break
+            workers = list(sharded._workers)
+        self.assertEqual(len(result), 1 << 20)
+        self.assertFalse(any(w.is_alive() for w in workers))
+
+        with self.assertRaises(KeyError):
+            with runtime.ShardedRuntime(large, self.api.settings, processes=2, max_pending=8) as sharded:
+                for result in sharded.map(range(20)):
+                    raise KeyError(result[:1])
+        self.assertEqual(sharded._workers, [])
+
+    def test_client_error_pickle_mock(self):
+        error = pickle.loads(pickle.dumps(ClientThrottledError('Too many requests', 429, error_response='{}')))
+        self.assertIsInstance(error, ClientThrottledError)
+        self.assertEqual((error.msg, error.code, error.error_response), ('Too many requests', 429, '{}'))
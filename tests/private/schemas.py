@@ -0,0 +1,80 @@
+import json
+import unittest
+
+from ..common import ApiTestBase, ClientError, compat_mock, MockResponse, schemas
+from .compatpatch import CompatPatchTests
+
+
+@unittest.skipIf(schemas.msgspec is None, 'Requires msgspec.')
+class SchemasTests(ApiTestBase):
+    """Tests for typed responses."""
+
+    @staticmethod
+    def init_all(api):
+        return [
+            {
+                'name': 'test_typed_responses_mock',
+                'test': SchemasTests('test_typed_responses_mock', api)
+            },
+            {
+                'name': 'test_typed_responses_errors_mock',
+                'test': SchemasTests('test_typed_responses_errors_mock', api)
+            },
+        ]
+
+    def setUp(self):
+        self.typed_responses = self.api.typed_responses
+        self.api.typed_responses = True
+
+    def tearDown(self):
+        self.api.typed_responses = self.typed_responses
+        super().tearDown()
+
+    @compat_mock.patch('instagram_private_api.client.compat_urllib_request.OpenerDirector.open')
+    def test_typed_responses_mock(self, open_mock):
+        user = {'pk': 1, 'username': 'x', 'friendship_status': {'following': False}}
+        open_mock.side_effect = [
+            MockResponse(body=json.dumps({
+                'status': 'ok', 'items': [CompatPatchTests._media()], 'more_available': True, 'next_max_id': '1_2'})),
+            MockResponse(body=json.dumps({'status': 'ok', 'users': [user], 'big_list': False})),
+            MockResponse(body=json.dumps({
+                'status': 'ok', 'comments': [{'pk': 3, 'text': 'x', 'created_at': 1, 'user': user}],
+                'comment_count': 1})),
+        ]
+        results = self.api.user_feed('2')
+        self.assertIsInstance(results, schemas.FeedResponse)
+        self.assertEqual(results.next_max_id, '1_2')
+        media = results.items[0]
+        self.assertIsInstance(media, schemas.Media)
+        self.assertEqual(media.user.username, 'user2')
+        self.assertEqual(media.caption.pk, 10)
+        self.assertEqual(media.carousel_media[0].video_versions[1].url, '640.mp4')
+        self.assertIsNone(media.carousel_media[1].video_duration)
+
+        results = self.api.user_followers('2', self.api.generate_uuid())
+        self.assertEqual(results.users, [schemas.User(pk=1, username='x')])
+
+        results = self.api.media_comments('1_2')
+        self.assertIsInstance(results, schemas.CommentsResponse)
+        self.assertEqual(results.comments[0].user.pk, 1)
+        self.assertEqual(results.preview_comments, [])
+
+    @compat_mock.patch('instagram_private_api.client.compat_urllib_request.OpenerDirector.open')
+    def test_typed_responses_errors_mock(self, open_mock):
+        open_mock.side_effect = [
+            MockResponse(body=json.dumps({'status': 'fail', 'message': 'Not found'})),
+            MockResponse(body=json.dumps({'status': 'ok', 'users': [{'pk': 'x', 'username': 'x'}]})),
+            MockResponse(body=json.dumps({'status': 'ok', 'user': {'pk': 1, 'profile_pic_url': 'x.jpg'}})),
+        ]
+        with self.assertRaises(ClientError) as ce:
+            self.api.user_feed('2')
+        self.assertEqual(ce.exception.msg, 'Not found')
+
+        # responses that do not match the schema are returned untyped
+        with self.assertLogs(self.api.logger, 'WARNING') as logs:
+            results = self.api.user_followers('2', self.api.generate_uuid())
+        self.assertEqual(results['users'], [{'pk': 'x', 'username': 'x'}])
+        self.assertIn('UsersResponse', logs.output[0])
+
+        # endpoints without a schema are not affected
+        self.assertEqual(self.api.user_info('1')['user']['pk'], 1)
@@ -0,0 +1,95 @@
+import time
+
+from ..common import ApiTestBase, ClientThrottledError, compat_mock, models
+
+
+class StoriesTests(ApiTestBase):
+    """Tests for the bulk story fetcher."""
+
+    @staticmethod
+    def init_all(api):
+        return [
+            {
+                'name': 'test_story_fetcher_mock',
+                'test': StoriesTests('test_story_fetcher_mock', api)
+            },
+            {
+                'name': 'test_story_fetcher_untracked_mock',
+                'test': StoriesTests('test_story_fetcher_untracked_mock', api)
+            },
+        ]
+
+    @staticmethod
+    def reel(user_id, latest):
+        return {
+            'id': int(user_id), 'latest_reel_media': latest, 'expiring_at': int(time.time()) + 3600,
+            'user': {'pk': int(user_id), 'username': f'user{user_id}'},
+            'items': [{'pk': latest, 'id': f'{latest}_{user_id}', 'taken_at': latest}],
+        }
+
+    def setUp(self):
+        self.latest = {'1': 100, '2': 200, '3': 300}
+
+    def tray(self):
+        return [self.reel(user_id, latest) for user_id, latest in self.latest.items()]
+
+    def reels_media(self, user_ids):
+        return {
+            'status': 'ok',
+            'reels_media': [self.reel(u, self.latest.get(u, 50)) for u in user_ids if u != '404'],
+            'reels': {},
+        }
+
+    @compat_mock.patch('instagram_private_api.Client.reels_media')
+    @compat_mock.patch('instagram_private_api.Client.reels_tray')
+    def test_story_fetcher_mock(self, reels_tray, reels_media):
+        reels_tray.side_effect = lambda: {'status': 'ok', 'tray': self.tray()}
+        reels_media.side_effect = self.reels_media
+        fetcher = self.api.story_fetcher(batch_size=2)
+
+        stories = fetcher.fetch()
+        self.assertEqual(sorted(stories), ['1', '2', '3'])
+        self.assertIsInstance(stories['2'], models.Reel)
+        self.assertEqual(stories['2'].items[0].pk, 200)
+        self.assertEqual(reels_media.call_count, 2)
+        self.assertEqual(fetcher.fetched, 3)
+
+        # only the changed reel is fetched
+        reels_media.reset_mock()
+        self.latest['2'] = 250
+        stories = fetcher.fetch(['1', 2])
+        reels_media.assert_called_once_with(['2'])
+        self.assertEqual(sorted(stories), ['1', '2'])
+        self.assertEqual(stories['2'].latest_reel_media, 250)
+
+        # nothing changed
+        reels_media.reset_mock()
+        self.assertEqual(len(fetcher.fetch()), 3)
+        reels_media.assert_not_called()
+
+        # failed chunks keep the previous reels and are retried
+        self.latest['1'] = 150
+        reels_media.side_effect = ClientThrottledError('Too Many Requests', 429)
+        stories = fetcher.fetch()
+        self.assertEqual(fetcher.failed_user_ids, ['1'])
+        self.assertEqual(stories['1'].latest_reel_media, 100)
+        reels_media.side_effect = self.reels_media
+        self.assertEqual(fetcher.fetch()['1'].latest_reel_media, 150)
+        self.assertEqual(fetcher.failed_user_ids, [])
+
+    @compat_mock.patch('instagram_private_api.Client.reels_media')
+    @compat_mock.patch('instagram_private_api.Client.reels_tray')
+    def test_story_fetcher_untracked_mock(self, reels_tray, reels_media):
+        reels_media.side_effect = self.reels_media
+        fetcher = self.api.story_fetcher()
+
+        # users not in the tray are fetched, users without stories are not returned
+        stories = fetcher.fetch(['1', '9', '404'], tray=self.tray())
+        reels_tray.assert_not_called()
+        reels_media.assert_called_once_with(['1', '9', '404'])
+        self.assertEqual(sorted(stories), ['1', '9'])
+
+        fetcher.fetch_untracked = False
+        reels_media.reset_mock()
+        self.assertEqual(sorted(fetcher.fetch(['1', '9'], tray=self.tray())), ['1'])
+        reels_media.assert_not_called()
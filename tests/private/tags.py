@@ -1,3 +1,4 @@
+import json
 import time
 from ..common import ApiTestBase, compat_mock
 
@@ -40,6 +41,14 @@ class TagsTests(ApiTestBase):
                 'name': 'test_tag_section',
                 'test': TagsTests('test_tag_section', api)
             },
+            {
+                'name': 'test_tag_search_iter_mock',
+                'test': TagsTests('test_tag_search_iter_mock', api)
+            },
+            {
+                'name': 'test_tag_section_iter_mock',
+                'test': TagsTests('test_tag_section_iter_mock', api)
+            },
         ]
 
     def test_tag_info(self):
@@ -64,6 +73,40 @@ class TagsTests(ApiTestBase):
         self.assertEqual(results.get('status'), 'ok')
         self.assertGreater(len(results.get('results', [])), 0, 'No results returned.')
 
+    @compat_mock.patch('instagram_private_api.Client._call_api')
+    def test_tag_search_iter_mock(self, call_api):
+        rank_token = self.api.generate_uuid()
+        next_rank_token = self.api.generate_uuid()
+        call_api.side_effect = [
+            {'status': 'ok', 'results': [{'id': i, 'name': f't{i}'} for i in (1, 2, 3)],
+             'has_more': True, 'rank_token': next_rank_token},
+            # 3 is a repeat
+            {'status': 'ok', 'results': [{'id': i, 'name': f't{i}'} for i in (3, 4, 5)],
+             'has_more': True, 'rank_token': next_rank_token},
+            {'status': 'ok', 'results': [{'id': i, 'name': f't{i}'} for i in (6, )], 'has_more': False},
+        ]
+        paginator = self.api.tag_search_iter('cats', rank_token, max_exclude=3)
+        self.assertEqual([t['id'] for t in paginator], [1, 2, 3, 4, 5, 6])
+        self.assertEqual(paginator.request_count, 3)
+
+        exclude_lists = [json.loads(kwargs['query']['exclude_list']) for _, kwargs in call_api.call_args_list]
+        self.assertEqual(exclude_lists, [[], [1, 2, 3], [3, 4, 5]])
+        self.assertEqual(call_api.call_args_list[0][1]['query']['rank_token'], rank_token)
+        self.assertEqual(call_api.call_args_list[1][1]['query']['rank_token'], next_rank_token)
+
+        # exclusion list is trimmed to fit the url length
+        call_api.reset_mock()
+        call_api.side_effect = [
+            {'status': 'ok', 'results': [{'id': 10 ** 17 + i} for i in range(100)], 'has_more': True},
+            {'status': 'ok', 'results': [], 'has_more': False},
+        ]
+        paginator = self.api.tag_search_iter('cats', rank_token, max_url_length=500, trim='newest')
+        self.assertEqual(len(list(paginator)), 100)
+        self.assertLessEqual(paginator.exclude_list_length, 500)
+        exclude_list = json.loads(call_api.call_args[1]['query']['exclude_list'])
+        self.assertGreater(len(exclude_list), 0)
+        self.assertEqual(exclude_list[0], 10 ** 17)
+
     def test_tag_follow_suggestions(self):
         results = self.api.tag_follow_suggestions()
         self.assertEqual(results.get('status'), 'ok')
@@ -102,3 +145,48 @@ class TagsTests(ApiTestBase):
         self.assertEqual(results.get('status'), 'ok')
         self.assertIn('sections', results)
         self.assertGreater(len(results.get('sections', [])), 0, 'No results returned.')
+
+    @staticmethod
+    def _section_page(pks, **kwargs):
+        page = {
+            'status': 'ok',
+            'sections': [{
+                'layout_type': 'media_grid',
+                'layout_content': {'medias': [{'media': {'pk': pk, 'id': f'{pk}_1'}} for pk in pks]}
+            }],
+        }
+        page.update(kwargs)
+        return page
+
+    @compat_mock.patch('instagram_private_api.Client._call_api')
+    def test_tag_section_iter_mock(self, call_api):
+        auto_patch = self.api.auto_patch
+        self.api.auto_patch = False
+        try:
+            tag = 'catsofinstagram'
+            pages = {
+                ('top', None): self._section_page(
+                    [1, 2], more_available=True, next_max_id='t2', next_page=1, next_media_ids=[2]),
+                ('top', 't2'): self._section_page([3], more_available=False),
+                ('recent', None): self._section_page(
+                    [2, 4], more_available=True, next_max_id='r2', next_page=1),
+                ('recent', 'r2'): self._section_page([5, 3], more_available=True, next_max_id='r3'),
+                ('recent', 'r3'): self._section_page([], more_available=False),
+            }
+            call_api.side_effect = lambda endpoint, params, **kwargs: pages[(params['tab'], params.get('max_id'))]
+
+            paginator = self.api.tag_section_iter(tag)
+            self.assertEqual([m['pk'] for m in paginator], [1, 2, 4, 3, 5])
+            self.assertEqual(call_api.call_count, 5)
+            self.assertEqual(paginator.cursors, {'top': None, 'recent': None})
+
+            _, second_page_kwargs = call_api.call_args_list[2]
+            self.assertEqual(second_page_kwargs['params']['max_id'], 't2')
+            self.assertEqual(second_page_kwargs['params']['page'], 1)
+            self.assertEqual(second_page_kwargs['params']['next_media_ids'], '[2]')
+
+            # extract works without auto_patch
+            medias = self.api.tag_section(tag, tab='recent', extract=True)
+            self.assertEqual([m['pk'] for m in medias], [2, 4])
+        finally:
+            self.api.auto_patch = auto_patch
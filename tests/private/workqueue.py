@@ -0,0 +1,282 @@
+import bisect
+import socketserver
+import threading
+import time
+
+from ..common import (
+    ApiTestBase, ClientError, ClientThrottledError, compat_mock, workqueue, clientpool
+)
+from instagram_private_api.errors import ClientConnectionError
+
+
+class RespStandIn(socketserver.ThreadingTCPServer):
+    """In memory stand-in of a Redis server, with the commands used by RedisQueue"""
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), RespHandler)
+        self.data = {}
+        self.lock = threading.Lock()
+
+    def execute(self, name, *args):
+        data = self.data
+        if name == 'PING':
+            return 'PONG'
+        if name in ('HSET', 'HSETNX'):
+            h = data.setdefault(args[0], {})
+            new = args[1] not in h
+            if new or name == 'HSET':
+                h[args[1]] = args[2]
+            return int(new)
+        if name == 'HGET':
+            return data.get(args[0], {}).get(args[1])
+        if name == 'SADD':
+            s = data.setdefault(args[0], set())
+            new = args[1] not in s
+            s.add(args[1])
+            return int(new)
+        if name == 'SMEMBERS':
+            return sorted(data.get(args[0], set()))
+        if name == 'SCARD':
+            return len(data.get(args[0], ()))
+        if name in ('LPUSH', 'RPUSH'):
+            lst = data.setdefault(args[0], [])
+            if name == 'LPUSH':
+                lst.insert(0, args[1])
+            else:
+                lst.append(args[1])
+            return len(lst)
+        if name == 'RPOPLPUSH':
+            src = data.get(args[0])
+            if not src:
+                return None
+            value = src.pop()
+            data.setdefault(args[1], []).insert(0, value)
+            return value
+        if name == 'LREM':
+            lst = data.get(args[0], [])
+            kept = [v for v in lst if v != args[2]]
+            data[args[0]] = kept
+            return len(lst) - len(kept)
+        if name == 'LRANGE':
+            lst = data.get(args[0], [])
+            stop = int(args[2])
+            return lst[int(args[1]):None if stop == -1 else stop + 1]
+        if name == 'LLEN':
+            return len(data.get(args[0], ()))
+        if name == 'ZADD':
+            z = data.setdefault(args[0], {})
+            nx = args[1] == 'NX'
+            score, member = args[-2:]
+            if nx and member in z:
+                return 0
+            new = member not in z
+            z[member] = float(score)
+            return int(new)
+        if name == 'ZSCORE':
+            score = data.get(args[0], {}).get(args[1])
+            return None if score is None else repr(score)
+        if name == 'ZREM':
+            return int(data.get(args[0], {}).pop(args[1], None) is not None)
+        if name == 'ZRANGEBYSCORE':
+            z = data.get(args[0], {})
+            ranked = sorted((score, member) for member, score in z.items())
+            end = bisect.bisect_right([s for s, _ in ranked], float(args[2]))
+            return [member for _, member in ranked[:end]]
+        if name == 'ZCARD':
+            return len(data.get(args[0], ()))
+        raise ValueError(f'unknown command {name}')
+
+
+class RespHandler(socketserver.StreamRequestHandler):
+
+    def read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        args = []
+        for _ in range(int(line[1:])):
+            size = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(size + 2)[:-2].decode('utf-8'))
+        return args
+
+    @staticmethod
+    def encode(value):
+        if value is None:
+            return b'$-1\r\n'
+        if isinstance(value, int):
+            return b':%d\r\n' % value
+        if isinstance(value, list):
+            return b'*%d\r\n' % len(value) + b''.join(RespHandler.encode(v) for v in value)
+        value = value.encode('utf-8')
+        return b'$%d\r\n%s\r\n' % (len(value), value)
+
+    def handle(self):
+        while True:
+            args = self.read_command()
+            if args is None:
+                return
+            try:
+                with self.server.lock:
+                    reply = self.encode(self.server.execute(args[0].upper(), *args[1:]))
+            except Exception as e:  # noqa
+                reply = f'-ERR {e}\r\n'.encode('utf-8')
+            self.wfile.write(reply)
+
+
+class WorkQueueTests(ApiTestBase):
+    """Tests for the work queues and client pool."""
+
+    @staticmethod
+    def init_all(api):
+        return [
+            {
+                'name': 'test_sqlite_queue_mock',
+                'test': WorkQueueTests('test_sqlite_queue_mock', api)
+            },
+            {
+                'name': 'test_redis_queue_mock',
+                'test': WorkQueueTests('test_redis_queue_mock', api)
+            },
+            {
+                'name': 'test_rate_budget_mock',
+                'test': WorkQueueTests('test_rate_budget_mock', api)
+            },
+            {
+                'name': 'test_client_pool_mock',
+                'test': WorkQueueTests('test_client_pool_mock', api)
+            },
+        ]
+
+    def check_queue(self, queue):
+        with self.assertRaises(ValueError):
+            queue.put('not_an_endpoint', 1)
+        self.assertTrue(queue.put('user_info', '1'))
+        self.assertFalse(queue.put('user_info', '1'))
+        self.assertEqual(queue.put_many([
+            workqueue.Job('user_info', ['2']), workqueue.Job('user_info', ['1']),
+            workqueue.Job('media_info', ['10_1']), workqueue.Job('user_feed', ['1'], {'max_id': 'a'}),
+        ]), 3)
+        self.assertEqual(sorted(queue.families()), ['feed', 'media', 'users'])
+        self.assertEqual(queue.counts(), {'queued': 4, 'leased': 0, 'done': 0, 'failed': 0})
+
+        # leases only the requested families, each job once
+        jobs = queue.lease(10, ['users'])
+        self.assertEqual(sorted(j.args[0] for j in jobs), ['1', '2'])
+        self.assertEqual(queue.lease(10, ['users']), [])
+        first, second = sorted(jobs, key=lambda j: j.args[0])
+        self.assertTrue(queue.complete(first, {'user': {'pk': 1}}))
+        self.assertEqual(queue.result(first.id), {'user': {'pk': 1}})
+        self.assertFalse(queue.put('user_info', '1'))
+
+        # retried until max_attempts, then failed
+        self.assertTrue(queue.fail(second, ClientError('Server Error', 500)))
+        retried = queue.lease(10, ['users'])
+        self.assertEqual([(j.id, j.attempts) for j in retried], [(second.id, 1)])
+        self.assertFalse(queue.fail(retried[0], ClientError('Server Error', 500)))
+        self.assertEqual(queue.lease(10, ['users']), [])
+
+        # released jobs are leased again without counting an attempt
+        job = queue.lease(1, ['media'])[0]
+        queue.release(job)
+        job = queue.lease(1, ['media'])[0]
+        self.assertEqual((job.endpoint, job.args, job.attempts), ('media_info', ['10_1'], 0))
+        self.assertTrue(queue.complete(job))
+
+        # expired leases are leased again, late outcomes of the first lease are reported
+        feed_job = queue.lease(1)[0]
+        self.assertEqual((feed_job.endpoint, feed_job.kwargs), ('user_feed', {'max_id': 'a'}))
+        time.sleep(queue.lease_time * 2)
+        queue.requeue_expired()
+        self.assertEqual([j.id for j in queue.lease(10)], [feed_job.id])
+        self.assertFalse(queue.fail(feed_job, 'late'))
+        self.assertEqual(queue.counts(), {'queued': 0, 'leased': 1, 'done': 2, 'failed': 1})
+        self.assertFalse(queue.complete(feed_job))
+        self.assertEqual(queue.counts(), {'queued': 0, 'leased': 0, 'done': 3, 'failed': 1})
+
+    def test_sqlite_queue_mock(self):
+        queue = workqueue.SQLiteQueue(':memory:', lease_time=0.05, max_attempts=2, retry_backoff=0)
+        self.check_queue(queue)
+        queue.close()
+
+    def test_redis_queue_mock(self):
+        server = RespStandIn()
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        client = workqueue.RespClient(*server.server_address)
+        try:
+            self.assertEqual(client.execute_command('PING'), 'PONG')
+            with self.assertRaises(workqueue.RespError):
+                client.execute_command('FLUSHALL')
+            queue = workqueue.RedisQueue(client, prefix='test', lease_time=0.05, max_attempts=2, retry_backoff=0)
+            self.check_queue(queue)
+
+            # a job leased by a crawler that died before recording the lease is requeued
+            queue.put('user_info', '3')
+            client.execute_command('RPOPLPUSH', 'test:ready:users', 'test:leased:users')
+            queue.requeue_expired()
+            self.assertEqual(queue.lease(1, ['users']), [])
+            time.sleep(queue.lease_time * 2)
+            queue.requeue_expired()
+            self.assertEqual([j.args for j in queue.lease(1, ['users'])], [['3']])
+        finally:
+            client.close()
+            server.shutdown()
+            server.server_close()
+
+    def test_rate_budget_mock(self):
+        budget = clientpool.RateBudget({'users': (2, 10)}, default=(1, 1))
+        self.assertEqual(budget.remaining('users', now=0), 2)
+        self.assertTrue(budget.acquire('users', now=0))
+        self.assertTrue(budget.acquire('users', now=0))
+        self.assertFalse(budget.acquire('users', now=0))
+        self.assertEqual(budget.remaining('users', now=5), 1)
+        self.assertEqual(budget.remaining('feed', now=0), 1)
+        budget.pause('users', 100, now=10)
+        self.assertEqual(budget.remaining('users', now=50), 0)
+        self.assertFalse(budget.acquire('users', now=50))
+        self.assertEqual(budget.remaining('users', now=120), 2)
+
+    @compat_mock.patch('instagram_private_api.Client.user_info')
+    def test_client_pool_mock(self, user_info):
+        throttled = []
+
+        def info(user_id):
+            if user_id == '13':
+                raise ClientError('Not Found', 404)
+            if user_id == '14':
+                raise ClientConnectionError('timeout')
+            if user_id == '15' and not throttled:
+                throttled.append(user_id)
+                raise ClientThrottledError('Please wait a few minutes', 429)
+            return {'user': {'pk': int(user_id)}}
+
+        user_info.side_effect = info
+        queue = workqueue.SQLiteQueue(':memory:', max_attempts=2, retry_backoff=0)
+        for i in range(20):
+            queue.put('user_info', str(i))
+        pool = clientpool.ClientPool(
+            [self.api, self.api], queue, limits={'users': (4, 3600)}, max_workers=3, keep_results=True)
+        self.assertEqual(pool.remaining('users'), 8)
+
+        stats = pool.run_once()
+        self.assertEqual(stats, {'done': 8, 'retried': 0, 'failed': 0, 'released': 0})
+        self.assertEqual(queue.counts()['queued'], 12)
+        self.assertEqual(pool.remaining('users'), 0)
+        self.assertEqual(queue.result(workqueue.Job('user_info', ['0']).id), {'user': {'pk': 0}})
+
+        # one call at a time: the throttled account releases the jobs after 15
+        pool.clients = [self.api]
+        pool.budgets = [clientpool.RateBudget({'users': (20, 3600)})]
+        pool.max_workers = 1
+        stats = pool.run_once()
+        self.assertEqual(stats, {'done': 5, 'retried': 1, 'failed': 1, 'released': 5})
+        self.assertEqual(pool.remaining('users'), 0)
+        self.assertEqual(pool.run_once(), {'done': 0, 'retried': 0, 'failed': 0, 'released': 0})
+
+        pool.budgets = [clientpool.RateBudget({'users': (20, 3600)})]
+        stats = pool.run(poll_interval=0)
+        self.assertEqual(stats, {'done': 5, 'retried': 0, 'failed': 1, 'released': 0})
+        self.assertEqual(queue.counts(), {'queued': 0, 'leased': 0, 'done': 18, 'failed': 2})
+        self.assertEqual(queue.lease(1), [])
@@ -13,7 +13,9 @@ from .private import (
     LocationTests, MediaTests, MiscTests,
     TagsTests, UsersTests, UsertagsTests,
     HighlightsTests, ClientTests, ApiUtilsTests,
-    CompatPatchTests, IGTVTests
+    CompatPatchTests, IGTVTests, ModelsTests, ProjectionTests, SchemasTests,
+    LazyDocumentTests, JsonCodecsTests, InterningTests, LoadersTests, BulkTests,
+    StoriesTests, ReportersTests, PlannerTests, RegistryTests, RuntimeTests, WorkQueueTests
 )
 from .common import (
     Client, ClientError, ClientLoginError, ClientCookieExpiredError,
@@ -138,6 +140,20 @@ if __name__ == '__main__':
 
     tests.extend(ClientTests.init_all(api))
     tests.extend(CompatPatchTests.init_all(api))
+    tests.extend(ModelsTests.init_all(api))
+    tests.extend(ProjectionTests.init_all(api))
+    tests.extend(SchemasTests.init_all(api))
+    tests.extend(LazyDocumentTests.init_all(api))
+    tests.extend(JsonCodecsTests.init_all(api))
+    tests.extend(InterningTests.init_all(api))
+    tests.extend(LoadersTests.init_all(api))
+    tests.extend(BulkTests.init_all(api))
+    tests.extend(StoriesTests.init_all(api))
+    tests.extend(ReportersTests.init_all(api))
+    tests.extend(PlannerTests.init_all(api))
+    tests.extend(RegistryTests.init_all(api))
+    tests.extend(RuntimeTests.init_all(api))
+    tests.extend(WorkQueueTests.init_all(api))
     tests.extend(ApiUtilsTests.init_all())
 
     def match_regex(test_name):